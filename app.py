@@ -539,6 +539,7 @@ import os
 from src.content_generator import PostGenerator
 from src.feedback_handler import FeedbackHandler
 from src.post_scheduler import PostScheduler
+from src.search import search_posts
 from src.utils import get_db_connection, save_post_to_db
 
 # Configure the page
@@ -608,6 +609,15 @@ if page == "Generate Posts":
         target_audience = st.text_input("Target Audience", f"Professionals in the {profile_data['industry']} industry")
         custom_instructions = st.text_area("Custom Instructions", f"Post length should be medium (200-400 characters).")
 
+    with st.expander("Find Exemplar Posts"):
+        search_query = st.text_input("Search scraped posts", topic)
+        search_results = search_posts(search_query, limit=5, match_all=False) if search_query else []
+        if search_query and not search_results:
+            st.info("No matching posts found.")
+        for result in search_results:
+            st.markdown(f"**{result['profile_name']}** - {result['total_engagement']} engagements")
+            st.markdown(result["post_content"][:300])
+
     if st.button("Generate Post"):
         with st.spinner("Generating LinkedIn post..."):
             try:
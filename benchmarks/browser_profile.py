@@ -0,0 +1,96 @@
+"""Benchmark the full and lean Chrome driver profiles on media-heavy pages.
+
+Each profile scrapes the same fixture pages, which carry a web font and a
+per-post avatar, image or video, through replay mode in headless Chrome.
+Every run starts from an empty Chrome profile directory so neither side
+benefits from a warm disk cache. Browser RSS needs psutil.
+
+    python -m benchmarks.browser_profile --pages 5 --posts 30
+"""
+import os
+import shutil
+import tempfile
+import statistics
+
+from benchmarks.fixtures import activity_page_html, write_media
+from src.data_collection import DRIVER_PROFILES, LinkedInScraper
+from src.replay import ReplayServer, replay_page_name
+
+
+def profile_urls(page_count):
+    """Get one fake profile URL per fixture page."""
+    return [f"https://www.linkedin.com/in/browser-benchmark-{page}" for page in range(page_count)]
+
+
+def run(source, driver_profile, urls, post_count):
+    """Scrape every fixture page with one browser and return its page metrics."""
+    user_data_dir = tempfile.mkdtemp(prefix=f"chrome-{driver_profile}-")
+    scraper = LinkedInScraper(
+        headless=True,
+        replay_source=source,
+        driver_profile=driver_profile,
+        user_data_dir=user_data_dir,
+        adaptive_scroll=False,
+        scroll_pause=(0, 0),
+        min_scroll_interval=0
+    )
+    try:
+        for url in urls:
+            scraper.scrape_profile_posts(url, "Browser Benchmark", max_posts=post_count)
+        return scraper.page_metrics
+    finally:
+        scraper.close()
+        shutil.rmtree(user_data_dir, ignore_errors=True)
+
+
+def _median(metrics, key, scale=1.0):
+    """Median of one page metric, or None if the browser did not report it."""
+    values = [metric[key] for metric in metrics if metric.get(key) is not None]
+    return statistics.median(values) / scale if values else None
+
+
+def _cell(value, spec):
+    """Format a table cell, showing n/a for missing values."""
+    return format(value, spec) if value is not None else format("n/a", ">" + spec.split(".")[0])
+
+
+def main(page_count, post_count):
+    directory = tempfile.mkdtemp(prefix="browser-bench-")
+    try:
+        urls = profile_urls(page_count)
+        for seed, url in enumerate(urls):
+            with open(os.path.join(directory, replay_page_name(url)), "w", encoding="utf-8") as f:
+                f.write(activity_page_html(post_count, seed=seed, with_media=True))
+        media_bytes = write_media(directory)
+
+        print(f"{page_count} pages x {post_count} posts, {media_bytes / 1e6:.1f} MB of distinct media files")
+        print("Medians per page:")
+        print(
+            f"{'profile':>8} {'load s':>7} {'DCL ms':>7} {'requests':>9} {'MB in':>7} "
+            f"{'JS heap MB':>11} {'RSS MB':>7} {'DOM nodes':>10}"
+        )
+        with ReplayServer(directory) as server:
+            for driver_profile in DRIVER_PROFILES:
+                metrics = run(server.base_url, driver_profile, urls, post_count)
+                print(
+                    f"{driver_profile:>8} {_cell(_median(metrics, 'load_time'), '7.2f')} "
+                    f"{_cell(_median(metrics, 'dom_content_loaded_ms'), '7.0f')} "
+                    f"{_cell(_median(metrics, 'resources'), '9.0f')} "
+                    f"{_cell(_median(metrics, 'transfer_bytes', 1e6), '7.2f')} "
+                    f"{_cell(_median(metrics, 'js_heap_bytes', 1e6), '11.1f')} "
+                    f"{_cell(_median(metrics, 'browser_rss_bytes', 1e6), '7.0f')} "
+                    f"{_cell(_median(metrics, 'dom_nodes'), '10.0f')}"
+                )
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare page load time and memory of the Chrome driver profiles")
+    parser.add_argument("--pages", type=int, default=5, help="Fixture pages scraped per profile")
+    parser.add_argument("--posts", type=int, default=30, help="Posts per fixture page")
+    args = parser.parse_args()
+
+    main(args.pages, args.posts)
@@ -0,0 +1,154 @@
+"""Benchmark compressed post_content storage.
+
+Builds the same synthetic corpus in one temporary database per codec and
+reports the file size, stored content size (ratio is relative to plain text)
+and read latency of each.
+
+    python -m benchmarks.compression --posts 50000
+"""
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+from src import compression
+from src.compression import compress_existing_content, decompress_content, train_dictionary
+from src.db_pool import configure_pool
+from src.ingest import bulk_insert_posts
+from src.migrations import apply_migrations
+
+_OPENERS = [
+    "Excited to share that", "I've been thinking a lot about", "Here's what I learned from",
+    "Big news:", "After 10 years in", "Unpopular opinion:", "Lessons from",
+]
+_TOPICS = [
+    "artificial intelligence", "product management", "remote work", "leadership",
+    "data engineering", "career growth", "startup fundraising", "customer success",
+]
+_SENTENCES = [
+    "The teams that win are the ones that ship, learn and iterate quickly.",
+    "We doubled our impact by focusing on fewer, better bets this quarter.",
+    "Great leaders create clarity, remove blockers and celebrate progress.",
+    "If you're not measuring it, you can't improve it.",
+    "Thank you to everyone who made this possible!",
+    "What would you add to this list? Let me know in the comments.",
+    "Building in public has taught me more than any course ever did.",
+    "The best advice I ever received: focus on the problem, not the solution.",
+]
+_HASHTAGS = ["#AI", "#Leadership", "#Startups", "#Career", "#Data", "#ProductManagement", "#Hiring"]
+
+MODES = [
+    ("off", None, False),
+    ("zlib", "zlib", False),
+    ("zlib+dict", "zlib", True),
+    ("zstd", "zstd", False),
+    ("zstd+dict", "zstd", True),
+]
+
+
+def synthetic_posts(count, seed=42):
+    """Generate LinkedIn-like posts with realistic length and vocabulary."""
+    rng = random.Random(seed)
+    now = datetime.now().isoformat()
+    for i in range(count):
+        body = " ".join(rng.choices(_SENTENCES, k=rng.randint(2, 8)))
+        yield {
+            "profile_url": f"https://www.linkedin.com/in/user-{i % 200}",
+            "profile_name": f"User {i % 200}",
+            "post_url": f"https://www.linkedin.com/feed/update/urn:li:activity:{7000000000000000000 + i}",
+            "post_content": (
+                f"{rng.choice(_OPENERS)} {rng.choice(_TOPICS)}. {body}\n\n"
+                + " ".join(rng.sample(_HASHTAGS, rng.randint(1, 4)))
+            ),
+            "publish_date": "2024-01-01",
+            "likes": rng.randint(0, 5000),
+            "comments": rng.randint(0, 500),
+            "shares": rng.randint(0, 200),
+            "collected_at": now,
+        }
+
+
+def _time_reads(pool, post_count, lookups):
+    """Time a full decompressing scan and random single-post lookups."""
+    with pool.connection() as conn:
+        start = time.perf_counter()
+        for (value,) in conn.execute("SELECT post_content FROM posts"):
+            decompress_content(value, conn=conn)
+        scan_seconds = time.perf_counter() - start
+
+        ids = random.Random(7).choices(range(1, post_count + 1), k=lookups)
+        start = time.perf_counter()
+        for post_id in ids:
+            value = conn.execute("SELECT post_content FROM posts WHERE id = ?", (post_id,)).fetchone()[0]
+            decompress_content(value, conn=conn)
+        lookup_seconds = time.perf_counter() - start
+
+    return scan_seconds, lookup_seconds / lookups
+
+
+def run_mode(directory, name, codec, use_dictionary, post_count, lookups):
+    """Build one database for a codec and measure it."""
+    db_path = os.path.join(directory, f"{name.replace('+', '_')}.db")
+    pool = configure_pool(db_path, storage_profile="default")
+
+    # Load plain text, then convert it the same way the migration does
+    compression.CONTENT_COMPRESSION = "off"
+    with pool.connection() as conn:
+        apply_migrations(conn)
+    bulk_insert_posts(synthetic_posts(post_count))
+
+    start = time.perf_counter()
+    if codec:
+        with pool.transaction() as conn:
+            if use_dictionary:
+                train_dictionary(conn, codec)
+            compress_existing_content(conn, codec)
+    compress_seconds = time.perf_counter() - start
+
+    with pool.connection() as conn:
+        conn.execute("VACUUM")
+        content_bytes = conn.execute("SELECT SUM(length(CAST(post_content AS BLOB))) FROM posts").fetchone()[0]
+    size = os.path.getsize(db_path)
+
+    scan_seconds, lookup_seconds = _time_reads(pool, post_count, lookups)
+    pool.close()
+    return size, content_bytes, compress_seconds, scan_seconds, lookup_seconds
+
+
+def main(post_count, lookups):
+    directory = tempfile.mkdtemp(prefix="compression-bench-")
+    try:
+        print(f"{post_count} posts, {lookups} random lookups")
+        print(
+            f"{'mode':<10} {'file MB':>9} {'content MB':>11} {'ratio':>6} "
+            f"{'compress s':>11} {'scan s':>8} {'lookup us':>10}"
+        )
+        baseline = None
+        for name, codec, use_dictionary in MODES:
+            if codec == "zstd" and compression.zstandard is None:
+                print(f"{name:<10} skipped (zstandard is not installed)")
+                continue
+            size, content_bytes, compress_seconds, scan_seconds, lookup_seconds = run_mode(
+                directory, name, codec, use_dictionary, post_count, lookups
+            )
+            baseline = baseline or content_bytes
+            print(
+                f"{name:<10} {size / 1e6:>9.2f} {content_bytes / 1e6:>11.2f} {baseline / content_bytes:>6.2f} "
+                f"{compress_seconds:>11.2f} "
+                f"{scan_seconds:>8.3f} {lookup_seconds * 1e6:>10.1f}"
+            )
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark compressed post content storage")
+    parser.add_argument("--posts", type=int, default=20000, help="Number of synthetic posts")
+    parser.add_argument("--lookups", type=int, default=2000, help="Random single-post reads")
+    args = parser.parse_args()
+
+    main(args.posts, args.lookups)
@@ -0,0 +1,89 @@
+"""Benchmark the scraper's post extraction modes against saved HTML fixtures.
+
+Without --browser only the BeautifulSoup parser is timed. With --browser each
+fixture is opened from a file:// URL in headless Chrome and the "elements",
+"script" and "soup" modes of LinkedInScraper are timed on the same page.
+
+    python -m benchmarks.extraction --sizes 10 100 1000 --browser
+"""
+import os
+import time
+import tempfile
+from pathlib import Path
+
+from benchmarks.fixtures import FIXTURE_SIZES, write_fixtures
+from src.data_collection import EXTRACTION_MODES, LinkedInScraper, build_post, parse_activity_html
+
+PROFILE_URL = "https://www.linkedin.com/in/benchmark"
+
+
+def time_soup(html, post_count, repeat):
+    """Time parse_activity_html plus post building on raw HTML."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        posts = [build_post(raw, PROFILE_URL, "Benchmark") for raw in parse_activity_html(html, post_count)]
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, posts
+
+
+def time_browser_modes(scraper, path, post_count):
+    """Time every extraction mode on a fixture loaded in the browser."""
+    scraper.driver.get(Path(path).resolve().as_uri())
+    timings = {}
+    urls = {}
+    for mode in EXTRACTION_MODES:
+        scraper.extraction_mode = mode
+        started = time.perf_counter()
+        posts = scraper._extract_posts(PROFILE_URL, "Benchmark", post_count)
+        timings[mode] = time.perf_counter() - started
+        urls[mode] = [post["post_url"] for post in posts]
+    return timings, urls
+
+
+def main(sizes, browser, repeat):
+    directory = os.path.join(tempfile.gettempdir(), "linkedin-fixtures")
+    paths = write_fixtures(directory, sizes)
+
+    print("BeautifulSoup parse (best of {})".format(repeat))
+    print(f"{'posts':>6} {'total ms':>10} {'per post ms':>12} {'posts/s':>9}")
+    for size in sizes:
+        with open(paths[size], encoding="utf-8") as f:
+            html = f.read()
+        elapsed, posts = time_soup(html, size, repeat)
+        assert len(posts) == size, f"expected {size} posts, parsed {len(posts)}"
+        print(f"{size:>6} {elapsed * 1000:>10.1f} {elapsed * 1000 / size:>12.3f} {size / elapsed:>9.0f}")
+
+    if not browser:
+        return
+
+    scraper = LinkedInScraper(headless=True)
+    scraper._initialize_driver()
+    try:
+        print("\nIn-browser extraction")
+        print(f"{'posts':>6} " + " ".join(f"{mode + ' ms':>12}" for mode in EXTRACTION_MODES) + f" {'speedup':>8}")
+        for size in sizes:
+            timings, urls = time_browser_modes(scraper, paths[size], size)
+            if len({tuple(mode_urls) for mode_urls in urls.values()}) != 1:
+                print(f"warning: extraction modes disagree on the {size}-post fixture")
+            speedup = timings["elements"] / min(timings["script"], timings["soup"])
+            print(
+                f"{size:>6} "
+                + " ".join(f"{timings[mode] * 1000:>12.1f}" for mode in EXTRACTION_MODES)
+                + f" {speedup:>8.1f}x"
+            )
+    finally:
+        scraper.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark post extraction modes")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(FIXTURE_SIZES), help="Posts per fixture")
+    parser.add_argument("--browser", action="store_true", help="Also time the modes in headless Chrome")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions for the parser timing")
+    args = parser.parse_args()
+
+    main(args.sizes, args.browser, args.repeat)
@@ -0,0 +1,121 @@
+"""Benchmark vectorized post feature extraction against per-row lambdas.
+
+Builds synthetic posts with URLs, mentions, emoji, questions, hashtags and
+engagement counts as LinkedIn displays them ("1.2K", "56 comments"). Each
+step of analyze_post_structure and of count parsing is timed the old way,
+with one Python call per post, and with src.features, and the results are
+checked to be identical.
+
+    python -m benchmarks.features --posts 1000000
+"""
+import re
+import time
+import random
+
+import emoji
+import pandas as pd
+
+from benchmarks.compression import synthetic_posts
+from src.features import COUNT_MULTIPLIERS, COUNT_PATTERN, hashtag_counts, parse_counts, structure_features
+
+_EXTRAS = [
+    "", "", "Read more: https://example.com/blog/post-{i}", "Thanks @jane_doe and @acme for the help!",
+    "🚀", "Who else has seen this? 🤔", "Link in comments 👇", "Details at http://example.org/{i}?ref=li",
+]
+_COUNT_FORMATS = ["{n}", "{n:,}", "{k:.1f}K", "{n} reactions", "{n} comments", "{m:.1f}M", ""]
+
+
+def build_posts(count, seed):
+    """Create synthetic posts with varied structure and displayed count texts."""
+    rng = random.Random(seed)
+    rows = []
+    for i, post in enumerate(synthetic_posts(count, seed)):
+        counts = []
+        for _ in range(3):
+            n = int(rng.lognormvariate(4, 2))
+            counts.append(rng.choice(_COUNT_FORMATS).format(n=n, k=n / 1000, m=n / 1000000))
+        rows.append({
+            "post_content": None if i % 97 == 0 else post["post_content"] + " " + rng.choice(_EXTRAS).format(i=i),
+            "likes": counts[0],
+            "comments": counts[1],
+            "shares": counts[2],
+        })
+    return pd.DataFrame(rows)
+
+
+def legacy_parse_count(count_text):
+    """data_collection.parse_count, one text at a time."""
+    if not count_text:
+        return 0
+    match = COUNT_PATTERN.search(count_text.replace(',', ''))
+    if not match:
+        return 0
+    number, suffix = match.groups()
+    return int(float(number) * COUNT_MULTIPLIERS.get(suffix.upper() if suffix else '', 1))
+
+
+def legacy_structure_features(content):
+    """The per-row feature code analyze_post_structure used before src.features."""
+    text = content.fillna('')
+    features = pd.DataFrame(index=content.index)
+    features['content_length'] = text.apply(len)
+    features['word_count'] = text.apply(lambda x: len(x.split()))
+    features['hashtag_count'] = text.apply(lambda x: len(re.findall(r'#\w+', x)))
+    features['has_hashtags'] = features['hashtag_count'] > 0
+    features['has_url'] = text.str.contains(r'https?://\S+')
+    features['has_mention'] = text.str.contains(r'@\w+')
+    features['has_emoji'] = text.apply(lambda x: any(c in emoji.EMOJI_DATA for c in x))
+    features['has_question'] = text.str.contains(r'\?')
+    features['sentence_count'] = text.apply(lambda x: len(re.split(r'[.!?]+', x)))
+    return features
+
+
+def timed(function, *args):
+    """Run a function once and return (seconds, result)."""
+    started = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - started, result
+
+
+def main(args):
+    started = time.perf_counter()
+    posts = build_posts(args.posts, args.seed)
+    print(f"Built {len(posts)} posts in {time.perf_counter() - started:.1f}s")
+    print(f"{'step':>20} {'per-row s':>10} {'vectorized s':>13} {'speedup':>8}")
+
+    def report(name, legacy_seconds, vectorized_seconds):
+        print(f"{name:>20} {legacy_seconds:>10.2f} {vectorized_seconds:>13.2f} {legacy_seconds / vectorized_seconds:>7.1f}x")
+
+    legacy_counts = {}
+    vectorized_counts = {}
+    legacy_total = vectorized_total = 0.0
+    for column in ("likes", "comments", "shares"):
+        legacy_seconds, legacy_counts[column] = timed(lambda values: values.apply(legacy_parse_count), posts[column])
+        vectorized_seconds, vectorized_counts[column] = timed(parse_counts, posts[column])
+        assert (legacy_counts[column] == vectorized_counts[column]).all(), f"{column} counts differ"
+        legacy_total += legacy_seconds
+        vectorized_total += vectorized_seconds
+    report("counts", legacy_total, vectorized_total)
+
+    legacy_seconds, legacy = timed(legacy_structure_features, posts["post_content"])
+    vectorized_seconds, vectorized = timed(structure_features, posts["post_content"])
+    for column in legacy.columns:
+        assert (legacy[column] == vectorized[column]).all(), f"{column} differs"
+    report("structure features", legacy_seconds, vectorized_seconds)
+    legacy_total += legacy_seconds
+    vectorized_total += vectorized_seconds
+
+    # Hashtags come from post_hashtags in the analyzer; time the text path on its own too
+    legacy_seconds, _ = timed(lambda text: text.fillna('').apply(lambda x: len(re.findall(r'#\w+', x))), posts["post_content"])
+    vectorized_seconds, _ = timed(hashtag_counts, posts["post_content"])
+    report("  of which hashtags", legacy_seconds, vectorized_seconds)
+    report("total", legacy_total, vectorized_total)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark vectorized post feature extraction")
+    parser.add_argument("--posts", type=int, default=1000000, help="Synthetic posts to process")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    main(parser.parse_args())
@@ -0,0 +1,239 @@
+"""Synthetic LinkedIn recent-activity pages for offline scraper benchmarks.
+
+The markup mirrors the classes the scraper's selectors look for, including
+wrapper elements whose class names contain the field class as a substring.
+
+    python -m benchmarks.fixtures --output benchmarks/fixtures --sizes 10 100 1000
+"""
+import os
+import re
+import html
+import random
+import struct
+
+from benchmarks.compression import synthetic_posts
+
+FIXTURE_SIZES = (10, 100, 1000)
+
+_HASHTAG = re.compile(r"#(\w+)")
+
+_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="utf-8"><title>Recent activity | LinkedIn</title>{head}</head>
+<body>
+<main class="scaffold-layout__main">
+<div class="scaffold-finite-scroll__content">
+{posts}
+</div>
+</main>
+{infinite_scroll}
+</body>
+</html>
+"""
+
+# Holds back all but the first page of posts and appends the next page
+# load_delay_ms after the window is scrolled near the bottom
+_INFINITE_SCROLL_TEMPLATE = """<template id="more-posts">
+{posts}
+</template>
+<script>
+(function () {{
+    const pageSize = {page_size};
+    const loadDelay = {load_delay_ms};
+    const pending = Array.from(document.getElementById("more-posts").content.children);
+    const feed = document.querySelector(".scaffold-finite-scroll__content");
+    let loading = false;
+    window.addEventListener("scroll", () => {{
+        if (loading || !pending.length) return;
+        if (window.innerHeight + window.scrollY < document.body.scrollHeight - 200) return;
+        loading = true;
+        setTimeout(() => {{
+            pending.splice(0, pageSize).forEach(post => feed.appendChild(post));
+            loading = false;
+        }}, loadDelay);
+    }});
+}})();
+</script>"""
+
+_POST_TEMPLATE = """<div class="feed-shared-update-v2 feed-shared-update-v2--minimal-padding" data-urn="urn:li:activity:{activity_id}">
+  <div class="update-components-actor">
+    <a class="app-aware-link update-components-actor__meta-link" href="{profile_url}">
+      {avatar}<span class="update-components-actor__name">{profile_name}</span>
+    </a>
+    <span class="update-components-actor__sub-description">{age} &bull; Edited</span>
+  </div>
+  <div class="feed-shared-update-v2__description-wrapper">
+    <div class="feed-shared-inline-show-more-text feed-shared-update-v2__description">
+      <span class="break-words"><span dir="ltr">{content}</span></span>
+    </div>
+  </div>
+  {media}<a class="app-aware-link" href="https://www.linkedin.com/posts/{slug}-activity-{activity_id}-{suffix}">View post</a>
+  <div class="social-details-social-counts">
+    <ul class="social-details-social-counts">
+      <li class="social-details-social-counts__reactions">
+        <span class="social-details-social-counts__reactions-count">{likes}</span>
+      </li>
+      <li class="social-details-social-counts__comments"><button>{comments} comments</button></li>
+      <li class="social-details-social-counts__reshares"><button>{shares} reposts</button></li>
+    </ul>
+  </div>
+</div>"""
+
+# Web font, avatar, post image and every fifth post a video, all served
+# from the fixture's media/ directory (see write_media)
+MEDIA_DIR = "media"
+
+_MEDIA_HEAD = """<style>
+@font-face {{ font-family: "Fixture Sans"; src: url("{media}/font.woff2") format("woff2"); }}
+body {{ font-family: "Fixture Sans", sans-serif; }}
+</style>"""
+
+_AVATAR_TEMPLATE = '<img class="update-components-actor__avatar-image" src="{media}/avatar.bmp?post={seed}-{index}" width="48" height="48" alt="">'
+
+_IMAGE_TEMPLATE = '<div class="update-components-image"><img src="{media}/image.bmp?post={seed}-{index}" width="552" height="414" alt=""></div>\n  '
+
+_VIDEO_TEMPLATE = '<div class="update-components-linkedin-video"><video src="{media}/clip.mp4?post={seed}-{index}" preload="auto" muted></video></div>\n  '
+
+
+def _format_count(count):
+    """Format a count the way LinkedIn does (1,234 or 12.3K)."""
+    if count >= 10000:
+        return f"{count / 1000:.1f}K"
+    return f"{count:,}"
+
+
+def _content_html(text):
+    """Render post text with line breaks and hashtag links."""
+    linked = _HASHTAG.sub(
+        lambda match: (
+            f'<a class="app-aware-link" href="https://www.linkedin.com/feed/hashtag/?keywords={match.group(1)}">'
+            f'{match.group(0)}</a>'
+        ),
+        html.escape(text)
+    )
+    return linked.replace("\n", "<br>")
+
+
+def activity_page_html(post_count, seed=42, page_size=None, load_delay_ms=500, with_media=False):
+    """Build a recent-activity page with post_count posts.
+
+    Args:
+        post_count: Number of posts on the page
+        seed: Random seed, so the same arguments give the same page
+        page_size: If set, only this many posts are in the initial DOM and
+            the rest load page by page on scroll, like LinkedIn's feed
+        load_delay_ms: Delay before each further page appears
+        with_media: Add a web font and per-post avatar, image and video
+            references to files written by write_media
+
+    Returns:
+        HTML string
+    """
+    rng = random.Random(seed)
+    posts = []
+    for index, post in enumerate(synthetic_posts(post_count, seed)):
+        activity_id = 7100000000000000000 + index * 1000003
+        likes = rng.choice([rng.randint(0, 999), rng.randint(1000, 9999), rng.randint(10000, 90000)])
+        avatar = media = ""
+        if with_media:
+            avatar = _AVATAR_TEMPLATE.format(media=MEDIA_DIR, seed=seed, index=index)
+            template = _VIDEO_TEMPLATE if index % 5 == 4 else _IMAGE_TEMPLATE
+            media = template.format(media=MEDIA_DIR, seed=seed, index=index)
+        posts.append(_POST_TEMPLATE.format(
+            activity_id=activity_id,
+            profile_url=post["profile_url"],
+            profile_name=html.escape(post["profile_name"]),
+            age=f"{rng.randint(1, 11)}mo",
+            content=_content_html(post["post_content"]),
+            slug=post["profile_name"].lower().replace(" ", "-"),
+            suffix=f"{rng.getrandbits(16):04x}",
+            likes=_format_count(likes),
+            comments=post["comments"],
+            shares=post["shares"],
+            avatar=avatar,
+            media=media,
+        ))
+    head = _MEDIA_HEAD.format(media=MEDIA_DIR) if with_media else ""
+    if not page_size or page_size >= post_count:
+        return _PAGE_TEMPLATE.format(head=head, posts="\n".join(posts), infinite_scroll="")
+
+    infinite_scroll = _INFINITE_SCROLL_TEMPLATE.format(
+        posts="\n".join(posts[page_size:]), page_size=page_size, load_delay_ms=load_delay_ms
+    )
+    return _PAGE_TEMPLATE.format(head=head, posts="\n".join(posts[:page_size]), infinite_scroll=infinite_scroll)
+
+
+def _bmp(width, height, seed):
+    """Build an uncompressed 24-bit BMP of random noise."""
+    row = width * 3
+    padding = (4 - row % 4) % 4
+    rng = random.Random(seed)
+    pixels = b"".join(rng.randbytes(row) + b"\0" * padding for _ in range(height))
+    header = struct.pack("<2sIHHI", b"BM", 54 + len(pixels), 0, 0, 54)
+    info = struct.pack("<IiiHHIIiiII", 40, width, height, 1, 24, 0, len(pixels), 2835, 2835, 0, 0)
+    return header + info + pixels
+
+
+def write_media(directory):
+    """Write the media files referenced by pages built with with_media.
+
+    Images are real BMPs; the font and video are random bytes of a typical
+    size, which the browser still downloads before failing to decode them.
+
+    Args:
+        directory: Fixture directory (files go to its media/ subdirectory)
+
+    Returns:
+        Total bytes written
+    """
+    media_dir = os.path.join(directory, MEDIA_DIR)
+    os.makedirs(media_dir, exist_ok=True)
+    rng = random.Random(0)
+    files = {
+        "avatar.bmp": _bmp(48, 48, 1),
+        "image.bmp": _bmp(552, 414, 2),
+        "font.woff2": rng.randbytes(60_000),
+        "clip.mp4": rng.randbytes(2_000_000),
+    }
+    for name, data in files.items():
+        with open(os.path.join(media_dir, name), "wb") as f:
+            f.write(data)
+    return sum(len(data) for data in files.values())
+
+
+def fixture_path(directory, post_count):
+    """Get the file name of the fixture with post_count posts."""
+    return os.path.join(directory, f"activity_{post_count}.html")
+
+
+def write_fixtures(directory, sizes=FIXTURE_SIZES):
+    """Write fixture pages to directory, skipping ones that already exist.
+
+    Args:
+        directory: Output directory
+        sizes: Post counts to generate
+
+    Returns:
+        Dictionary of post count -> file path
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for size in sizes:
+        path = fixture_path(directory, size)
+        if not os.path.exists(path):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(activity_page_html(size))
+        paths[size] = path
+    return paths
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write synthetic activity-page fixtures")
+    parser.add_argument("--output", default=os.path.join("benchmarks", "fixtures"), help="Output directory")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(FIXTURE_SIZES), help="Posts per page")
+    args = parser.parse_args()
+
+    for size, path in write_fixtures(args.output, args.sizes).items():
+        print(f"{size:>6} posts  {path}")
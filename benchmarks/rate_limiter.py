@@ -0,0 +1,103 @@
+"""Benchmark the SQLite-backed token-bucket rate limiter across processes.
+
+Several processes acquire navigation slots for the same host and account
+from one database, as scraper processes on one machine do. The achieved
+rate should match the stricter configured limit, whatever the process
+count, and the per-call cost shows what every page load pays for it.
+
+    python -m benchmarks.rate_limiter --processes 4 --per-minute 600 --seconds 10
+"""
+import os
+import time
+import shutil
+import tempfile
+import multiprocessing
+
+from src.db_pool import configure_pool
+from src.migrations import apply_migrations
+from src.rate_limiter import TokenBucketRateLimiter, navigation_keys
+
+KEYS = navigation_keys("https://www.linkedin.com/in/benchmark/", "benchmark@example.com")
+
+
+def _worker(db_path, limits, deadline, results):
+    """Acquire slots until the deadline and report their timestamps."""
+    configure_pool(db_path)
+    limiter = TokenBucketRateLimiter(limits)
+    granted = []
+    while True:
+        wait = limiter.reserve(KEYS)
+        slot = time.time() + wait
+        if slot > deadline:
+            break
+        time.sleep(wait)
+        granted.append(time.time())
+    results.put(granted)
+
+
+def measure_overhead(db_path, calls):
+    """Average seconds per reserve() call on an unlimited bucket."""
+    configure_pool(db_path)
+    limiter = TokenBucketRateLimiter({"host": (1e9, 1e9), "account": (1e9, 1e9)})
+    started = time.perf_counter()
+    for _ in range(calls):
+        limiter.reserve(KEYS)
+    return (time.perf_counter() - started) / calls
+
+
+def main(process_counts, per_minute, burst, seconds):
+    directory = tempfile.mkdtemp(prefix="rate-limit-bench-")
+    try:
+        print(f"Limit {per_minute:.0f}/min (burst {burst}) on host and account, {seconds}s per run")
+        print(f"{'processes':>9} {'granted':>8} {'rate/min':>9} {'limit/min':>10} {'max gap s':>10}")
+        limits = {"host": (per_minute, burst), "account": (per_minute, burst)}
+        for processes in process_counts:
+            db_path = os.path.join(directory, f"limits-{processes}.db")
+            pool = configure_pool(db_path)
+            with pool.connection() as conn:
+                apply_migrations(conn)
+            pool.close()
+
+            results = multiprocessing.Queue()
+            started = time.time()
+            deadline = started + seconds
+            workers = [
+                multiprocessing.Process(target=_worker, args=(db_path, limits, deadline, results))
+                for _ in range(processes)
+            ]
+            for worker in workers:
+                worker.start()
+            granted = sorted(stamp for _ in workers for stamp in results.get())
+            for worker in workers:
+                worker.join()
+
+            # The initial burst is free; measure the sustained rate after it
+            sustained = granted[burst:]
+            rate = (len(sustained) - 1) / (sustained[-1] - sustained[0]) * 60 if len(sustained) > 1 else 0.0
+            gaps = [later - earlier for earlier, later in zip(sustained, sustained[1:])]
+            print(
+                f"{processes:>9} {len(granted):>8} {rate:>9.1f} {per_minute:>10.0f} "
+                f"{max(gaps, default=0.0):>10.3f}"
+            )
+
+        overhead_db = os.path.join(directory, "overhead.db")
+        pool = configure_pool(overhead_db)
+        with pool.connection() as conn:
+            apply_migrations(conn)
+        print(f"reserve() overhead: {measure_overhead(overhead_db, 2000) * 1e6:.0f} µs per call")
+        pool.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Measure the shared token-bucket rate limiter")
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4], help="Process counts to run")
+    parser.add_argument("--per-minute", type=float, default=600.0, help="Requests per minute per bucket")
+    parser.add_argument("--burst", type=int, default=3, help="Bucket size")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Duration of each run")
+    args = parser.parse_args()
+
+    main(args.processes, args.per_minute, args.burst, args.seconds)
@@ -0,0 +1,186 @@
+"""Benchmark engagement-driven re-scrape planning against round-robin scraping.
+
+Simulated profiles post at different rates and their posts gain engagement
+along saturating curves with random half-lives. Every run gets the same
+browser budget. Round-robin scrapes profiles in turn at a fixed depth; the
+planner picks profiles and depths from the stored engagement history. The
+report shows how much of the true engagement of young posts the database is
+missing on average, and how long new posts take to be discovered.
+
+    python -m benchmarks.rescrape_planner --profiles 200 --days 14 --runs-per-day 4 --budget-minutes 20
+"""
+import os
+import time
+import random
+import shutil
+import tempfile
+from datetime import datetime
+
+from src.db_pool import configure_pool
+from src.ingest import bulk_insert_posts
+from src.migrations import apply_migrations
+from src.rescrape_planner import plan_rescrape
+
+PAGE_SECONDS = 20.0
+SECONDS_PER_POST = 0.6
+
+
+def simulate_profiles(count, days, seed):
+    """Create profiles and every post they publish during the simulation.
+
+    Returns:
+        List of profile dictionaries with name, url and posts (newest last),
+        each post with post_url, published_at, scale and half_life hours
+    """
+    rng = random.Random(seed)
+    start = time.time() - (days + 30) * 86400
+    profiles = []
+    for index in range(count):
+        posts_per_day = min(rng.lognormvariate(-1.0, 1.0), 4.0)
+        scale = rng.lognormvariate(4.0, 1.2)
+        url = f"https://www.linkedin.com/in/sim-{index}/"
+        posts = []
+        moment = start + rng.expovariate(posts_per_day / 86400)
+        while moment < start + (days + 30) * 86400:
+            activity_id = (int(moment * 1000) << 22) | rng.getrandbits(22)
+            posts.append({
+                "post_url": f"https://www.linkedin.com/posts/sim-{index}-activity-{activity_id}-x",
+                "published_at": int(moment),
+                "scale": scale * rng.lognormvariate(0, 0.8),
+                "half_life": rng.lognormvariate(3.2, 0.5),
+            })
+            moment += rng.expovariate(posts_per_day / 86400)
+        profiles.append({"name": f"Sim {index}", "url": url, "posts": posts})
+    return profiles, start + 30 * 86400
+
+
+def true_engagement(post, now):
+    """Engagement of a post at a moment (0 before it is published)."""
+    age_hours = (now - post["published_at"]) / 3600
+    if age_hours <= 0:
+        return 0
+    return int(post["scale"] * (1 - 2 ** (-age_hours / post["half_life"])))
+
+
+def scrape(profile, depth, now, recorded, discovered, database):
+    """Record the newest depth posts of a profile as seen at now."""
+    visible = [post for post in profile["posts"] if post["published_at"] <= now][-depth:]
+    rows = []
+    for post in visible:
+        engagement = true_engagement(post, now)
+        recorded[post["post_url"]] = engagement
+        discovered.setdefault(post["post_url"], now)
+        rows.append({
+            "profile_url": profile["url"],
+            "profile_name": profile["name"],
+            "post_url": post["post_url"],
+            "published_at": post["published_at"],
+            "likes": engagement,
+            "collected_at": datetime.fromtimestamp(now).isoformat(),
+        })
+    if database and rows:
+        bulk_insert_posts(rows, upsert=True, record_snapshots=True)
+        with database.transaction() as conn:
+            conn.execute(
+                "INSERT INTO scrape_jobs (profile_url, profile_name, max_posts, refresh_engagement, incremental, "
+                "overlap, status, max_attempts, available_at, enqueued_at, started_at, finished_at) "
+                "VALUES (?, ?, ?, 1, 0, 0, 'done', 1, ?, ?, ?, ?)",
+                (profile["url"], profile["name"], depth, now, now, now, now)
+            )
+
+
+def missing_share(profiles, recorded, now, max_age_days):
+    """Share of the true engagement of posts up to max_age_days old that is not recorded."""
+    true_total = missing = 0
+    for profile in profiles:
+        for post in profile["posts"]:
+            if 0 <= now - post["published_at"] <= max_age_days * 86400:
+                engagement = true_engagement(post, now)
+                true_total += engagement
+                missing += engagement - recorded.get(post["post_url"], 0)
+    return missing / true_total if true_total else 0.0
+
+
+def run_strategy(name, profiles, start, args, database=None):
+    """Simulate every run of one strategy and report its freshness."""
+    recorded, discovered = {}, {}
+    budget = args.budget_minutes * 60
+    # Both strategies start from one full scrape of every profile
+    for profile in profiles:
+        scrape(profile, args.max_posts, start, recorded, discovered, database)
+
+    interval = 86400 / args.runs_per_day
+    cursor = 0
+    young, recent, planning = [], [], 0.0
+    for run in range(1, args.days * args.runs_per_day + 1):
+        now = start + run * interval
+        if database:
+            started = time.perf_counter()
+            plan = plan_rescrape(
+                profiles, budget_minutes=args.budget_minutes, max_posts=args.max_posts,
+                costs=(PAGE_SECONDS, SECONDS_PER_POST), now=now
+            )
+            planning += time.perf_counter() - started
+            by_url = {profile["url"]: profile for profile in profiles}
+            for item in plan["items"]:
+                scrape(by_url[item["url"]], item["max_posts"], now, recorded, discovered, database)
+        else:
+            spent = 0.0
+            cost = PAGE_SECONDS + args.uniform_depth * SECONDS_PER_POST
+            while spent + cost <= budget:
+                scrape(profiles[cursor % len(profiles)], args.uniform_depth, now, recorded, discovered, None)
+                cursor += 1
+                spent += cost
+        young.append(missing_share(profiles, recorded, now, 7))
+        recent.append(missing_share(profiles, recorded, now, 30))
+
+    end = start + args.days * 86400
+    lags = [
+        (discovered[post["post_url"]] - post["published_at"]) / 3600
+        for profile in profiles for post in profile["posts"]
+        if start < post["published_at"] <= end and post["post_url"] in discovered
+    ]
+    published = sum(1 for profile in profiles for post in profile["posts"] if start < post["published_at"] <= end)
+    print(
+        f"{name:>12} {sum(young) / len(young):>13.1%} {sum(recent) / len(recent):>14.1%} "
+        f"{sum(lags) / len(lags) if lags else 0:>15.1f} {len(lags):>6}/{published:<6} "
+        f"{planning / (args.days * args.runs_per_day) * 1000:>10.0f}"
+    )
+
+
+def main(args):
+    profiles, start = simulate_profiles(args.profiles, args.days, args.seed)
+    posts = sum(len(profile["posts"]) for profile in profiles)
+    print(
+        f"{args.profiles} profiles, {posts} posts, {args.days} days x {args.runs_per_day} runs, "
+        f"{args.budget_minutes:g} browser minutes per run"
+    )
+    print(
+        f"{'strategy':>12} {'missing <=7d':>13} {'missing <=30d':>14} {'discovery lag h':>15} "
+        f"{'found':>13} {'plan ms':>10}"
+    )
+    run_strategy("round-robin", profiles, start, args)
+
+    directory = tempfile.mkdtemp(prefix="rescrape-bench-")
+    try:
+        pool = configure_pool(os.path.join(directory, "planner.db"))
+        with pool.connection() as conn:
+            apply_migrations(conn)
+        run_strategy("planner", profiles, start, args, database=pool)
+        pool.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare re-scrape planning with round-robin scraping")
+    parser.add_argument("--profiles", type=int, default=200, help="Simulated profiles")
+    parser.add_argument("--days", type=int, default=14, help="Simulated days")
+    parser.add_argument("--runs-per-day", type=int, default=4, help="Scrape runs per day")
+    parser.add_argument("--budget-minutes", type=float, default=20, help="Browser minutes per run")
+    parser.add_argument("--max-posts", type=int, default=30, help="Deepest planned scrape")
+    parser.add_argument("--uniform-depth", type=int, default=20, help="Posts per round-robin scrape")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    main(parser.parse_args())
@@ -0,0 +1,104 @@
+"""Benchmark profile throughput of ScrapeOrchestrator against worker count.
+
+Uses simulated scrapers that take a fixed time per profile, so the numbers
+show orchestration overhead and scaling rather than LinkedIn latency. Each
+profile load takes a token from a shared TokenBucketRateLimiter, as
+LinkedInScraper's page loads do.
+
+    python -m benchmarks.scrape_orchestrator --profiles 16 --scrape-seconds 2
+"""
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.compression import synthetic_posts
+from src.db_pool import configure_pool
+from src.migrations import apply_migrations
+from src.rate_limiter import TokenBucketRateLimiter, navigation_keys
+from src.scrape_orchestrator import ScrapeOrchestrator
+
+
+class SimulatedScraper:
+    def __init__(self, scrape_seconds, posts_per_profile, rate_limiter):
+        """Initialize a scraper that sleeps instead of driving a browser."""
+        self.scrape_seconds = scrape_seconds
+        self.posts_per_profile = posts_per_profile
+        self.rate_limiter = rate_limiter
+
+    def scrape_profile_posts(self, profile_url, profile_name, max_posts=20, known_urls=None, overlap=0,
+                             on_posts=None):
+        """Return synthetic posts after a fixed delay, streaming them in batches of 10."""
+        self.rate_limiter.acquire(navigation_keys(profile_url))
+        time.sleep(self.scrape_seconds)
+        posts = list(synthetic_posts(min(max_posts, self.posts_per_profile), seed=hash(profile_url)))
+        for index, post in enumerate(posts):
+            post["profile_url"] = profile_url
+            post["profile_name"] = profile_name
+            post["post_url"] = f"{profile_url}/posts/{index}"
+            post["collected_at"] = datetime.now().isoformat()
+        if on_posts:
+            for start in range(0, len(posts), 10):
+                on_posts(posts[start:start + 10])
+        return posts
+
+    def close(self):
+        """Nothing to release."""
+
+
+def run(workers, profile_count, scrape_seconds, interval, posts_per_profile):
+    """Scrape simulated profiles with a given number of workers."""
+    # One token per interval on every bucket, without bursts
+    per_minute = 60.0 / interval
+    rate_limiter = TokenBucketRateLimiter({"host": (per_minute, 1), "account": (per_minute, 1)})
+    orchestrator = ScrapeOrchestrator(
+        workers=workers,
+        max_posts_per_profile=posts_per_profile,
+        rate_limiter=rate_limiter,
+        scraper_factory=lambda: SimulatedScraper(scrape_seconds, posts_per_profile, rate_limiter)
+    )
+    profiles = [
+        {"name": f"Profile {i}", "url": f"https://www.linkedin.com/in/profile-{workers}-{i}"}
+        for i in range(profile_count)
+    ]
+    return orchestrator.run(profiles)
+
+
+def main(profile_count, scrape_seconds, interval, posts_per_profile, worker_counts):
+    directory = tempfile.mkdtemp(prefix="orchestrator-bench-")
+    try:
+        pool = configure_pool(os.path.join(directory, "posts.db"))
+        with pool.connection() as conn:
+            apply_migrations(conn)
+
+        print(
+            f"{profile_count} profiles, {scrape_seconds}s per profile, "
+            f"{interval}s global rate limit, {posts_per_profile} posts each"
+        )
+        print(f"{'workers':>7} {'elapsed s':>10} {'profiles/min':>13} {'speedup':>8}")
+        baseline = None
+        for workers in worker_counts:
+            summary = run(workers, profile_count, scrape_seconds, interval, posts_per_profile)
+            baseline = baseline or summary["profiles_per_minute"]
+            print(
+                f"{workers:>7} {summary['elapsed']:>10.2f} {summary['profiles_per_minute']:>13.1f} "
+                f"{summary['profiles_per_minute'] / baseline:>8.2f}"
+            )
+        pool.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark parallel profile scraping")
+    parser.add_argument("--profiles", type=int, default=16, help="Number of simulated profiles")
+    parser.add_argument("--scrape-seconds", type=float, default=2.0, help="Simulated time per profile")
+    parser.add_argument("--interval", type=float, default=0.1, help="Seconds between profile starts")
+    parser.add_argument("--posts", type=int, default=20, help="Posts per profile")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="Worker counts to try")
+    args = parser.parse_args()
+
+    main(args.profiles, args.scrape_seconds, args.interval, args.posts, args.workers)
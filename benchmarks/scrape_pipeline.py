@@ -0,0 +1,136 @@
+"""Benchmark the staged scrape pipeline against the one-step orchestrator.
+
+Simulated browsers take a fixed time to load each profile and return the
+HTML of a synthetic activity page, so the parse and write stages do their
+real work on BeautifulSoup and SQLite. The per-stage table shows where
+the time goes and which stage limits throughput.
+
+    python -m benchmarks.scrape_pipeline --profiles 40 --posts 50 --fetch-seconds 0.2
+"""
+import os
+import time
+import shutil
+import tempfile
+
+from benchmarks.fixtures import activity_page_html
+from src.data_collection import parse_capture
+from src.db_pool import configure_pool
+from src.migrations import apply_migrations
+from src.scrape_orchestrator import ScrapeOrchestrator
+from src.scrape_pipeline import STAGES, ScrapePipeline
+
+
+class SimulatedPageScraper:
+    def __init__(self, fetch_seconds, pages):
+        """Initialize a scraper that sleeps instead of loading pages.
+
+        Args:
+            fetch_seconds: Simulated load and scroll time per profile
+            pages: Dictionary of profile URL -> activity page HTML
+        """
+        self.fetch_seconds = fetch_seconds
+        self.pages = pages
+        self._current = None
+
+    def streaming_callback(self, profile_url, profile_name, max_posts, known_urls, overlap, on_posts, streamed):
+        """Nothing is streamed while scrolling; the writer saves whole pages."""
+        return None
+
+    def load_activity_page(self, profile_url, profile_name, max_posts=20, known_urls=None, overlap=0,
+                           on_scroll=None):
+        """Pretend to load and scroll the profile's page."""
+        time.sleep(self.fetch_seconds)
+        self._current = profile_url
+        return True
+
+    def capture_raw_posts(self, max_posts):
+        """Return the page source of the loaded profile."""
+        return {"html": self.pages[self._current], "base_url": self._current}
+
+    def scrape_profile_posts(self, profile_url, profile_name, max_posts=20, known_urls=None, overlap=0,
+                             on_posts=None):
+        """Load, parse and stream a profile in one step, as ScrapeOrchestrator expects."""
+        self.load_activity_page(profile_url, profile_name, max_posts)
+        posts = parse_capture(self.capture_raw_posts(max_posts), profile_url, profile_name, max_posts)
+        if on_posts:
+            on_posts(posts)
+        return posts
+
+    def close(self):
+        """Nothing to release."""
+
+
+def _fresh_database(directory, name):
+    """Point the pool at a new migrated database."""
+    pool = configure_pool(os.path.join(directory, f"{name}.db"))
+    with pool.connection() as conn:
+        apply_migrations(conn)
+    return pool
+
+
+def main(profile_count, post_count, fetch_seconds, fetch_workers, parse_worker_counts, parse_processes):
+    directory = tempfile.mkdtemp(prefix="pipeline-bench-")
+    try:
+        profiles = [
+            {"name": f"Profile {i}", "url": f"https://www.linkedin.com/in/pipeline-{i}/"}
+            for i in range(profile_count)
+        ]
+        pages = {profile["url"]: activity_page_html(post_count, seed=i) for i, profile in enumerate(profiles)}
+        factory = lambda: SimulatedPageScraper(fetch_seconds, pages)
+
+        print(
+            f"{profile_count} profiles x {post_count} posts, {fetch_seconds}s simulated fetch, "
+            f"{fetch_workers} browser workers"
+        )
+
+        pool = _fresh_database(directory, "orchestrator")
+        summary = ScrapeOrchestrator(
+            workers=fetch_workers, max_posts_per_profile=post_count, scraper_factory=factory
+        ).run(profiles)
+        pool.close()
+        print(f"one-step orchestrator: {summary['elapsed']:.2f}s, {summary['profiles_per_minute']:.0f} profiles/min")
+
+        for parse_workers in parse_worker_counts:
+            pool = _fresh_database(directory, f"pipeline-{parse_workers}")
+            summary = ScrapePipeline(
+                fetch_workers=fetch_workers, parse_workers=parse_workers, parse_processes=parse_processes,
+                max_posts_per_profile=post_count, scraper_factory=factory
+            ).run(profiles)
+            pool.close()
+
+            stages = summary["stages"]
+            print(
+                f"\npipeline, {parse_workers} parse {'processes' if parse_processes else 'threads'}: "
+                f"{summary['elapsed']:.2f}s, "
+                f"{summary['profiles_per_minute']:.0f} profiles/min, bottleneck: {stages['bottleneck']}"
+            )
+            print(
+                f"{'stage':>6} {'workers':>8} {'items':>6} {'records':>8} {'items/s':>8} {'avg ms':>7} "
+                f"{'max ms':>7} {'util':>5} {'starved s':>10} {'blocked s':>10} {'max queue':>10}"
+            )
+            for name in STAGES:
+                stage = stages[name]
+                print(
+                    f"{name:>6} {stage['workers']:>8} {stage['items']:>6} {stage['records']:>8} "
+                    f"{stage['throughput']:>8.1f} {stage['avg_latency'] * 1000:>7.1f} "
+                    f"{stage['max_latency'] * 1000:>7.1f} {stage['utilization']:>5.0%} "
+                    f"{stage['starved']:>10.2f} {stage['blocked']:>10.2f} {stage['max_queue_depth']:>10}"
+                )
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Measure per-stage throughput of the scrape pipeline")
+    parser.add_argument("--profiles", type=int, default=40, help="Simulated profiles")
+    parser.add_argument("--posts", type=int, default=50, help="Posts per profile page")
+    parser.add_argument("--fetch-seconds", type=float, default=0.2, help="Simulated browser time per profile")
+    parser.add_argument("--fetch-workers", type=int, default=4, help="Browser workers")
+    parser.add_argument("--parse-workers", type=int, nargs="+", default=[1, 2, 4], help="Parser thread counts")
+    parser.add_argument("--parse-processes", action="store_true", help="Parse in a process pool")
+    args = parser.parse_args()
+
+    main(args.profiles, args.posts, args.fetch_seconds, args.fetch_workers, args.parse_workers,
+         args.parse_processes)
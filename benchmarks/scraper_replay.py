@@ -0,0 +1,184 @@
+"""Benchmark LinkedInScraper offline against recorded activity pages.
+
+Fixtures of 10, 100 and 1000 posts are written to a temporary directory.
+The parser section needs no browser. It reports posts/second, the cost of
+each field selector and the peak Python memory. With --browser, the full
+scrape_profile_posts runs in replay mode in headless Chrome, once per
+extraction mode. The pages load from file:// URLs, or from a local HTTP
+server with --server.
+
+    python -m benchmarks.scraper_replay --browser --server
+"""
+import gc
+import os
+import time
+import shutil
+import tempfile
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+from benchmarks.fixtures import FIXTURE_SIZES, activity_page_html
+from src.data_collection import (
+    EXTRACTION_MODES,
+    HTML_PARSER,
+    POST_CONTAINER_SELECTOR,
+    POST_FIELD_SELECTORS,
+    LinkedInScraper,
+    build_post,
+    parse_activity_html,
+)
+from src.replay import ReplayServer, replay_page_name
+
+_JS_HEAP_SCRIPT = "return performance.memory ? performance.memory.usedJSHeapSize : null"
+
+
+def fixture_profile_url(post_count):
+    """Profile URL whose replay snapshot is the post_count fixture."""
+    return f"https://www.linkedin.com/in/fixture-{post_count}"
+
+
+def write_replay_fixtures(directory, sizes):
+    """Write one snapshot per size under the names replay mode looks up."""
+    html_by_size = {}
+    for size in sizes:
+        html = activity_page_html(size)
+        path = os.path.join(directory, replay_page_name(fixture_profile_url(size)))
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(html)
+        html_by_size[size] = html
+    return html_by_size
+
+
+def _parse(html, post_count):
+    """Run the page_source parsing pipeline the soup extraction mode uses."""
+    return [build_post(raw, fixture_profile_url(post_count), "Fixture") for raw in parse_activity_html(html)]
+
+
+def bench_parser(html, post_count):
+    """Time the parsing pipeline, then measure its peak memory in a second run.
+
+    tracemalloc slows allocation-heavy code several times over, so it is
+    kept out of the timed run.
+    """
+    gc.collect()
+    started = time.perf_counter()
+    posts = _parse(html, post_count)
+    elapsed = time.perf_counter() - started
+    if len(posts) != post_count:
+        raise AssertionError(f"expected {post_count} posts, parsed {len(posts)}")
+
+    tracemalloc.start()
+    _parse(html, post_count)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def bench_fields(html, repeat=3):
+    """Time building the tree and each field selector across all posts.
+
+    Returns:
+        Dictionary of step -> best time in seconds over repeat runs
+    """
+    best = {}
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        soup = BeautifulSoup(html, HTML_PARSER)
+        costs = {"tree": time.perf_counter() - started}
+
+        started = time.perf_counter()
+        containers = soup.select(POST_CONTAINER_SELECTOR)
+        costs["containers"] = time.perf_counter() - started
+
+        for field, selector in POST_FIELD_SELECTORS.items():
+            started = time.perf_counter()
+            for container in containers:
+                container.select_one(selector)
+            costs[field] = time.perf_counter() - started
+
+        best = {step: min(cost, best.get(step, cost)) for step, cost in costs.items()}
+    return best
+
+
+def bench_browser(source, sizes):
+    """Run the full scraper in replay mode for every extraction mode."""
+    rows = []
+    for mode in EXTRACTION_MODES:
+        scraper = LinkedInScraper(
+            headless=True, extraction_mode=mode, replay_source=source,
+            adaptive_scroll=False, scroll_pause=(0, 0), min_scroll_interval=0
+        )
+        try:
+            for size in sizes:
+                started = time.perf_counter()
+                posts = scraper.scrape_profile_posts(fixture_profile_url(size), "Fixture", max_posts=size)
+                elapsed = time.perf_counter() - started
+
+                tracemalloc.start()
+                scraper._extract_posts(fixture_profile_url(size), "Fixture", size)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                js_heap = scraper.driver.execute_script(_JS_HEAP_SCRIPT)
+                rows.append((mode, size, len(posts), elapsed, peak, js_heap))
+        finally:
+            scraper.close()
+    return rows
+
+
+def main(sizes, browser, server):
+    directory = tempfile.mkdtemp(prefix="replay-bench-")
+    try:
+        html_by_size = write_replay_fixtures(directory, sizes)
+        _parse(html_by_size[sizes[0]], sizes[0])  # warm up imports and selector caches
+
+        print(f"Parser ({HTML_PARSER})")
+        print(f"{'posts':>6} {'seconds':>9} {'posts/s':>9} {'peak MB':>8}")
+        for size in sizes:
+            elapsed, peak = bench_parser(html_by_size[size], size)
+            print(f"{size:>6} {elapsed:>9.3f} {size / elapsed:>9.0f} {peak / 1e6:>8.1f}")
+
+        print("\nPer-field cost (microseconds per post, best of 3)")
+        fields = ["tree", "containers"] + list(POST_FIELD_SELECTORS)
+        print(f"{'posts':>6} " + " ".join(f"{field:>12}" for field in fields))
+        for size in sizes:
+            costs = bench_fields(html_by_size[size])
+            print(f"{size:>6} " + " ".join(f"{costs[field] / size * 1e6:>12.1f}" for field in fields))
+
+        if not browser:
+            return
+
+        with ReplayServer(directory) if server else _NoServer(directory) as replay:
+            source = replay.base_url if server else directory
+            print(f"\nFull scrape in replay mode from {source}")
+            print(f"{'mode':>8} {'posts':>6} {'seconds':>9} {'posts/s':>9} {'extract MB':>11} {'js heap MB':>11}")
+            for mode, size, found, elapsed, peak, js_heap in bench_browser(source, sizes):
+                heap = f"{js_heap / 1e6:>11.1f}" if js_heap else f"{'n/a':>11}"
+                print(f"{mode:>8} {found:>6} {elapsed:>9.2f} {found / elapsed:>9.0f} {peak / 1e6:>11.1f} {heap}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+class _NoServer:
+    def __init__(self, directory):
+        """Stand-in for ReplayServer when pages load from file:// URLs."""
+        self.base_url = directory
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the scraper against recorded activity pages")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(FIXTURE_SIZES), help="Posts per fixture")
+    parser.add_argument("--browser", action="store_true", help="Also run the full scraper in headless Chrome")
+    parser.add_argument("--server", action="store_true", help="Serve fixtures over HTTP instead of file://")
+    args = parser.parse_args()
+
+    main(args.sizes, args.browser, args.server)
@@ -0,0 +1,75 @@
+"""Benchmark fixed-sleep against adaptive scrolling on an infinite-scroll page.
+
+The fixture shows one page of posts and appends the next page a fixed
+delay after each scroll to the bottom, like the LinkedIn activity feed.
+Both strategies scrape it through replay mode in headless Chrome.
+
+    python -m benchmarks.scroll --posts 100 --page-size 10 --load-delay 300
+"""
+import os
+import time
+import shutil
+import tempfile
+
+from benchmarks.fixtures import activity_page_html
+from src.data_collection import LinkedInScraper
+from src.replay import ReplayServer, replay_page_name
+
+PROFILE_URL = "https://www.linkedin.com/in/scroll-benchmark"
+
+STRATEGIES = {
+    "fixed": {"adaptive_scroll": False},
+    "adaptive": {"adaptive_scroll": True},
+}
+
+
+def run(source, strategy, post_count, min_scroll_interval):
+    """Scrape the fixture once and return elapsed time and scroll summary."""
+    scraper = LinkedInScraper(
+        headless=True,
+        replay_source=source,
+        min_scroll_interval=min_scroll_interval,
+        **STRATEGIES[strategy]
+    )
+    try:
+        started = time.perf_counter()
+        posts = scraper.scrape_profile_posts(PROFILE_URL, "Scroll Benchmark", max_posts=post_count)
+        elapsed = time.perf_counter() - started
+        return len(posts), elapsed, scraper.get_scroll_summary()
+    finally:
+        scraper.close()
+
+
+def main(post_count, page_size, load_delay_ms, min_scroll_interval):
+    directory = tempfile.mkdtemp(prefix="scroll-bench-")
+    try:
+        with open(os.path.join(directory, replay_page_name(PROFILE_URL)), "w", encoding="utf-8") as f:
+            f.write(activity_page_html(post_count, page_size=page_size, load_delay_ms=load_delay_ms))
+
+        print(
+            f"{post_count} posts, {page_size} per page, {load_delay_ms} ms load delay, "
+            f"scrolls at most every {min_scroll_interval}s"
+        )
+        print(f"{'strategy':>9} {'posts':>6} {'seconds':>8} {'scrolls':>8} {'avg lat s':>10} {'max lat s':>10} {'timeouts':>9}")
+        with ReplayServer(directory) as server:
+            for strategy in STRATEGIES:
+                found, elapsed, summary = run(server.base_url, strategy, post_count, min_scroll_interval)
+                print(
+                    f"{strategy:>9} {found:>6} {elapsed:>8.1f} {summary['scrolls']:>8} "
+                    f"{summary['avg_latency']:>10.2f} {summary['max_latency']:>10.2f} {summary['timeouts']:>9}"
+                )
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare fixed and adaptive scroll waiting")
+    parser.add_argument("--posts", type=int, default=100, help="Posts on the fixture page")
+    parser.add_argument("--page-size", type=int, default=10, help="Posts loaded per scroll")
+    parser.add_argument("--load-delay", type=int, default=300, help="Milliseconds before a page of posts appears")
+    parser.add_argument("--min-interval", type=float, default=1.5, help="Minimum seconds between scrolls")
+    args = parser.parse_args()
+
+    main(args.posts, args.page_size, args.load_delay, args.min_interval)
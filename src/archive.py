@@ -0,0 +1,436 @@
+import os
+import sqlite3
+import logging
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from src.db_pool import get_pool
+from src.publish_dates import backfill_published_at
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = os.path.join('data', 'archive')
+
+# Posts collected longer ago than this are moved out of the hot database
+ARCHIVE_HORIZON_DAYS = int(os.getenv("LINKEDIN_ARCHIVE_HORIZON_DAYS", "180"))
+
+# Names of the temporary views that combine hot and archived rows
+POSTS_HISTORY_VIEW = "posts_history"
+HASHTAGS_HISTORY_VIEW = "post_hashtags_history"
+FEATURES_HISTORY_VIEW = "post_features_history"
+
+# Stored columns of posts (total_engagement is generated in both databases)
+ARCHIVED_POST_COLUMNS = (
+    "id",
+    "profile_url",
+    "profile_name",
+    "post_url",
+    "post_content",
+    "publish_date",
+    "published_at",
+    "likes",
+    "comments",
+    "shares",
+    "collected_at",
+)
+
+_SNAPSHOT_COLUMNS = ("id", "post_id", "captured_at", "likes", "comments", "shares")
+
+_FEATURE_COLUMNS = (
+    "post_id", "content_length", "word_count", "hashtag_count", "has_url",
+    "has_mention", "has_emoji", "has_question", "sentence_count",
+)
+
+# Schema of a monthly archive file; {schema} is the attached database name
+_ARCHIVE_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS {schema}.posts (
+        id INTEGER PRIMARY KEY,
+        profile_url TEXT,
+        profile_name TEXT,
+        post_url TEXT UNIQUE,
+        post_content TEXT,
+        publish_date TEXT,
+        published_at INTEGER,
+        likes INTEGER,
+        comments INTEGER,
+        shares INTEGER,
+        collected_at TEXT,
+        total_engagement INTEGER GENERATED ALWAYS AS
+            (COALESCE(likes, 0) + COALESCE(comments, 0) + COALESCE(shares, 0)) VIRTUAL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_posts_total_engagement ON posts (total_engagement DESC)",
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_posts_profile_engagement ON posts (profile_name, total_engagement DESC)",
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_posts_published_engagement ON posts (published_at, likes, comments, shares)",
+    """
+    CREATE TABLE IF NOT EXISTS {schema}.post_hashtags (
+        post_id INTEGER NOT NULL REFERENCES posts (id) ON DELETE CASCADE,
+        tag TEXT NOT NULL,
+        occurrences INTEGER NOT NULL DEFAULT 1,
+        PRIMARY KEY (post_id, tag)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_post_hashtags_tag ON post_hashtags (tag, post_id)",
+    """
+    CREATE TABLE IF NOT EXISTS {schema}.post_engagement_snapshots (
+        id INTEGER PRIMARY KEY,
+        post_id INTEGER NOT NULL REFERENCES posts (id) ON DELETE CASCADE,
+        captured_at TEXT NOT NULL,
+        likes INTEGER,
+        comments INTEGER,
+        shares INTEGER
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_engagement_snapshots_post_time "
+    "ON post_engagement_snapshots (post_id, captured_at)",
+    """
+    CREATE TABLE IF NOT EXISTS {schema}.post_features (
+        post_id INTEGER PRIMARY KEY REFERENCES posts (id) ON DELETE CASCADE,
+        content_length INTEGER NOT NULL,
+        word_count INTEGER NOT NULL,
+        hashtag_count INTEGER NOT NULL,
+        has_url INTEGER NOT NULL,
+        has_mention INTEGER NOT NULL,
+        has_emoji INTEGER NOT NULL,
+        has_question INTEGER NOT NULL,
+        sentence_count INTEGER NOT NULL
+    )
+    """,
+)
+
+# Posts of one month that are older than the horizon. Parameters: month
+# start, next month start, cutoff.
+_MONTH_FILTER = "collected_at >= ? AND collected_at < ? AND collected_at < ?"
+
+
+def archive_path(month, archive_dir=ARCHIVE_DIR):
+    """Get the archive file for a month.
+
+    Args:
+        month: Month as YYYY-MM
+        archive_dir: Directory holding the archive files
+
+    Returns:
+        Path of the archive database
+    """
+    return os.path.join(archive_dir, f"posts_{month.replace('-', '_')}.db")
+
+
+def _upgrade_archive(conn, schema):
+    """Add columns and tables introduced after an attached archive file was written."""
+    from src.features import backfill_post_features
+    from src.hashtags import backfill_hashtag_occurrences
+
+    columns = {row[1] for row in conn.execute(f"PRAGMA {schema}.table_xinfo(posts)").fetchall()}
+    if columns and "published_at" not in columns:
+        with get_pool().transaction():
+            conn.execute(f"ALTER TABLE {schema}.posts ADD COLUMN published_at INTEGER")
+            backfill_published_at(conn, f"{schema}.posts")
+
+    tag_columns = {row[1] for row in conn.execute(f"PRAGMA {schema}.table_info(post_hashtags)").fetchall()}
+    if tag_columns and "occurrences" not in tag_columns:
+        with get_pool().transaction():
+            conn.execute(f"ALTER TABLE {schema}.post_hashtags ADD COLUMN occurrences INTEGER NOT NULL DEFAULT 1")
+            backfill_hashtag_occurrences(conn, schema)
+
+    tables = {row[0] for row in conn.execute(f"SELECT name FROM {schema}.sqlite_master WHERE type = 'table'")}
+    if columns and "post_features" not in tables:
+        with get_pool().transaction():
+            conn.execute(_ARCHIVE_SCHEMA[-1].format(schema=schema))
+            backfill_post_features(conn, schema)
+
+
+def _next_month(month):
+    """Get the YYYY-MM string of the month after month."""
+    year, month_number = (int(part) for part in month.split("-"))
+    if month_number == 12:
+        return f"{year + 1:04d}-01"
+    return f"{year:04d}-{month_number + 1:02d}"
+
+
+def _archive_month(conn, month, cutoff, archive_dir):
+    """Move one month of old posts into its archive file.
+
+    Rows are copied and committed to the archive first, then deleted from the
+    hot database in a second transaction. A crash in between leaves the rows
+    in both places; the history views prefer the hot copy and the next run
+    replaces the archived one.
+    """
+    pool = get_pool()
+    path = archive_path(month, archive_dir)
+    params = (month, _next_month(month), cutoff)
+    columns = ", ".join(ARCHIVED_POST_COLUMNS)
+    snapshot_columns = ", ".join(_SNAPSHOT_COLUMNS)
+    feature_columns = ", ".join(_FEATURE_COLUMNS)
+
+    conn.execute("ATTACH DATABASE ? AS archive", (path,))
+    try:
+        with pool.transaction():
+            _upgrade_archive(conn, "archive")
+            for statement in _ARCHIVE_SCHEMA:
+                conn.execute(statement.format(schema="archive"))
+
+            # A post that was archived, re-scraped and aged out again replaces
+            # its older archived copy (cascading to its tags and snapshots)
+            conn.execute(
+                f"DELETE FROM archive.posts WHERE post_url IN "
+                f"(SELECT post_url FROM main.posts WHERE {_MONTH_FILTER})",
+                params
+            )
+            conn.execute(
+                f"INSERT INTO archive.posts ({columns}) "
+                f"SELECT {columns} FROM main.posts WHERE {_MONTH_FILTER}",
+                params
+            )
+            conn.execute(
+                f"""
+                INSERT OR IGNORE INTO archive.post_hashtags (post_id, tag, occurrences)
+                SELECT h.post_id, h.tag, h.occurrences FROM main.post_hashtags h
+                WHERE h.post_id IN (SELECT id FROM main.posts WHERE {_MONTH_FILTER})
+                """,
+                params
+            )
+            conn.execute(
+                f"""
+                INSERT OR IGNORE INTO archive.post_features ({feature_columns})
+                SELECT {feature_columns} FROM main.post_features
+                WHERE post_id IN (SELECT id FROM main.posts WHERE {_MONTH_FILTER})
+                """,
+                params
+            )
+            conn.execute(
+                f"""
+                INSERT OR IGNORE INTO archive.post_engagement_snapshots ({snapshot_columns})
+                SELECT {snapshot_columns} FROM main.post_engagement_snapshots
+                WHERE post_id IN (SELECT id FROM main.posts WHERE {_MONTH_FILTER})
+                """,
+                params
+            )
+
+        with pool.transaction():
+            # Only rows that made it into the archive are removed; tags,
+            # snapshots, features and FTS entries follow through cascades and triggers
+            moved = conn.execute(
+                f"DELETE FROM main.posts WHERE {_MONTH_FILTER} AND id IN (SELECT id FROM archive.posts)",
+                params
+            ).rowcount
+
+            conn.execute("DELETE FROM main.posts_rollup WHERE month = ?", (month,))
+            conn.execute(
+                """
+                INSERT INTO main.posts_rollup (month, profile_name, post_count, likes, comments, shares)
+                SELECT ?, COALESCE(profile_name, ''), COUNT(*),
+                       SUM(COALESCE(likes, 0)), SUM(COALESCE(comments, 0)), SUM(COALESCE(shares, 0))
+                FROM archive.posts
+                GROUP BY COALESCE(profile_name, '')
+                """,
+                (month,)
+            )
+            conn.execute(
+                """
+                INSERT INTO main.archive_partitions (month, path, post_count, archived_at)
+                VALUES (?, ?, (SELECT COUNT(*) FROM archive.posts), ?)
+                ON CONFLICT(month) DO UPDATE SET
+                    path = excluded.path,
+                    post_count = excluded.post_count,
+                    archived_at = excluded.archived_at
+                """,
+                (month, path, datetime.now().isoformat())
+            )
+    finally:
+        conn.execute("DETACH DATABASE archive")
+
+    logger.info(f"Archived {moved} posts from {month} to {path}")
+    return moved
+
+
+def archive_old_posts(horizon_days=None, now=None, archive_dir=ARCHIVE_DIR):
+    """Move posts collected before the horizon into monthly archive files.
+
+    Each month of old posts goes to data/archive/posts_YYYY_MM.db together
+    with its hashtags, engagement snapshots and features. Per-month, per-profile
+    totals stay in posts_rollup in the hot database.
+
+    Args:
+        horizon_days: Keep posts collected within this many days (defaults
+            to ARCHIVE_HORIZON_DAYS)
+        now: Reference time (defaults to the current time)
+        archive_dir: Directory for the archive files
+
+    Returns:
+        Dictionary of month -> number of posts archived
+    """
+    horizon_days = ARCHIVE_HORIZON_DAYS if horizon_days is None else horizon_days
+    cutoff = ((now or datetime.now()) - timedelta(days=horizon_days)).isoformat()
+    os.makedirs(archive_dir, exist_ok=True)
+
+    archived = {}
+    with get_pool().connection() as conn:
+        months = [
+            row[0] for row in conn.execute(
+                "SELECT DISTINCT substr(collected_at, 1, 7) FROM posts "
+                "WHERE collected_at < ? ORDER BY 1",
+                (cutoff,)
+            ).fetchall()
+        ]
+
+        for month in months:
+            try:
+                archived[month] = _archive_month(conn, month, cutoff, archive_dir)
+            except sqlite3.Error as e:
+                logger.error(f"Error archiving posts from {month}: {e}")
+
+    return archived
+
+
+def list_partitions():
+    """Get the archive partitions recorded in the hot database.
+
+    Returns:
+        List of partition dictionaries ordered by month
+    """
+    with get_pool().connection() as conn:
+        rows = conn.execute(
+            "SELECT month, path, post_count, archived_at FROM archive_partitions ORDER BY month"
+        ).fetchall()
+
+    return [
+        {"month": row[0], "path": row[1], "post_count": row[2], "archived_at": row[3]}
+        for row in rows
+    ]
+
+
+@contextmanager
+def posts_history(conn, since=None):
+    """Expose hot and archived posts through temporary UNION ALL views.
+
+    Inside the block, posts_history, post_hashtags_history and
+    post_features_history can be queried like posts, post_hashtags and
+    post_features. Only archive files for months on or after since are
+    attached, and SQLite limits how many can be attached at once (10 by
+    default), so narrow since if there are too many.
+
+    Args:
+        conn: SQLite connection from the pool
+        since: Optional earliest collected_at (ISO date) the caller needs
+
+    Yields:
+        The same connection
+
+    Raises:
+        ValueError: If more archive files are needed than can be attached
+    """
+    partitions = conn.execute(
+        "SELECT month, path FROM archive_partitions WHERE month >= ? ORDER BY month",
+        ((since or "")[:7],)
+    ).fetchall()
+    partitions = [(month, path) for month, path in partitions if os.path.exists(path)]
+
+    attached = len(conn.execute("PRAGMA database_list").fetchall())
+    available = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED) - (attached - 2)
+    if len(partitions) > available:
+        raise ValueError(
+            f"History needs {len(partitions)} archive files but only {available} can be "
+            f"attached; pass a later 'since'"
+        )
+
+    columns = ", ".join(ARCHIVED_POST_COLUMNS + ("total_engagement",))
+    feature_columns = ", ".join(_FEATURE_COLUMNS)
+    schemas = []
+    try:
+        for month, path in partitions:
+            schema = f"archive_{month.replace('-', '_')}"
+            conn.execute(f"ATTACH DATABASE ? AS {schema}", (path,))
+            schemas.append(schema)
+            _upgrade_archive(conn, schema)
+
+        # A post that was re-scraped after archiving exists more than once;
+        # the hot copy wins, then the copy in the newest archive
+        posts_selects = [f"SELECT {columns}, 0 AS archived FROM main.posts"]
+        hashtag_selects = ["SELECT post_id, tag, occurrences FROM main.post_hashtags"]
+        feature_selects = [f"SELECT {feature_columns} FROM main.post_features"]
+        for index, schema in enumerate(schemas):
+            newer = ["main"] + schemas[index + 1:]
+            posts_selects.append(
+                f"SELECT {columns}, 1 AS archived FROM {schema}.posts WHERE "
+                + " AND ".join(f"post_url NOT IN (SELECT post_url FROM {other}.posts)" for other in newer)
+            )
+            hashtag_selects.append(
+                f"SELECT h.post_id, h.tag, h.occurrences FROM {schema}.post_hashtags h "
+                f"JOIN {schema}.posts p ON p.id = h.post_id WHERE "
+                + " AND ".join(f"p.post_url NOT IN (SELECT post_url FROM {other}.posts)" for other in newer)
+            )
+            # Post ids are never reused, so archived features cannot shadow hot ones
+            feature_selects.append(f"SELECT {feature_columns} FROM {schema}.post_features")
+        conn.execute(
+            f"CREATE TEMP VIEW {POSTS_HISTORY_VIEW} AS " + " UNION ALL ".join(posts_selects)
+        )
+        conn.execute(
+            f"CREATE TEMP VIEW {HASHTAGS_HISTORY_VIEW} AS " + " UNION ALL ".join(hashtag_selects)
+        )
+        conn.execute(
+            f"CREATE TEMP VIEW {FEATURES_HISTORY_VIEW} AS " + " UNION ALL ".join(feature_selects)
+        )
+        yield conn
+    finally:
+        conn.execute(f"DROP VIEW IF EXISTS temp.{POSTS_HISTORY_VIEW}")
+        conn.execute(f"DROP VIEW IF EXISTS temp.{HASHTAGS_HISTORY_VIEW}")
+        conn.execute(f"DROP VIEW IF EXISTS temp.{FEATURES_HISTORY_VIEW}")
+        for schema in schemas:
+            conn.execute(f"DETACH DATABASE {schema}")
+
+
+def monthly_engagement(profile_name=None):
+    """Get per-month engagement totals across hot and archived posts.
+
+    Archived months come from posts_rollup, so no archive file is opened.
+
+    Args:
+        profile_name: Optional filter by profile name
+
+    Returns:
+        List of dictionaries with month, post_count, likes, comments and shares
+    """
+    with get_pool().connection() as conn:
+        rows = conn.execute(
+            """
+            SELECT month, SUM(post_count), SUM(likes), SUM(comments), SUM(shares)
+            FROM (
+                SELECT month, profile_name, post_count, likes, comments, shares
+                FROM posts_rollup
+                UNION ALL
+                SELECT substr(collected_at, 1, 7), COALESCE(profile_name, ''), COUNT(*),
+                       SUM(COALESCE(likes, 0)), SUM(COALESCE(comments, 0)), SUM(COALESCE(shares, 0))
+                FROM posts
+                GROUP BY 1, 2
+            )
+            WHERE ? IS NULL OR profile_name = ?
+            GROUP BY month
+            ORDER BY month
+            """,
+            (profile_name, profile_name)
+        ).fetchall()
+
+    return [
+        {"month": row[0], "post_count": row[1], "likes": row[2], "comments": row[3], "shares": row[4]}
+        for row in rows
+    ]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Move old scraped posts into monthly archive databases")
+    parser.add_argument("--horizon-days", type=int, default=None,
+                        help=f"Keep posts collected within this many days (default {ARCHIVE_HORIZON_DAYS})")
+    parser.add_argument("--list", action="store_true", help="List archive partitions and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    if args.list:
+        for partition in list_partitions():
+            print(f"{partition['month']}  {partition['post_count']:>8}  {partition['path']}")
+    else:
+        archive_old_posts(args.horizon_days)
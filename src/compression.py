@@ -0,0 +1,421 @@
+import os
+import sqlite3
+import logging
+import threading
+import zlib
+from collections import Counter
+from datetime import datetime
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency: fall back to zlib
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Codec used for new writes: "off", "zlib" or "zstd"
+CONTENT_COMPRESSION = os.getenv("LINKEDIN_CONTENT_COMPRESSION", "off").lower()
+
+# Short posts do not shrink enough to pay for the header and CPU time
+MIN_COMPRESS_LENGTH = 64
+
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 9
+ZLIB_DICTIONARY_SIZE = 32 * 1024  # zlib only looks back 32 KB
+ZSTD_DICTIONARY_SIZE = 112 * 1024
+
+# First byte of every compressed value. Dictionary formats are followed by a
+# 4-byte big-endian content_dictionaries id. Text values are never compressed.
+_ZLIB = 0x01
+_ZLIB_DICT = 0x02
+_ZSTD = 0x03
+_ZSTD_DICT = 0x04
+
+_lock = threading.Lock()
+_local = threading.local()
+_dictionaries = {}        # (db_path, dictionary_id) -> bytes
+_active_dictionaries = {}  # (db_path, codec) -> dictionary_id or None
+
+
+def _default_db_path():
+    """Get the database path of the shared connection pool."""
+    from src.db_pool import get_pool
+    return get_pool().db_path
+
+
+def _resolve_codec(codec):
+    """Normalize a codec name, falling back to zlib when zstd is missing."""
+    codec = (codec or CONTENT_COMPRESSION).lower()
+    if codec not in ("off", "zlib", "zstd"):
+        raise ValueError(f"Unknown content compression codec: {codec}")
+    if codec == "zstd" and zstandard is None:
+        logger.warning("zstandard is not installed; compressing content with zlib instead")
+        return "zlib"
+    return codec
+
+
+def _query(db_path, conn, sql, params=()):
+    """Run a small read query on conn, or on a short-lived connection to db_path."""
+    if conn is not None:
+        return conn.execute(sql, params).fetchall()
+
+    own_conn = sqlite3.connect(db_path)
+    try:
+        return own_conn.execute(sql, params).fetchall()
+    finally:
+        own_conn.close()
+
+
+def _get_dictionary(db_path, dictionary_id, conn=None):
+    """Load a stored dictionary, caching it for the life of the process."""
+    key = (os.path.abspath(db_path), dictionary_id)
+    with _lock:
+        if key in _dictionaries:
+            return _dictionaries[key]
+
+    rows = _query(db_path, conn, "SELECT dictionary FROM content_dictionaries WHERE id = ?", (dictionary_id,))
+    if not rows:
+        raise ValueError(f"Compression dictionary {dictionary_id} not found in {db_path}")
+
+    with _lock:
+        _dictionaries[key] = rows[0][0]
+    return rows[0][0]
+
+
+def _get_active_dictionary_id(db_path, codec, conn=None):
+    """Get the newest trained dictionary for a codec, if any."""
+    key = (os.path.abspath(db_path), codec)
+    with _lock:
+        if key in _active_dictionaries:
+            return _active_dictionaries[key]
+
+    try:
+        rows = _query(
+            db_path, conn,
+            "SELECT MAX(id) FROM content_dictionaries WHERE codec = ?", (codec,)
+        )
+        dictionary_id = rows[0][0]
+    except sqlite3.Error:
+        # The table does not exist before the compression migration
+        dictionary_id = None
+
+    with _lock:
+        _active_dictionaries[key] = dictionary_id
+    return dictionary_id
+
+
+def _zstd_compressor(db_path, dictionary_id, dictionary):
+    """Get a per-thread zstd compressor (instances are not thread-safe)."""
+    cache = getattr(_local, "compressors", None)
+    if cache is None:
+        cache = _local.compressors = {}
+    key = (db_path, dictionary_id)
+    if key not in cache:
+        dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        cache[key] = zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=dict_data)
+    return cache[key]
+
+
+def _zstd_decompressor(db_path, dictionary_id, dictionary):
+    """Get a per-thread zstd decompressor."""
+    cache = getattr(_local, "decompressors", None)
+    if cache is None:
+        cache = _local.decompressors = {}
+    key = (db_path, dictionary_id)
+    if key not in cache:
+        dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        cache[key] = zstandard.ZstdDecompressor(dict_data=dict_data)
+    return cache[key]
+
+
+def compress_content(text, codec=None, db_path=None, conn=None):
+    """Compress post text for storage.
+
+    Returns the text unchanged when compression is off, the text is short,
+    or compressing it would not save space.
+
+    Args:
+        text: Post content
+        codec: "off", "zlib" or "zstd" (defaults to CONTENT_COMPRESSION)
+        db_path: Database whose trained dictionary to use (defaults to the pool's)
+        conn: Optional connection used to look up the dictionary
+
+    Returns:
+        str or bytes value to store
+    """
+    codec = _resolve_codec(codec)
+    if codec == "off" or not isinstance(text, str) or len(text) < MIN_COMPRESS_LENGTH:
+        return text
+
+    db_path = db_path or _default_db_path()
+    raw = text.encode("utf-8")
+    dictionary_id = _get_active_dictionary_id(db_path, codec, conn)
+    dictionary = _get_dictionary(db_path, dictionary_id, conn) if dictionary_id else None
+
+    if codec == "zstd":
+        payload = _zstd_compressor(db_path, dictionary_id, dictionary).compress(raw)
+        header = bytes([_ZSTD_DICT]) + dictionary_id.to_bytes(4, "big") if dictionary else bytes([_ZSTD])
+    else:
+        compressor = zlib.compressobj(ZLIB_LEVEL, zdict=dictionary) if dictionary else zlib.compressobj(ZLIB_LEVEL)
+        payload = compressor.compress(raw) + compressor.flush()
+        header = bytes([_ZLIB_DICT]) + dictionary_id.to_bytes(4, "big") if dictionary else bytes([_ZLIB])
+
+    value = header + payload
+    return value if len(value) < len(raw) else text
+
+
+def decompress_content(value, db_path=None, conn=None):
+    """Restore post text stored by compress_content.
+
+    Args:
+        value: Stored str, bytes or None
+        db_path: Database holding the dictionary (defaults to the pool's)
+        conn: Optional connection used to look up the dictionary
+
+    Returns:
+        Original text (str values and None are returned unchanged)
+    """
+    if not isinstance(value, (bytes, memoryview)):
+        return value
+
+    value = bytes(value)
+    codec = value[0]
+
+    if codec == _ZLIB:
+        return zlib.decompress(value[1:]).decode("utf-8")
+
+    if codec == _ZSTD:
+        return _zstd_decompressor(db_path, None, None).decompress(value[1:]).decode("utf-8")
+
+    if codec in (_ZLIB_DICT, _ZSTD_DICT):
+        db_path = db_path or _default_db_path()
+        dictionary_id = int.from_bytes(value[1:5], "big")
+        dictionary = _get_dictionary(db_path, dictionary_id, conn)
+        if codec == _ZLIB_DICT:
+            decompressor = zlib.decompressobj(zdict=dictionary)
+            return (decompressor.decompress(value[5:]) + decompressor.flush()).decode("utf-8")
+        decompressor = _zstd_decompressor(db_path, dictionary_id, dictionary)
+        return decompressor.decompress(value[5:]).decode("utf-8")
+
+    raise ValueError(f"Unknown compressed content format: {codec}")
+
+
+def prepare_compressed_writes(conn, codec=None):
+    """Install the decompressing FTS triggers before compressed content is written.
+
+    A no-op when compression is off or the triggers are already installed.
+
+    Args:
+        conn: SQLite connection (the caller owns the transaction)
+        codec: "off", "zlib" or "zstd" (defaults to CONTENT_COMPRESSION)
+    """
+    if _resolve_codec(codec) == "off":
+        return
+    from src.migrations import set_fts_decompression
+    if set_fts_decompression(conn, True):
+        logger.info("Switched full-text search triggers to decompress stored content")
+
+
+def register_sql_functions(conn, db_path):
+    """Register decompress_content() as an SQL function on a connection.
+
+    Once content is stored compressed, the FTS triggers call it, so every
+    connection that writes posts then needs it.
+
+    Args:
+        conn: SQLite connection
+        db_path: Path of the database the connection is attached to
+    """
+    conn.create_function(
+        "decompress_content", 1,
+        lambda value: decompress_content(value, db_path),
+        deterministic=True
+    )
+
+
+def _build_zlib_dictionary(samples, size=ZLIB_DICTIONARY_SIZE):
+    """Build a zlib preset dictionary from the most common words and phrases."""
+    counts = Counter()
+    for sample in samples:
+        words = sample.split()
+        counts.update(words)
+        counts.update(" ".join(pair) for pair in zip(words, words[1:]))
+
+    # zlib matches closer bytes more cheaply, so the most common strings go last
+    pieces = []
+    total = 0
+    for phrase, count in counts.most_common():
+        if count < 2 or total >= size:
+            break
+        pieces.append(phrase)
+        total += len(phrase.encode("utf-8")) + 1
+
+    return " ".join(reversed(pieces)).encode("utf-8")[-size:]
+
+
+def train_dictionary(conn, codec=None, sample_size=5000, dict_size=None):
+    """Train a shared compression dictionary from stored post content.
+
+    Args:
+        conn: SQLite connection
+        codec: "zlib" or "zstd" (defaults to CONTENT_COMPRESSION)
+        sample_size: Number of posts to sample
+        dict_size: Dictionary size in bytes (defaults per codec)
+
+    Returns:
+        ID of the stored dictionary, or None if there was nothing to train on
+    """
+    codec = _resolve_codec(codec)
+    if codec == "off":
+        raise ValueError("Choose a compression codec to train a dictionary for")
+
+    rows = conn.execute(
+        """
+        SELECT post_content FROM posts
+        WHERE post_content IS NOT NULL
+        ORDER BY RANDOM()
+        LIMIT ?
+        """,
+        (sample_size,)
+    ).fetchall()
+    samples = [decompress_content(row[0], conn=conn) for row in rows if row[0]]
+    if len(samples) < 10:
+        logger.warning("Not enough posts to train a compression dictionary")
+        return None
+
+    if codec == "zstd":
+        dict_size = dict_size or ZSTD_DICTIONARY_SIZE
+        dictionary = zstandard.train_dictionary(
+            dict_size, [sample.encode("utf-8") for sample in samples]
+        ).as_bytes()
+    else:
+        dictionary = _build_zlib_dictionary(samples, dict_size or ZLIB_DICTIONARY_SIZE)
+
+    cursor = conn.execute(
+        "INSERT INTO content_dictionaries (codec, dictionary, created_at) VALUES (?, ?, ?)",
+        (codec, dictionary, datetime.now().isoformat())
+    )
+    dictionary_id = cursor.lastrowid
+
+    db_path = os.path.abspath(conn.execute("PRAGMA database_list").fetchone()[2])
+    with _lock:
+        _dictionaries[(db_path, dictionary_id)] = dictionary
+        _active_dictionaries[(db_path, codec)] = dictionary_id
+
+    logger.info(f"Trained {codec} dictionary {dictionary_id} ({len(dictionary)} bytes) from {len(samples)} posts")
+    return dictionary_id
+
+
+# (table, column) pairs whose text is stored compressed
+COMPRESSED_COLUMNS = (
+    ("posts", "post_content"),
+    ("generated_posts", "content"),
+)
+
+
+def compress_existing_content(conn, codec=None, batch_size=1000):
+    """Compress stored content that is still plain text.
+
+    Args:
+        conn: SQLite connection (the caller owns the transaction)
+        codec: "zlib" or "zstd" (defaults to CONTENT_COMPRESSION)
+        batch_size: Rows fetched per batch
+
+    Returns:
+        Number of rows rewritten
+    """
+    codec = _resolve_codec(codec)
+    if codec == "off":
+        return 0
+
+    # The FTS triggers must decompress the rows rewritten below
+    prepare_compressed_writes(conn, codec)
+    db_path = conn.execute("PRAGMA database_list").fetchone()[2]
+    rewritten = 0
+
+    for table, column in COMPRESSED_COLUMNS:
+        last_id = 0
+        while True:
+            rows = conn.execute(
+                f"""
+                SELECT id, {column} FROM {table}
+                WHERE id > ? AND typeof({column}) = 'text' AND length({column}) >= ?
+                ORDER BY id
+                LIMIT ?
+                """,
+                (last_id, MIN_COMPRESS_LENGTH, batch_size)
+            ).fetchall()
+            if not rows:
+                break
+
+            last_id = rows[-1][0]
+            updates = []
+            for row_id, text in rows:
+                value = compress_content(text, codec, db_path, conn)
+                if isinstance(value, bytes):
+                    updates.append((value, row_id))
+
+            conn.executemany(f"UPDATE {table} SET {column} = ? WHERE id = ?", updates)
+            rewritten += len(updates)
+
+    logger.info(f"Compressed {rewritten} stored posts with {codec}")
+    return rewritten
+
+
+def decompress_existing_content(conn, batch_size=1000):
+    """Rewrite all compressed content back to plain text.
+
+    Args:
+        conn: SQLite connection (the caller owns the transaction)
+        batch_size: Rows fetched per batch
+
+    Returns:
+        Number of rows rewritten
+    """
+    db_path = conn.execute("PRAGMA database_list").fetchone()[2]
+    rewritten = 0
+
+    for table, column in COMPRESSED_COLUMNS:
+        while True:
+            rows = conn.execute(
+                f"SELECT id, {column} FROM {table} WHERE typeof({column}) = 'blob' LIMIT ?",
+                (batch_size,)
+            ).fetchall()
+            if not rows:
+                break
+
+            conn.executemany(
+                f"UPDATE {table} SET {column} = ? WHERE id = ?",
+                [(decompress_content(value, db_path, conn), row_id) for row_id, value in rows]
+            )
+            rewritten += len(rows)
+
+    # Nothing is compressed any more, so writers outside the pool work again
+    from src.migrations import set_fts_decompression
+    set_fts_decompression(conn, False)
+
+    logger.info(f"Decompressed {rewritten} stored posts")
+    return rewritten
+
+
+if __name__ == "__main__":
+    import argparse
+    from src.db_pool import get_pool
+
+    parser = argparse.ArgumentParser(description="Manage compressed post content")
+    parser.add_argument("action", choices=["train", "compress", "decompress"],
+                        help="Train a dictionary, compress plain-text rows, or restore all rows to text")
+    parser.add_argument("--codec", choices=["zlib", "zstd"], default=None,
+                        help="Codec to use (defaults to LINKEDIN_CONTENT_COMPRESSION)")
+    parser.add_argument("--sample-size", type=int, default=5000, help="Posts sampled for training")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    with get_pool().transaction() as conn:
+        if args.action == "train":
+            train_dictionary(conn, args.codec, args.sample_size)
+        elif args.action == "compress":
+            compress_existing_content(conn, args.codec)
+        else:
+            decompress_existing_content(conn)
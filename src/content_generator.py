@@ -330,6 +330,8 @@
 import random
 import time
 
+from src.search import search_posts
+
 class PostGenerator:
     """
     Class responsible for generating LinkedIn posts using predefined templates
@@ -413,6 +415,18 @@ class PostGenerator:
         
         return " ".join(tags)
     
+    def find_exemplar_posts(self, topic, limit=3):
+        """Find scraped posts about the topic to use as reference examples
+        
+        Args:
+            topic (str): The main topic of the post
+            limit (int): Maximum number of posts to return
+            
+        Returns:
+            list: Post dictionaries ranked by full-text relevance
+        """
+        return search_posts(topic, limit=limit, match_all=False)
+    
     def _adjust_for_tone(self, content, tone):
         """Adjust content based on the specified tone"""
         # Placeholder for more sophisticated tone adjustment
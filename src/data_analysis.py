@@ -2,8 +2,8 @@ import logging
 import pandas as pd
 import numpy as np
 from datetime import datetime
-import re
 from collections import Counter
+from contextlib import ExitStack
 import nltk
 from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
@@ -12,9 +12,12 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.cluster import KMeans
-import emoji
 
-from src.utils import get_db_connection
+from src.archive import FEATURES_HISTORY_VIEW, POSTS_HISTORY_VIEW, posts_history
+from src.compression import decompress_content
+from src.features import MENTION_PATTERN, POST_FEATURE_COLUMNS, STRUCTURE_FEATURES, URL_PATTERN, structure_features
+from src.hashtags import HASHTAG_PATTERN, hashtag_frequency
+from src.utils import db_connection
 
 logger = logging.getLogger(__name__)
 
@@ -26,16 +29,40 @@ except Exception as e:
     logger.warning(f"Failed to download NLTK resources: {e}")
 
 class LinkedInPostAnalyzer:
-    def __init__(self):
-        """Initialize the LinkedIn post analyzer."""
-        self.conn = get_db_connection()
+    def __init__(self, include_history=False, since=None):
+        """Initialize the LinkedIn post analyzer.
+        
+        Args:
+            include_history: Also analyze posts moved to the archive databases
+            since: Optional earliest collected_at (ISO date) to analyze
+        """
+        self.include_history = include_history
+        self.since = since
         self.posts_df = None
         self.load_data()
         
     def load_data(self):
-        """Load posts data from database into DataFrame."""
-        query = "SELECT * FROM posts"
-        self.posts_df = pd.read_sql_query(query, self.conn)
+        """Load posts data from database into DataFrame.
+        
+        Only posts in the hot database are read unless the analyzer was
+        created with include_history.
+        """
+        table = POSTS_HISTORY_VIEW if self.include_history else "posts"
+        features_table = FEATURES_HISTORY_VIEW if self.include_history else "post_features"
+        feature_columns = ", ".join(f"f.{column}" for column in POST_FEATURE_COLUMNS)
+        query = f"SELECT p.*, {feature_columns} FROM {table} p LEFT JOIN {features_table} f ON f.post_id = p.id"
+        params = ()
+        if self.since:
+            query += " WHERE p.collected_at >= ?"
+            params = (self.since,)
+        
+        with db_connection() as conn, ExitStack() as stack:
+            if self.include_history:
+                stack.enter_context(posts_history(conn, self.since))
+            self.posts_df = pd.read_sql_query(query, conn, params=params)
+            self.posts_df['post_content'] = self.posts_df['post_content'].map(
+                lambda value: decompress_content(value, conn=conn)
+            )
         
         # Convert date columns to datetime
         for date_col in ['publish_date', 'collected_at']:
@@ -81,33 +108,56 @@ class LinkedInPostAnalyzer:
         }
     
     def analyze_post_timing(self):
-        """Analyze post timing patterns."""
-        if self.posts_df is None or self.posts_df.empty:
-            logger.warning("No posts data available for timing analysis")
-            return {}
+        """Analyze post timing patterns.
+        
+        Average engagement is grouped by the local hour of day and day of
+        week (Monday = 0) of each post's published_at, in SQL over the
+        published_at index. Posts without a known publish time are left out.
+        """
+        table = POSTS_HISTORY_VIEW if self.include_history else "posts"
+        # A range rather than IS NOT NULL, so SQLite uses the published_at index
+        where = "published_at > 0"
+        filter_params = ()
+        if self.since:
+            where += " AND collected_at >= ?"
+            filter_params = (self.since,)
+        
+        # Shift epoch seconds to local time; day 0 of the epoch was a Thursday
+        utc_offset = int(datetime.now().astimezone().utcoffset().total_seconds())
+        engagement = "AVG(COALESCE(likes, 0) + COALESCE(comments, 0) + COALESCE(shares, 0)) AS total_engagement"
+        hour_query = (
+            f"SELECT ((published_at + ?) / 3600) % 24 AS hour_of_day, {engagement}, COUNT(*) AS post_count "
+            f"FROM {table} WHERE {where} GROUP BY hour_of_day"
+        )
+        day_query = (
+            f"SELECT ((published_at + ?) / 86400 + 3) % 7 AS day_of_week, {engagement}, COUNT(*) AS post_count "
+            f"FROM {table} WHERE {where} GROUP BY day_of_week"
+        )
             
         try:
-            # Extract hour of day and day of week
-            self.posts_df['hour_of_day'] = self.posts_df['publish_date'].dt.hour
-            self.posts_df['day_of_week'] = self.posts_df['publish_date'].dt.dayofweek
-            
-            # Get average engagement by hour and day
-            hour_engagement = self.posts_df.groupby('hour_of_day')['total_engagement'].mean().reset_index()
-            day_engagement = self.posts_df.groupby('day_of_week')['total_engagement'].mean().reset_index()
-            
-            # Find optimal posting times
-            best_hours = hour_engagement.sort_values('total_engagement', ascending=False)['hour_of_day'].tolist()
-            best_days = day_engagement.sort_values('total_engagement', ascending=False)['day_of_week'].tolist()
-            
-            return {
-                'best_hours': best_hours[:3],  # Top 3 hours
-                'best_days': best_days[:3],    # Top 3 days
-                'hour_engagement': hour_engagement.to_dict(),
-                'day_engagement': day_engagement.to_dict()
-            }
+            with db_connection() as conn, ExitStack() as stack:
+                if self.include_history:
+                    stack.enter_context(posts_history(conn, self.since))
+                hour_engagement = pd.read_sql_query(hour_query, conn, params=(utc_offset,) + filter_params)
+                day_engagement = pd.read_sql_query(day_query, conn, params=(utc_offset,) + filter_params)
         except Exception as e:
             logger.error(f"Error analyzing post timing: {e}")
             return {}
+        
+        if hour_engagement.empty:
+            logger.warning("No posts with a known publish time for timing analysis")
+            return {}
+            
+        # Find optimal posting times
+        best_hours = hour_engagement.sort_values('total_engagement', ascending=False)['hour_of_day'].tolist()
+        best_days = day_engagement.sort_values('total_engagement', ascending=False)['day_of_week'].tolist()
+        
+        return {
+            'best_hours': best_hours[:3],  # Top 3 hours
+            'best_days': best_days[:3],    # Top 3 days
+            'hour_engagement': hour_engagement.to_dict(),
+            'day_engagement': day_engagement.to_dict()
+        }
     
     def extract_topics_and_keywords(self):
         """Extract common topics and keywords from posts."""
@@ -133,16 +183,8 @@ class LinkedInPostAnalyzer:
             bigram_freq = Counter(bi_grams)
             common_bigrams = [(f"{bg[0]} {bg[1]}", count) for bg, count in bigram_freq.most_common(15)]
             
-            # Extract hashtags
-            hashtag_pattern = r'#(\w+)'
-            all_hashtags = []
-            
-            for content in self.posts_df['post_content'].fillna(''):
-                hashtags = re.findall(hashtag_pattern, content)
-                all_hashtags.extend([tag.lower() for tag in hashtags])
-            
-            hashtag_freq = Counter(all_hashtags)
-            common_hashtags = hashtag_freq.most_common(15)
+            # Hashtags are extracted at ingest time into post_hashtags
+            common_hashtags = hashtag_frequency(limit=15, include_history=self.include_history)
             
             # Try clustering posts by content
             tfidf_vectorizer = TfidfVectorizer(
@@ -194,22 +236,17 @@ class LinkedInPostAnalyzer:
             return {}
             
         try:
-            # Add length metrics
-            self.posts_df['content_length'] = self.posts_df['post_content'].fillna('').apply(len)
-            self.posts_df['word_count'] = self.posts_df['post_content'].fillna('').apply(lambda x: len(x.split()))
-            self.posts_df['has_hashtags'] = self.posts_df['post_content'].fillna('').str.contains(r'#\w+')
-            self.posts_df['hashtag_count'] = self.posts_df['post_content'].fillna('').apply(
-                lambda x: len(re.findall(r'#\w+', x))
-            )
-            self.posts_df['has_url'] = self.posts_df['post_content'].fillna('').str.contains(r'https?://\S+')
-            self.posts_df['has_mention'] = self.posts_df['post_content'].fillna('').str.contains(r'@\w+')
-            self.posts_df['has_emoji'] = self.posts_df['post_content'].fillna('').apply(
-                lambda x: any(c in emoji.EMOJI_DATA for c in x)
-            )
-            self.posts_df['has_question'] = self.posts_df['post_content'].fillna('').str.contains(r'\?')
-            self.posts_df['sentence_count'] = self.posts_df['post_content'].fillna('').apply(
-                lambda x: len(re.split(r'[.!?]+', x))
-            )
+            # Features are precomputed at ingest; only posts without any
+            # (such as ones whose content was edited) are computed here
+            missing = self.posts_df[POST_FEATURE_COLUMNS].isna().any(axis=1)
+            if missing.any():
+                logger.info(f"Computing structure features of {missing.sum()} posts without stored features")
+                computed = structure_features(self.posts_df.loc[missing, 'post_content'])[POST_FEATURE_COLUMNS]
+                self.posts_df[POST_FEATURE_COLUMNS] = self.posts_df[POST_FEATURE_COLUMNS].fillna(computed.astype(int))
+            self.posts_df[POST_FEATURE_COLUMNS] = self.posts_df[POST_FEATURE_COLUMNS].astype(int)
+            for column in ('has_url', 'has_mention', 'has_emoji', 'has_question'):
+                self.posts_df[column] = self.posts_df[column].astype(bool)
+            self.posts_df['has_hashtags'] = self.posts_df['hashtag_count'] > 0
             
             # Segment posts by engagement
             high_engagement = self.posts_df[self.posts_df['total_engagement'] > self.posts_df['total_engagement'].median()]
@@ -228,13 +265,8 @@ class LinkedInPostAnalyzer:
             }
             
             # Find correlation between structure and engagement
-            structure_cols = [
-                'content_length', 'word_count', 'hashtag_count', 'has_hashtags', 
-                'has_url', 'has_mention', 'has_emoji', 'has_question', 'sentence_count'
-            ]
-            
             correlations = {}
-            for col in structure_cols:
+            for col in STRUCTURE_FEATURES:
                 correlations[col] = self.posts_df[[col, 'total_engagement']].corr().iloc[0, 1]
             
             return {
@@ -269,9 +301,9 @@ class LinkedInPostAnalyzer:
                     'shares': post['shares'],
                     'total_engagement': post['total_engagement'],
                     'word_count': len(post['post_content'].split()) if post['post_content'] else 0,
-                    'hashtags': re.findall(r'#(\w+)', post['post_content']) if post['post_content'] else [],
-                    'has_url': bool(re.search(r'https?://\S+', post['post_content'])) if post['post_content'] else False,
-                    'has_mention': bool(re.search(r'@\w+', post['post_content'])) if post['post_content'] else False,
+                    'hashtags': HASHTAG_PATTERN.findall(post['post_content']) if post['post_content'] else [],
+                    'has_url': bool(URL_PATTERN.search(post['post_content'])) if post['post_content'] else False,
+                    'has_mention': bool(MENTION_PATTERN.search(post['post_content'])) if post['post_content'] else False,
                     'has_question': '?' in post['post_content'] if post['post_content'] else False
                 }
                 top_posts_patterns.append(patterns)
@@ -381,6 +413,9 @@ class LinkedInPostAnalyzer:
         return recommendations
     
     def close(self):
-        """Close database connection."""
-        if self.conn:
-            self.conn.close()
\ No newline at end of file
+        """Release analyzer resources.
+        
+        Connections are borrowed from the shared pool per query, so there is
+        nothing left open here; kept for API compatibility.
+        """
+        self.posts_df = None
\ No newline at end of file
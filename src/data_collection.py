@@ -1,3 +1,4 @@
+import os
 import logging
 import time
 import random
@@ -9,24 +10,381 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from contextlib import ExitStack
 from datetime import datetime
+from urllib.parse import urljoin
 
-from src.utils import get_db_connection
+try:
+    import lxml  # Optional: several times faster than html.parser for page_source
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+try:
+    import psutil  # Optional: adds browser process memory to page metrics
+except ImportError:
+    psutil = None
+
+from src.archive import POSTS_HISTORY_VIEW, posts_history
+from src.compression import decompress_content
+from src.features import COUNT_MULTIPLIERS, COUNT_PATTERN
+from src.ingest import bulk_insert_posts
+from src.publish_dates import publish_date_text, published_timestamp
+from src.rate_limiter import TokenBucketRateLimiter, navigation_keys
+from src.replay import record_snapshot, replay_url
+from src.session_store import (
+    VALIDATION_URL, cdp_cookies, discard_session, load_session, recently_validated, save_session,
+    session_lock, session_path, validate_session
+)
+from src.utils import db_connection
 
 logger = logging.getLogger(__name__)
 
+# How scrape_profile_posts reads post fields once the page is loaded:
+# "elements" makes one WebDriver call per field, "script" reads every post
+# in one execute_script call, "soup" parses page_source once
+EXTRACTION_MODES = ("elements", "script", "soup")
+DEFAULT_EXTRACTION_MODE = "script"
+
+POST_CONTAINER_XPATH = "//div[contains(@class, 'feed-shared-update-v2')]"
+
+# CSS selectors shared by the script and soup extraction modes
+POST_CONTAINER_SELECTOR = "div.feed-shared-update-v2"
+POST_FIELD_SELECTORS = {
+    "post_url": "a.app-aware-link[href*='/posts/']",
+    "post_content": "div[class*='feed-shared-update-v2__description']",
+    "likes": "span[class*='social-details-social-counts__reactions-count']",
+    "comments": "li[class*='social-details-social-counts__comments']",
+    "shares": "li[class*='social-details-social-counts__reshares']",
+    "published_label": "span[class*='update-components-actor__sub-description']",
+}
+
+# Returns one {field: text} object per post; post_url is the resolved href
+EXTRACT_POSTS_SCRIPT = """
+const selectors = arguments[0];
+const containerSelector = arguments[1];
+const maxPosts = arguments[2];
+return Array.from(document.querySelectorAll(containerSelector)).slice(0, maxPosts).map(post => {
+    const fields = {};
+    for (const [field, selector] of Object.entries(selectors)) {
+        const element = post.querySelector(selector);
+        if (!element) {
+            fields[field] = null;
+        } else if (field === "post_url") {
+            fields[field] = element.href;
+        } else {
+            fields[field] = element.innerText;
+        }
+    }
+    return fields;
+});
+"""
+
+# Returns the resolved post URL (or null) of every post container on the page
+POST_URLS_SCRIPT = """
+return Array.from(document.querySelectorAll(arguments[0])).map(post => {
+    const link = post.querySelector(arguments[1]);
+    return link ? link.href : null;
+});
+"""
+
+DRIVER_PROFILES = ("full", "lean")
+DEFAULT_DRIVER_PROFILE = "full"
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/96.0.4664.110 Safari/537.36"
+)
+
+DEFAULT_USER_DATA_DIR = os.getenv("LINKEDIN_CHROME_PROFILE_DIR", os.path.join("data", "chrome-profile"))
+
+# Chrome preferences of the lean profile: no images, notifications or
+# camera/microphone/location prompts
+LEAN_CHROME_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.default_content_setting_values.notifications": 2,
+    "profile.default_content_setting_values.media_stream": 2,
+    "profile.default_content_setting_values.geolocation": 2,
+}
+
+LEAN_CHROME_ARGUMENTS = [
+    "--window-size=1280,900",
+    "--blink-settings=imagesEnabled=false",
+    "--autoplay-policy=user-gesture-required",
+    "--mute-audio",
+    "--no-first-run",
+    "--disable-sync",
+    "--disable-default-apps",
+    "--disable-component-update",
+    "--disable-background-networking",
+    "--disable-features=Translate,MediaRouter,OptimizationHints,AutofillServerCommunication",
+]
+
+# Requests the lean profile blocks through CDP: fonts, video/audio,
+# LinkedIn's media CDNs and tracking scripts
+LEAN_BLOCKED_URLS = [
+    "*.woff*", "*.ttf*", "*.otf*",
+    "*.mp4*", "*.webm*", "*.m3u8*", "*.mp3*",
+    "*://media.licdn.com/*",
+    "*://dms.licdn.com/*",
+    "*://px.ads.linkedin.com/*",
+    "*://snap.licdn.com/*",
+    "*doubleclick.net/*",
+    "*google-analytics.com/*",
+]
+
+# Navigation timing, same-origin resource totals and renderer JS heap of
+# the loaded page
+PAGE_METRICS_SCRIPT = """
+const nav = performance.getEntriesByType("navigation")[0] || {};
+const resources = performance.getEntriesByType("resource");
+return {
+    dom_content_loaded_ms: nav.domContentLoadedEventEnd || null,
+    load_event_ms: nav.loadEventEnd || null,
+    resources: resources.length,
+    transfer_bytes: resources.reduce((total, entry) => total + (entry.transferSize || 0), nav.transferSize || 0),
+    js_heap_bytes: performance.memory ? performance.memory.usedJSHeapSize : null,
+    dom_nodes: document.getElementsByTagName("*").length
+};
+"""
+
+# Fragments of the URLs LinkedIn redirects to instead of the requested page
+# when the session is missing, expired or challenged
+LOGIN_WALL_MARKERS = ("/authwall", "/login", "/uas/login", "/checkpoint/")
+
+# Scrolls to the bottom and calls back once more than arguments[1] post
+# containers exist (watched with a MutationObserver) or after arguments[2] ms
+WAIT_FOR_POSTS_SCRIPT = """
+const [selector, previousCount, timeoutMs] = arguments;
+const done = arguments[arguments.length - 1];
+const started = performance.now();
+const count = () => document.querySelectorAll(selector).length;
+const result = (timedOut) => ({
+    count: count(),
+    height: document.body.scrollHeight,
+    waited_ms: performance.now() - started,
+    timed_out: timedOut
+});
+
+let observer = null;
+let timer = null;
+let finished = false;
+const finish = (timedOut) => {
+    if (finished) return;
+    finished = true;
+    if (observer) observer.disconnect();
+    if (timer) clearTimeout(timer);
+    done(result(timedOut));
+};
+
+observer = new MutationObserver(() => {
+    if (count() > previousCount) finish(false);
+});
+observer.observe(document.body, {childList: true, subtree: true});
+timer = setTimeout(() => finish(true), timeoutMs);
+window.scrollTo(0, document.body.scrollHeight);
+if (count() > previousCount) finish(false);
+"""
+
+
+def parse_count(count_text):
+    """Parse an engagement count such as "1,234", "1.2K" or "56 comments" from text."""
+    if not count_text:
+        return 0
+        
+    match = COUNT_PATTERN.search(count_text.replace(',', ''))
+    if not match:
+        return 0
+        
+    number, suffix = match.groups()
+    return int(float(number) * COUNT_MULTIPLIERS.get(suffix.upper() if suffix else '', 1))
+
+
+def parse_activity_html(html, max_posts=None, base_url="https://www.linkedin.com"):
+    """Extract raw post fields from an activity page in a single parse.
+    
+    Args:
+        html: Page source of a recent-activity page
+        max_posts: Maximum number of posts to return (all if None)
+        base_url: URL that relative post links are resolved against
+        
+    Returns:
+        List of dictionaries with the POST_FIELD_SELECTORS keys; missing
+        fields are None and counts are still unparsed text
+    """
+    soup = BeautifulSoup(html, HTML_PARSER)
+    raw_posts = []
+    
+    for post in soup.select(POST_CONTAINER_SELECTOR, limit=max_posts or 0):
+        fields = {}
+        for field, selector in POST_FIELD_SELECTORS.items():
+            element = post.select_one(selector)
+            if element is None:
+                fields[field] = None
+            elif field == "post_url":
+                href = element.get("href")
+                fields[field] = urljoin(base_url, href) if href else None
+            else:
+                # Keep line breaks the way the browser's innerText does
+                for line_break in element.find_all("br"):
+                    line_break.replace_with("\n")
+                fields[field] = element.get_text().strip()
+        raw_posts.append(fields)
+        
+    return raw_posts
+
+
+def build_post(raw_post, profile_url, profile_name):
+    """Turn raw extracted fields into a post dictionary for the database.
+    
+    Args:
+        raw_post: Dictionary from parse_activity_html or EXTRACT_POSTS_SCRIPT
+        profile_url: LinkedIn profile URL
+        profile_name: Name of the profile owner
+        
+    Returns:
+        Post dictionary, or None if the post has no URL
+    """
+    if not raw_post.get("post_url"):
+        return None
+        
+    published_at = published_timestamp(raw_post["post_url"], raw_post.get("published_label"))
+    return {
+        "profile_url": profile_url,
+        "profile_name": profile_name,
+        "post_url": raw_post["post_url"],
+        "post_content": (raw_post.get("post_content") or "").strip(),
+        "publish_date": publish_date_text(published_at),
+        "published_at": published_at,
+        "likes": parse_count(raw_post.get("likes")),
+        "comments": parse_count(raw_post.get("comments")),
+        "shares": parse_count(raw_post.get("shares")),
+        "collected_at": datetime.now().isoformat()
+    }
+
+
+def parse_capture(capture, profile_url, profile_name, max_posts):
+    """Turn the output of LinkedInScraper.capture_raw_posts into post records.
+
+    Args:
+        capture: Dictionary with raw_posts, or html and base_url
+        profile_url: LinkedIn profile URL
+        profile_name: Name of the profile owner
+        max_posts: Maximum number of posts to keep
+
+    Returns:
+        List of post dictionaries ready for bulk_insert_posts
+    """
+    raw_posts = capture.get("raw_posts")
+    if raw_posts is None:
+        raw_posts = parse_activity_html(capture["html"], max_posts, base_url=capture["base_url"])
+
+    posts = []
+    for i, raw_post in enumerate(raw_posts[:max_posts]):
+        post = build_post(raw_post, profile_url, profile_name)
+        if post is None:
+            logger.error(f"Error parsing post {i+1} of {profile_name}: no post URL found")
+            continue
+        posts.append(post)
+    return posts
+
+
+def incremental_cutoff(post_urls, known_urls, overlap=0):
+    """Find where an incremental scrape can stop.
+    
+    Activity pages list the newest posts first, so once more than overlap
+    already-stored posts have been seen, everything below is old content.
+    
+    Args:
+        post_urls: Post URLs in page order (None for posts without a link)
+        known_urls: Set of post URLs already stored for the profile
+        overlap: Number of known posts to re-scrape for engagement refresh
+        
+    Returns:
+        Number of leading posts to keep, or None if the page has not yet
+        scrolled past the overlap window
+    """
+    seen = 0
+    for index, post_url in enumerate(post_urls):
+        if post_url in known_urls:
+            seen += 1
+            if seen > overlap:
+                return index
+    return None
+
+
+class LoginWallError(Exception):
+    """Raised when LinkedIn answers a page load with a login or challenge page."""
+
+
 class LinkedInScraper:
-    def __init__(self, headless=True, login_email=None, login_password=None):
+    def __init__(self, headless=True, login_email=None, login_password=None,
+                 extraction_mode=DEFAULT_EXTRACTION_MODE, replay_source=None,
+                 record_dir=None, scroll_pause=(2, 4), adaptive_scroll=True,
+                 scroll_timeout=8.0, scroll_jitter=(0.2, 0.8), min_scroll_interval=1.5,
+                 driver_profile=DEFAULT_DRIVER_PROFILE, user_data_dir=None, rate_limiter=None,
+                 session_file=None, reuse_session=True):
         """Initialize the LinkedIn scraper.
         
         Args:
             headless: Whether to run browser in headless mode
             login_email: LinkedIn login email (optional)
             login_password: LinkedIn login password (optional)
+            extraction_mode: One of EXTRACTION_MODES
+            replay_source: Load recorded activity pages from this directory
+                or file:// / http:// base URL instead of LinkedIn
+            record_dir: Save every scrolled activity page here for replay
+            scroll_pause: (min, max) seconds to sleep after each scroll when
+                adaptive_scroll is off
+            adaptive_scroll: Wait for new post nodes to appear instead of
+                sleeping for scroll_pause
+            scroll_timeout: Longest adaptive wait; a scroll that loads
+                nothing within it marks the end of the feed
+            scroll_jitter: (min, max) seconds of random pause after new
+                posts appear in adaptive mode
+            min_scroll_interval: Minimum seconds between scrolls, capping
+                the request rate in both modes
+            driver_profile: One of DRIVER_PROFILES; "lean" blocks images,
+                media, fonts and trackers and disables unneeded features
+            user_data_dir: Chrome profile directory kept between runs so
+                session cookies survive; the lean profile defaults to
+                DEFAULT_USER_DATA_DIR
+            rate_limiter: TokenBucketRateLimiter consulted before every page
+                load; defaults to one sharing the database's buckets, or
+                none in replay mode
+            session_file: File holding the account's session cookies;
+                defaults to session_path(login_email)
+            reuse_session: Restore saved session cookies in login() instead
+                of submitting the login form, and save them after a login
         """
+        if extraction_mode not in EXTRACTION_MODES:
+            raise ValueError(f"Unknown extraction mode: {extraction_mode}")
+        if driver_profile not in DRIVER_PROFILES:
+            raise ValueError(f"Unknown driver profile: {driver_profile}")
+            
         self.headless = headless
         self.login_email = login_email
         self.login_password = login_password
+        self.extraction_mode = extraction_mode
+        self.replay_source = replay_source
+        self.record_dir = record_dir
+        self.scroll_pause = scroll_pause
+        self.adaptive_scroll = adaptive_scroll
+        self.scroll_timeout = scroll_timeout
+        self.scroll_jitter = scroll_jitter
+        self.min_scroll_interval = min_scroll_interval
+        self.scroll_metrics = []
+        self.driver_profile = driver_profile
+        if user_data_dir is None and driver_profile == "lean":
+            user_data_dir = DEFAULT_USER_DATA_DIR
+        self.user_data_dir = user_data_dir
+        self.page_metrics = []
+        if rate_limiter is None and not replay_source:
+            rate_limiter = TokenBucketRateLimiter()
+        self.rate_limiter = rate_limiter
+        if session_file is None and login_email:
+            session_file = session_path(login_email)
+        self.session_file = session_file
+        self.reuse_session = reuse_session
         self.driver = None
         
     def _initialize_driver(self):
@@ -41,24 +399,112 @@ class LinkedInScraper:
         chrome_options.add_argument("--disable-infobars")
         chrome_options.add_argument("--disable-extensions")
         chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--start-maximized")
-        chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36")
+        chrome_options.add_argument(f"--user-agent={USER_AGENT}")
+        
+        if self.driver_profile == "lean":
+            for argument in LEAN_CHROME_ARGUMENTS:
+                chrome_options.add_argument(argument)
+            chrome_options.add_experimental_option("prefs", LEAN_CHROME_PREFS)
+            # Posts are waited for explicitly, so don't block on subresources
+            chrome_options.page_load_strategy = "eager"
+        else:
+            chrome_options.add_argument("--window-size=1920,1080")
+            chrome_options.add_argument("--start-maximized")
+            
+        if self.user_data_dir:
+            os.makedirs(self.user_data_dir, exist_ok=True)
+            chrome_options.add_argument(f"--user-data-dir={os.path.abspath(self.user_data_dir)}")
         
         self.driver = webdriver.Chrome(options=chrome_options)
         self.driver.implicitly_wait(10)
+        self.driver.set_script_timeout(self.scroll_timeout + 10)
+        
+        # Keep every resource timing entry so page metrics count all requests
+        self.driver.execute_cdp_cmd(
+            "Page.addScriptToEvaluateOnNewDocument",
+            {"source": "performance.setResourceTimingBufferSize(100000);"}
+        )
+        if self.driver_profile == "lean":
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LEAN_BLOCKED_URLS})
         
     def login(self):
-        """Login to LinkedIn with provided credentials."""
+        """Login to LinkedIn with provided credentials.
+        
+        A saved session is restored into the driver when it is still valid,
+        so only the first scraper of a session lifetime submits the login
+        form. Scrapers of one process logging in to the same account wait
+        for each other, so a pool shares the session the first one creates.
+        
+        Returns:
+            True if the driver is logged in
+        """
         if not self.login_email or not self.login_password:
             logger.warning("LinkedIn credentials not provided. Some content may not be accessible.")
             return False
             
         if not self.driver:
             self._initialize_driver()
-            
+        
+        if not self.reuse_session or not self.session_file:
+            return self._login_with_form()
+        
+        with session_lock(self.session_file):
+            if self._restore_session():
+                return True
+            if not self._login_with_form():
+                return False
+            try:
+                save_session(self.session_file, self.login_email, self.driver.get_cookies())
+            except OSError as e:
+                logger.error(f"Error saving LinkedIn session: {e}")
+            return True
+    
+    def _restore_session(self):
+        """Load the saved session cookies into the driver if they still work.
+        
+        Returns:
+            True if a session was restored
+        """
+        session = load_session(self.session_file)
+        if not session or session.get("account") != self.login_email:
+            return False
+        
+        if not recently_validated(session):
+            self._wait_for_slot(VALIDATION_URL)
+            valid = validate_session(session, USER_AGENT)
+            if valid is False:
+                logger.info("Saved LinkedIn session has expired")
+                discard_session(self.session_file)
+                return False
+            if valid:
+                try:
+                    save_session(self.session_file, self.login_email, session["cookies"])
+                except OSError as e:
+                    logger.error(f"Error saving LinkedIn session: {e}")
+            # An inconclusive check still restores the session; a dead one
+            # shows up as a LoginWallError on the first page load
+        
+        try:
+            # CDP sets cookies for linkedin.com without loading a page first
+            self.driver.execute_cdp_cmd("Network.setCookies", {"cookies": cdp_cookies(session["cookies"])})
+        except Exception as e:
+            logger.error(f"Error restoring LinkedIn session: {e}")
+            return False
+        
+        logger.info(f"Restored saved LinkedIn session for {self.login_email}")
+        return True
+    
+    def _login_with_form(self):
+        """Submit the login form, unless the browser profile is still logged in."""
+        self._wait_for_slot("https://www.linkedin.com/login")
         self.driver.get("https://www.linkedin.com/login")
         
+        # A persistent profile may still hold a valid session
+        if "linkedin.com/feed" in self.driver.current_url:
+            logger.info("Reusing saved LinkedIn session")
+            return True
+        
         try:
             # Input email
             email_input = WebDriverWait(self.driver, 10).until(
@@ -86,59 +532,342 @@ class LinkedInScraper:
             logger.error(f"Login failed: {str(e)}")
             return False
     
-    def scrape_profile_posts(self, profile_url, profile_name, max_posts=20):
+    def scrape_profile_posts(self, profile_url, profile_name, max_posts=20, known_urls=None, overlap=0,
+                             on_posts=None):
         """Scrape posts from a LinkedIn profile.
         
         Args:
             profile_url: LinkedIn profile URL
             profile_name: Name of the profile owner
             max_posts: Maximum number of posts to scrape
+            known_urls: Optional set of post URLs already stored for the
+                profile; scrolling stops once the page goes past them
+            overlap: Number of known posts to scrape again so their
+                engagement counts are refreshed (incremental mode only)
+            on_posts: Optional callback receiving each batch of newly loaded
+                posts, in page order, after every scroll and at the end, so
+                they can be saved before the whole profile is finished
             
         Returns:
             List of dictionaries containing post data
         """
+        streamed = []
+        on_scroll = None
+        if on_posts:
+            on_scroll = self.streaming_callback(profile_url, profile_name, max_posts, known_urls, overlap,
+                                                on_posts, streamed)
+        
+        if not self.load_activity_page(profile_url, profile_name, max_posts, known_urls, overlap, on_scroll):
+            return []
+        
+        started = time.perf_counter()
+        posts_data = self._extract_posts(profile_url, profile_name, max_posts)
+        logger.info(
+            f"Extracted {len(posts_data)} posts in {time.perf_counter() - started:.2f}s "
+            f"({self.extraction_mode} mode)"
+        )
+        
+        if known_urls:
+            posts_data = self._trim_known(posts_data, known_urls, overlap)
+            new_posts = sum(1 for post in posts_data if post["post_url"] not in known_urls)
+            logger.info(f"{new_posts} new and {len(posts_data) - new_posts} refreshed posts for {profile_name}")
+        
+        if on_posts:
+            self._stream_posts(posts_data, streamed, on_posts)
+        
+        return posts_data
+    
+    def streaming_callback(self, profile_url, profile_name, max_posts, known_urls, overlap, on_posts, streamed):
+        """Build an on_scroll callback for load_activity_page that streams posts.
+        
+        After every scroll the loaded posts are extracted, and the ones not
+        handed to on_posts yet are passed on, in page order.
+        
+        Args:
+            profile_url: LinkedIn profile URL
+            profile_name: Name of the profile owner
+            max_posts: Maximum number of posts to extract
+            known_urls: Optional set of stored post URLs (incremental mode)
+            overlap: Number of known posts to keep before the cutoff
+            on_posts: Callback receiving each batch of new posts
+            streamed: List the streamed posts are appended to; its length
+                tells the caller how many posts were already handed over
+            
+        Returns:
+            Callable taking no arguments
+        """
+        def on_scroll():
+            posts = self._trim_known(
+                self._extract_posts(profile_url, profile_name, max_posts), known_urls, overlap
+            )
+            self._stream_posts(posts, streamed, on_posts)
+        return on_scroll
+    
+    def load_activity_page(self, profile_url, profile_name, max_posts=20, known_urls=None, overlap=0,
+                           on_scroll=None):
+        """Open a profile's activity page and scroll until enough posts are loaded.
+        
+        Args:
+            profile_url: LinkedIn profile URL
+            profile_name: Name of the profile owner
+            max_posts: Number of posts to load
+            known_urls: Optional set of stored post URLs to stop scrolling at
+            overlap: Number of known posts to load before stopping
+            on_scroll: Optional callback run after every scroll
+            
+        Returns:
+            True once posts are loaded, False if none appeared
+        """
         if not self.driver:
             self._initialize_driver()
             
-        posts_url = f"{profile_url.rstrip('/')}/recent-activity/shares/"
+        if self.replay_source:
+            posts_url = replay_url(self.replay_source, profile_url)
+        else:
+            posts_url = f"{profile_url.rstrip('/')}/recent-activity/shares/"
+        keys = self._wait_for_slot(posts_url)
+        load_started = time.monotonic()
         self.driver.get(posts_url)
         logger.info(f"Accessing posts for profile: {profile_name} at {posts_url}")
         
+        if not self.replay_source and any(marker in self.driver.current_url for marker in LOGIN_WALL_MARKERS):
+            self._report_failure(keys, "login wall")
+            if self.reuse_session and self.session_file:
+                # Make the next login() submit the form instead of restoring it
+                discard_session(self.session_file)
+            raise LoginWallError(f"Redirected to {self.driver.current_url} instead of posts of {profile_name}")
+        
         # Wait for posts to load
         try:
             WebDriverWait(self.driver, 15).until(
-                EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'feed-shared-update-v2')]"))
+                EC.presence_of_element_located((By.XPATH, POST_CONTAINER_XPATH))
             )
         except TimeoutException:
             logger.warning(f"No posts found for profile: {profile_name}")
-            return []
+            self._report_failure(keys, "timeout waiting for posts")
+            return False
+        load_time = time.monotonic() - load_started
+        if self.rate_limiter:
+            self.rate_limiter.report_success(keys)
+        
+        self._scroll_to_load(profile_name, max_posts, known_urls, overlap, on_scroll)
+        
+        self._record_page_metrics(profile_name, posts_url, load_time)
+        
+        if self.record_dir:
+            record_snapshot(self.driver, self.record_dir, profile_url)
+        return True
+    
+    def capture_raw_posts(self, max_posts):
+        """Take the loaded posts off the page for parsing outside the browser.
         
-        # Scroll to load more posts
+        In script mode the fields are read in the browser in one call;
+        otherwise the page source is returned for parse_activity_html.
+        
+        Args:
+            max_posts: Maximum number of posts to take
+            
+        Returns:
+            Dictionary with either raw_posts (list of field dictionaries) or
+            html and base_url
+        """
+        if self.extraction_mode == "script":
+            return {"raw_posts": self.driver.execute_script(
+                EXTRACT_POSTS_SCRIPT, POST_FIELD_SELECTORS, POST_CONTAINER_SELECTOR, max_posts
+            )}
+        return {"html": self.driver.page_source, "base_url": self.driver.current_url}
+    
+    def _wait_for_slot(self, url):
+        """Wait until the rate limiter allows loading url.
+        
+        Returns:
+            Rate limit bucket keys the page load counts against
+        """
+        keys = navigation_keys(url, self.login_email)
+        if self.rate_limiter:
+            self.rate_limiter.acquire(keys)
+        return keys
+    
+    def _report_failure(self, keys, reason):
+        """Make the rate limiter back off after a failed page load."""
+        if self.rate_limiter:
+            self.rate_limiter.report_failure(keys, reason)
+    
+    def _trim_known(self, posts, known_urls, overlap):
+        """Drop the posts past the incremental cutoff, if known_urls is given."""
+        if not known_urls:
+            return posts
+        cutoff = incremental_cutoff([post["post_url"] for post in posts], known_urls, overlap)
+        return posts if cutoff is None else posts[:cutoff]
+    
+    def _stream_posts(self, posts, streamed, on_posts):
+        """Pass the posts not handed to on_posts yet and remember them in streamed."""
+        batch = posts[len(streamed):]
+        if batch:
+            on_posts(batch)
+            streamed.extend(batch)
+    
+    def _reached_known_posts(self, known_urls, overlap):
+        """Check whether the loaded page already extends past the overlap window."""
+        post_urls = self.driver.execute_script(
+            POST_URLS_SCRIPT, POST_CONTAINER_SELECTOR, POST_FIELD_SELECTORS["post_url"]
+        )
+        return incremental_cutoff(post_urls, known_urls, overlap) is not None
+    
+    def _scroll_to_load(self, profile_name, max_posts, known_urls=None, overlap=0, on_scroll=None):
+        """Scroll the activity page until enough posts are loaded or the feed ends.
+        
+        on_scroll, if given, is called after every scroll that is followed
+        by another one.
+        """
+        self.scroll_metrics = []
         posts_found = 0
         last_height = self.driver.execute_script("return document.body.scrollHeight")
+        last_scroll = None
         
         while posts_found < max_posts:
-            # Scroll down
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            
-            # Wait for page to load
-            time.sleep(random.uniform(2, 4))
+            # In incremental mode, stop once the loaded posts reach stored ones
+            if known_urls and self._reached_known_posts(known_urls, overlap):
+                logger.info(f"Reached already stored posts for {profile_name}; stopping scroll")
+                break
+                
+            # Never scroll faster than min_scroll_interval, whatever the page speed
+            if last_scroll is not None:
+                remaining = self.min_scroll_interval - (time.monotonic() - last_scroll)
+                if remaining > 0:
+                    time.sleep(remaining)
+            last_scroll = time.monotonic()
             
-            # Calculate new scroll height and compare with last scroll height
-            new_height = self.driver.execute_script("return document.body.scrollHeight")
-            posts_elements = self.driver.find_elements(By.XPATH, "//div[contains(@class, 'feed-shared-update-v2')]")
-            posts_found = len(posts_elements)
+            if self.adaptive_scroll:
+                feed_ended = self._scroll_adaptive(posts_found)
+            else:
+                feed_ended = self._scroll_fixed(posts_found, last_height)
+            posts_found = self.scroll_metrics[-1]["posts"]
+            last_height = self.scroll_metrics[-1]["height"]
             
             logger.info(f"Found {posts_found} posts so far...")
             
-            if new_height == last_height or posts_found >= max_posts:
+            if feed_ended:
                 break
                 
-            last_height = new_height
+            if on_scroll and posts_found < max_posts:
+                on_scroll()
+                
+        summary = self.get_scroll_summary()
+        if summary["scrolls"]:
+            logger.info(
+                f"{summary['scrolls']} scrolls for {profile_name}: avg latency "
+                f"{summary['avg_latency']:.2f}s, max {summary['max_latency']:.2f}s, "
+                f"{summary['timeouts']} timed out"
+            )
+    
+    def _scroll_fixed(self, posts_before, last_height):
+        """Scroll, sleep for a random scroll_pause and recount the posts."""
+        started = time.monotonic()
+        self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        
+        # Wait for page to load
+        time.sleep(random.uniform(*self.scroll_pause))
+        
+        # Calculate new scroll height and compare with last scroll height
+        new_height = self.driver.execute_script("return document.body.scrollHeight")
+        posts_found = len(self.driver.find_elements(By.XPATH, POST_CONTAINER_XPATH))
+        latency = time.monotonic() - started
         
-        # Extract post data
+        self._record_scroll(posts_before, posts_found, new_height, latency, latency, new_height == last_height)
+        return new_height == last_height
+    
+    def _scroll_adaptive(self, posts_before):
+        """Scroll and return as soon as new posts appear, or after scroll_timeout."""
+        started = time.monotonic()
+        result = self.driver.execute_async_script(
+            WAIT_FOR_POSTS_SCRIPT, POST_CONTAINER_SELECTOR, posts_before, int(self.scroll_timeout * 1000)
+        )
+        latency = time.monotonic() - started
+        
+        # A short random pause after new content keeps the pace human-like
+        if not result["timed_out"]:
+            time.sleep(random.uniform(*self.scroll_jitter))
+            
+        self._record_scroll(
+            posts_before, result["count"], result["height"], latency,
+            time.monotonic() - started, result["timed_out"]
+        )
+        return result["timed_out"]
+    
+    def _record_scroll(self, posts_before, posts_found, height, latency, duration, timed_out):
+        """Append one entry to scroll_metrics."""
+        self.scroll_metrics.append({
+            "scroll": len(self.scroll_metrics) + 1,
+            "latency": latency,
+            "duration": duration,
+            "new_posts": posts_found - posts_before,
+            "posts": posts_found,
+            "height": height,
+            "timed_out": timed_out,
+        })
+    
+    def get_scroll_summary(self):
+        """Summarize the scroll metrics of the last scraped profile.
+        
+        Returns:
+            Dictionary with scrolls, total_time, avg_latency, max_latency
+            and timeouts
+        """
+        latencies = [metric["latency"] for metric in self.scroll_metrics]
+        return {
+            "scrolls": len(latencies),
+            "total_time": sum(metric["duration"] for metric in self.scroll_metrics),
+            "avg_latency": sum(latencies) / len(latencies) if latencies else 0.0,
+            "max_latency": max(latencies, default=0.0),
+            "timeouts": sum(1 for metric in self.scroll_metrics if metric["timed_out"]),
+        }
+    
+    def _record_page_metrics(self, profile_name, url, load_time):
+        """Append load time and memory of the scrolled page to page_metrics."""
+        try:
+            metrics = self.driver.execute_script(PAGE_METRICS_SCRIPT)
+        except Exception as e:
+            logger.error(f"Error reading page metrics: {str(e)}")
+            metrics = {}
+        metrics.update({
+            "profile": profile_name,
+            "url": url,
+            "driver_profile": self.driver_profile,
+            "load_time": load_time,
+            "browser_rss_bytes": self._browser_memory(),
+        })
+        self.page_metrics.append(metrics)
+        
+        heap = metrics.get("js_heap_bytes")
+        rss = metrics["browser_rss_bytes"]
+        logger.info(
+            f"Page metrics for {profile_name} ({self.driver_profile}): first posts after {load_time:.2f}s, "
+            f"{metrics.get('resources', 0)} requests, {(metrics.get('transfer_bytes') or 0) / 1e6:.1f} MB transferred, "
+            f"JS heap {heap / 1e6 if heap else 0:.1f} MB, browser RSS {rss / 1e6 if rss else 0:.0f} MB"
+        )
+        return metrics
+    
+    def _browser_memory(self):
+        """Get the resident memory of all Chrome processes of this driver, if psutil is installed."""
+        if psutil is None:
+            return None
+        try:
+            service = psutil.Process(self.driver.service.process.pid)
+            return sum(child.memory_info().rss for child in service.children(recursive=True))
+        except (psutil.Error, AttributeError):
+            return None
+    
+    def _extract_posts(self, profile_url, profile_name, max_posts):
+        """Read the posts on the loaded page with the configured extraction mode."""
+        if self.extraction_mode == "elements":
+            return self._extract_posts_by_element(profile_url, profile_name, max_posts)
+        return parse_capture(self.capture_raw_posts(max_posts), profile_url, profile_name, max_posts)
+    
+    def _extract_posts_by_element(self, profile_url, profile_name, max_posts):
+        """Read post fields with one WebDriver round trip per field."""
         posts_data = []
-        posts_elements = self.driver.find_elements(By.XPATH, "//div[contains(@class, 'feed-shared-update-v2')]")
+        posts_elements = self.driver.find_elements(By.XPATH, POST_CONTAINER_XPATH)
         
         for i, post_element in enumerate(posts_elements[:max_posts]):
             try:
@@ -172,15 +901,20 @@ class LinkedInScraper:
                 except NoSuchElementException:
                     shares = 0
                 
-                # Get publish date (approximate from URL or post element)
-                publish_date = datetime.now().strftime("%Y-%m-%d")  # Default to today if can't extract
+                # Get publish time from the activity ID in the URL, else the relative age label
+                try:
+                    published_label = post_element.find_element(By.XPATH, ".//span[contains(@class, 'update-components-actor__sub-description')]").text
+                except NoSuchElementException:
+                    published_label = None
+                published_at = published_timestamp(post_url, published_label)
                 
                 post_data = {
                     "profile_url": profile_url,
                     "profile_name": profile_name,
                     "post_url": post_url,
                     "post_content": post_content,
-                    "publish_date": publish_date,
+                    "publish_date": publish_date_text(published_at),
+                    "published_at": published_at,
                     "likes": likes,
                     "comments": comments,
                     "shares": shares,
@@ -197,19 +931,7 @@ class LinkedInScraper:
     
     def _parse_count(self, count_text):
         """Parse engagement count from text."""
-        if not count_text:
-            return 0
-            
-        count_text = count_text.replace(',', '').strip()
-        
-        if 'K' in count_text:
-            return int(float(count_text.replace('K', '')) * 1000)
-        elif 'M' in count_text:
-            return int(float(count_text.replace('M', '')) * 1000000)
-        elif count_text.isdigit():
-            return int(count_text)
-        else:
-            return 0
+        return parse_count(count_text)
     
     def close(self):
         """Close the WebDriver."""
@@ -217,111 +939,126 @@ class LinkedInScraper:
             self.driver.quit()
             self.driver = None
 
-def save_posts_to_database(posts_data):
+def save_posts_to_database(posts_data, chunk_size=1000, upsert=False, record_snapshots=True):
     """Save scraped posts to the database.
     
     Args:
-        posts_data: List of dictionaries containing post data
+        posts_data: Iterable of dictionaries containing post data
+        chunk_size: Number of rows written per executemany call
+        upsert: Refresh engagement counts of posts that are already stored
+        record_snapshots: Append an engagement snapshot for every post whose
+            counts changed since its last snapshot
+        
+    Returns:
+        Dictionary with inserted, duplicates and rejected counts, or None
+        if the write failed and was rolled back
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    for post in posts_data:
-        try:
-            cursor.execute(
-                """
-                INSERT OR IGNORE INTO posts 
-                (profile_url, profile_name, post_url, post_content, publish_date, likes, comments, shares, collected_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    post["profile_url"],
-                    post["profile_name"],
-                    post["post_url"],
-                    post["post_content"],
-                    post["publish_date"],
-                    post["likes"],
-                    post["comments"],
-                    post["shares"],
-                    post["collected_at"]
-                )
-            )
-        except Exception as e:
-            logger.error(f"Error saving post to database: {str(e)}")
+    try:
+        stats = bulk_insert_posts(
+            posts_data, chunk_size=chunk_size, upsert=upsert, record_snapshots=record_snapshots
+        )
+    except Exception as e:
+        logger.error(f"Error saving posts to database: {str(e)}")
+        return None
     
-    conn.commit()
-    conn.close()
-    logger.info(f"Saved {len(posts_data)} posts to database")
+    logger.info(
+        f"Saved posts to database: {stats['inserted']} inserted, {stats['updated']} updated, "
+        f"{stats['duplicates']} unchanged duplicates, {stats['rejected']} rejected, "
+        f"{stats['snapshots']} engagement snapshots"
+    )
+    return stats
 
-def scrape_linkedin_profiles(profiles_config, max_posts_per_profile=20):
+def scrape_linkedin_profiles(profiles_config, max_posts_per_profile=20, refresh_engagement=True, workers=1,
+                             incremental=False, overlap=3, driver_profile=DEFAULT_DRIVER_PROFILE,
+                             parse_workers=2):
     """Scrape posts from LinkedIn profiles specified in config.
     
+    Profiles run through a ScrapePipeline: a pool of browser workers loads
+    the pages, parser threads turn them into posts and a single writer
+    saves them in batches.
+    
     Args:
         profiles_config: Dictionary containing profile information
         max_posts_per_profile: Maximum number of posts to scrape per profile
+        refresh_engagement: Update likes/comments/shares of posts that are
+            already stored instead of ignoring them
+        workers: Number of concurrent browser workers
+        incremental: Stop scrolling each profile once its already stored
+            posts are reached
+        overlap: Number of stored posts re-scraped per profile in
+            incremental mode to refresh their engagement counts
+        driver_profile: Browser profile of every worker, one of DRIVER_PROFILES
+        parse_workers: Number of parser threads
+        
+    Returns:
+        Run summary from ScrapePipeline.run, including per-stage metrics,
+        or None without a config
     """
+    from src.scrape_orchestrator import profiles_from_config
+    from src.scrape_pipeline import ScrapePipeline
+    
     if not profiles_config:
         logger.error("No profiles configuration provided")
-        return
-    
-    # Initialize and use scraper
-    scraper = LinkedInScraper(headless=True)
+        return None
     
-    try:
-        # Scrape target profile
-        target_profile = profiles_config.get("target_profile")
-        if target_profile:
-            logger.info(f"Scraping target profile: {target_profile['name']}")
-            target_posts = scraper.scrape_profile_posts(
-                target_profile["url"], 
-                target_profile["name"],
-                max_posts=max_posts_per_profile
-            )
-            save_posts_to_database(target_posts)
-        
-        # Scrape competitor profiles
-        competitor_profiles = profiles_config.get("competitor_profiles", [])
-        for profile in competitor_profiles:
-            logger.info(f"Scraping competitor profile: {profile['name']}")
-            competitor_posts = scraper.scrape_profile_posts(
-                profile["url"], 
-                profile["name"],
-                max_posts=max_posts_per_profile
-            )
-            save_posts_to_database(competitor_posts)
-            
-            # Add delay between profiles to avoid rate limiting
-            time.sleep(random.uniform(5, 10))
+    pipeline = ScrapePipeline(
+        fetch_workers=workers,
+        parse_workers=parse_workers,
+        max_posts_per_profile=max_posts_per_profile,
+        refresh_engagement=refresh_engagement,
+        incremental=incremental,
+        overlap=overlap,
+        driver_profile=driver_profile
+    )
+    return pipeline.run(profiles_from_config(profiles_config))
+
+def fetch_known_post_urls(profile_url):
+    """Get the URLs of all stored posts of a profile.
     
-    finally:
-        scraper.close()
+    Args:
+        profile_url: LinkedIn profile URL
+        
+    Returns:
+        Set of post URLs
+    """
+    with db_connection() as conn:
+        rows = conn.execute(
+            "SELECT post_url FROM posts WHERE profile_url = ?", (profile_url,)
+        ).fetchall()
+    return {row[0] for row in rows}
 
-def fetch_posts_from_database(profile_name=None, limit=50):
+def fetch_posts_from_database(profile_name=None, limit=50, include_history=False):
     """Fetch posts from database with optional filter by profile.
     
     Args:
         profile_name: Optional filter by profile name
         limit: Maximum number of posts to fetch
+        include_history: Also fetch posts moved to the archive databases
         
     Returns:
         List of post dictionaries
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    if profile_name:
-        cursor.execute(
-            "SELECT * FROM posts WHERE profile_name = ? ORDER BY likes + comments + shares DESC LIMIT ?",
-            (profile_name, limit)
-        )
-    else:
-        cursor.execute(
-            "SELECT * FROM posts ORDER BY likes + comments + shares DESC LIMIT ?",
-            (limit,)
-        )
+    table = POSTS_HISTORY_VIEW if include_history else "posts"
     
-    columns = [description[0] for description in cursor.description]
-    posts = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    with db_connection() as conn, ExitStack() as stack:
+        if include_history:
+            stack.enter_context(posts_history(conn))
+        cursor = conn.cursor()
+        
+        if profile_name:
+            cursor.execute(
+                f"SELECT * FROM {table} WHERE profile_name = ? ORDER BY total_engagement DESC LIMIT ?",
+                (profile_name, limit)
+            )
+        else:
+            cursor.execute(
+                f"SELECT * FROM {table} ORDER BY total_engagement DESC LIMIT ?",
+                (limit,)
+            )
+        
+        columns = [description[0] for description in cursor.description]
+        posts = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        for post in posts:
+            post["post_content"] = decompress_content(post["post_content"], conn=conn)
     
-    conn.close()
-    return posts
\ No newline at end of file
+    return posts
@@ -0,0 +1,357 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+import logging
+from contextlib import contextmanager
+
+from src.compression import register_sql_functions
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = os.path.join('data', 'posts_database.db')
+
+# Pragmas applied to every pooled connection when it is opened
+DEFAULT_PRAGMAS = {
+    "foreign_keys": "ON",
+}
+
+# Named storage profiles. Each maps PRAGMA name -> value and is applied on
+# top of DEFAULT_PRAGMAS for every connection the pool opens.
+STORAGE_PROFILES = {
+    # SQLite defaults: rollback journal, full sync. Set explicitly because
+    # journal_mode=WAL persists in the database file once enabled.
+    "default": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+    },
+    # WAL lets the dashboard read while the scraper and scheduler write;
+    # busy_timeout makes writers queue instead of failing with "database is locked"
+    "concurrent": {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -65536,       # 64 MB page cache
+        "mmap_size": 268435456,     # 256 MB memory-mapped reads
+        "temp_store": "MEMORY",
+    },
+}
+
+DEFAULT_STORAGE_PROFILE = os.getenv("LINKEDIN_DB_STORAGE_PROFILE", "concurrent")
+
+
+def get_storage_pragmas(storage_profile=DEFAULT_STORAGE_PROFILE):
+    """Get the pragmas for a named storage profile.
+
+    Args:
+        storage_profile: Key of STORAGE_PROFILES
+
+    Returns:
+        Dictionary of PRAGMA name -> value
+    """
+    if storage_profile not in STORAGE_PROFILES:
+        raise ValueError(
+            f"Unknown storage profile: {storage_profile}. "
+            f"Expected one of: {', '.join(STORAGE_PROFILES)}"
+        )
+
+    pragmas = dict(STORAGE_PROFILES[storage_profile])
+    pragmas.update(DEFAULT_PRAGMAS)
+    return pragmas
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes available in time."""
+
+
+class ConnectionPool:
+    def __init__(self, db_path=DB_PATH, max_size=5, timeout=30.0, pragmas=None,
+                 health_check_interval=60.0, storage_profile=DEFAULT_STORAGE_PROFILE):
+        """Initialize a bounded, thread-safe pool of SQLite connections.
+
+        Args:
+            db_path: Path to the SQLite database file
+            max_size: Maximum number of open connections
+            timeout: Seconds to wait for a free connection before giving up
+            pragmas: Dictionary of PRAGMA name -> value applied to each connection,
+                overriding those of the storage profile
+            health_check_interval: Seconds a connection may sit idle before it
+                is validated again on checkout
+            storage_profile: Key of STORAGE_PROFILES used for the base pragmas
+        """
+        self.db_path = db_path
+        self.max_size = max_size
+        self.timeout = timeout
+        self.storage_profile = storage_profile
+        self.pragma_overrides = dict(pragmas or {})
+        self.pragmas = get_storage_pragmas(storage_profile)
+        self.pragmas.update(self.pragma_overrides)
+        self.health_check_interval = health_check_interval
+
+        self._idle = queue.LifoQueue(maxsize=max_size)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._created = 0
+        self._closed = False
+
+        self._metrics = {
+            "checkouts": 0,
+            "total_wait_time": 0.0,
+            "max_wait_time": 0.0,
+            "saturated_checkouts": 0,
+            "timeouts": 0,
+            "connections_created": 0,
+            "connections_discarded": 0,
+            "in_use": 0,
+            "peak_in_use": 0,
+        }
+
+    def connect(self):
+        """Open a new, unpooled connection with the configured pragmas applied."""
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        register_sql_functions(conn, self.db_path)
+
+        with self._lock:
+            self._metrics["connections_created"] += 1
+        return conn
+
+    def _is_healthy(self, conn):
+        """Check that a connection is still usable."""
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error as e:
+            logger.warning(f"Discarding unhealthy pooled connection: {e}")
+            return False
+
+    def _discard(self, conn):
+        """Close a connection and free its slot in the pool."""
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._created -= 1
+            self._metrics["connections_discarded"] += 1
+
+    def _acquire(self):
+        """Take a connection from the pool, opening one if there is room."""
+        start = time.monotonic()
+        saturated = False
+
+        while True:
+            try:
+                conn, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    if self._closed:
+                        raise PoolTimeoutError("Connection pool is closed")
+                    can_create = self._created < self.max_size
+                    if can_create:
+                        self._created += 1
+
+                if can_create:
+                    try:
+                        conn = self.connect()
+                    except Exception:
+                        with self._lock:
+                            self._created -= 1
+                        raise
+                    break
+
+                # Every connection is checked out: wait for one to be returned
+                saturated = True
+                remaining = self.timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    with self._lock:
+                        self._metrics["timeouts"] += 1
+                    raise PoolTimeoutError(
+                        f"Timed out after {self.timeout}s waiting for a database connection"
+                    )
+                try:
+                    conn, last_used = self._idle.get(timeout=remaining)
+                except queue.Empty:
+                    continue
+
+            if time.monotonic() - last_used < self.health_check_interval or self._is_healthy(conn):
+                break
+            self._discard(conn)
+
+        wait_time = time.monotonic() - start
+        with self._lock:
+            self._metrics["checkouts"] += 1
+            self._metrics["total_wait_time"] += wait_time
+            self._metrics["max_wait_time"] = max(self._metrics["max_wait_time"], wait_time)
+            if saturated:
+                self._metrics["saturated_checkouts"] += 1
+            self._metrics["in_use"] += 1
+            self._metrics["peak_in_use"] = max(self._metrics["peak_in_use"], self._metrics["in_use"])
+
+        return conn
+
+    def _release(self, conn):
+        """Return a connection to the pool."""
+        with self._lock:
+            self._metrics["in_use"] -= 1
+            closed = self._closed
+
+        if conn.in_transaction:
+            conn.rollback()
+
+        if closed:
+            self._discard(conn)
+            return
+
+        self._idle.put((conn, time.monotonic()))
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for the current thread.
+
+        Nested checkouts on the same thread reuse the connection that is
+        already held, so helpers can call each other without deadlocking on
+        a small pool. Uncommitted work is rolled back when the outermost
+        checkout ends.
+
+        Yields:
+            sqlite3.Connection
+        """
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            yield held
+            return
+
+        conn = self._acquire()
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._local.in_transaction = False
+            self._release(conn)
+
+    @contextmanager
+    def transaction(self):
+        """Check out a connection and commit on success or roll back on error.
+
+        Nested transactions on the same thread join the outermost one.
+
+        Yields:
+            sqlite3.Connection
+        """
+        with self.connection() as conn:
+            if getattr(self._local, "in_transaction", False):
+                yield conn
+                return
+
+            self._local.in_transaction = True
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                self._local.in_transaction = False
+
+    def get_metrics(self):
+        """Get checkout and saturation metrics for the pool.
+
+        Returns:
+            Dictionary of pool statistics
+        """
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["open_connections"] = self._created
+
+        metrics["idle_connections"] = self._idle.qsize()
+        metrics["max_size"] = self.max_size
+        metrics["avg_wait_time"] = (
+            metrics["total_wait_time"] / metrics["checkouts"] if metrics["checkouts"] else 0.0
+        )
+        metrics["saturation"] = metrics["in_use"] / self.max_size if self.max_size else 0.0
+        return metrics
+
+    def get_settings(self):
+        """Get the arguments this pool was created with, besides db_path.
+
+        Returns:
+            Dictionary of ConnectionPool keyword arguments
+        """
+        return {
+            "max_size": self.max_size,
+            "timeout": self.timeout,
+            "pragmas": dict(self.pragma_overrides),
+            "health_check_interval": self.health_check_interval,
+            "storage_profile": self.storage_profile,
+        }
+
+    def close(self):
+        """Close all idle connections and stop handing out new ones."""
+        with self._lock:
+            self._closed = True
+
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def configure_pool(db_path=DB_PATH, **kwargs):
+    """Replace the shared connection pool with a newly configured one.
+
+    Args:
+        db_path: Path to the SQLite database file
+        **kwargs: Extra arguments passed to ConnectionPool
+
+    Returns:
+        The new ConnectionPool
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = ConnectionPool(db_path, **kwargs)
+        return _pool
+
+
+def set_storage_profile(storage_profile):
+    """Reconfigure the shared pool with another storage profile.
+
+    The database path, size, timeouts and pragma overrides of the current
+    pool are kept.
+
+    Args:
+        storage_profile: Key of STORAGE_PROFILES
+
+    Returns:
+        The shared ConnectionPool
+    """
+    pool = get_pool()
+    if storage_profile == pool.storage_profile:
+        return pool
+    settings = pool.get_settings()
+    settings["storage_profile"] = storage_profile
+    return configure_pool(pool.db_path, **settings)
+
+
+def get_pool():
+    """Get the shared connection pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(DB_PATH)
+        return _pool
@@ -0,0 +1,142 @@
+import time
+import logging
+from datetime import datetime, timedelta
+
+from src.utils import db_connection, db_transaction
+
+logger = logging.getLogger(__name__)
+
+# Append a snapshot for a stored post only when its counts differ from the
+# latest snapshot (delta encoding). Parameters: captured_at, likes, comments,
+# shares, post_url, likes, comments, shares.
+APPEND_SNAPSHOT_SQL = """
+    INSERT INTO post_engagement_snapshots (post_id, captured_at, likes, comments, shares)
+    SELECT p.id, ?, ?, ?, ?
+    FROM posts p
+    WHERE p.post_url = ?
+      AND (
+          SELECT s.likes, s.comments, s.shares
+          FROM post_engagement_snapshots s
+          WHERE s.post_id = p.id
+          ORDER BY s.captured_at DESC
+          LIMIT 1
+      ) IS NOT (?, ?, ?)
+"""
+
+# Keep only the newest snapshot per post within each bucket of old snapshots.
+# Buckets are ISO timestamp prefixes: 13 chars = hour, 10 chars = day.
+_DOWNSAMPLE_SQL = """
+    DELETE FROM post_engagement_snapshots
+    WHERE captured_at < :cutoff
+      AND id NOT IN (
+          SELECT MAX(id)
+          FROM post_engagement_snapshots
+          WHERE captured_at < :cutoff
+          GROUP BY post_id, substr(captured_at, 1, :bucket_length)
+      )
+"""
+
+HOURLY_BUCKET = 13
+DAILY_BUCKET = 10
+
+
+def append_snapshots(conn, snapshots):
+    """Append engagement snapshots for posts whose counts changed.
+
+    Args:
+        conn: SQLite connection (the caller owns the transaction)
+        snapshots: Iterable of (post_url, captured_at, likes, comments, shares)
+
+    Returns:
+        Number of snapshots appended
+    """
+    params = [
+        (captured_at, likes, comments, shares, post_url, likes, comments, shares)
+        for post_url, captured_at, likes, comments, shares in snapshots
+    ]
+    if not params:
+        return 0
+    return conn.executemany(APPEND_SNAPSHOT_SQL, params).rowcount
+
+
+def get_engagement_history(post_id):
+    """Get the engagement snapshots recorded for a post.
+
+    Args:
+        post_id: ID of the post in the posts table
+
+    Returns:
+        List of snapshot dictionaries ordered by capture time
+    """
+    with db_connection() as conn:
+        rows = conn.execute(
+            """
+            SELECT captured_at, likes, comments, shares
+            FROM post_engagement_snapshots
+            WHERE post_id = ?
+            ORDER BY captured_at ASC
+            """,
+            (post_id,)
+        ).fetchall()
+
+    return [
+        {"captured_at": row[0], "likes": row[1], "comments": row[2], "shares": row[3]}
+        for row in rows
+    ]
+
+
+def compact_snapshots(raw_retention_days=2, hourly_retention_days=30, now=None):
+    """Downsample old engagement snapshots.
+
+    Snapshots newer than raw_retention_days are kept as recorded. Older ones
+    are reduced to the last snapshot per post per hour, and those older than
+    hourly_retention_days to the last snapshot per post per day.
+
+    Args:
+        raw_retention_days: Age in days after which snapshots become hourly
+        hourly_retention_days: Age in days after which snapshots become daily
+        now: Reference time (defaults to the current time)
+
+    Returns:
+        Number of snapshots deleted
+    """
+    now = now or datetime.now()
+    hourly_cutoff = (now - timedelta(days=raw_retention_days)).isoformat()
+    daily_cutoff = (now - timedelta(days=hourly_retention_days)).isoformat()
+
+    with db_transaction() as conn:
+        deleted = conn.execute(
+            _DOWNSAMPLE_SQL, {"cutoff": hourly_cutoff, "bucket_length": HOURLY_BUCKET}
+        ).rowcount
+        deleted += conn.execute(
+            _DOWNSAMPLE_SQL, {"cutoff": daily_cutoff, "bucket_length": DAILY_BUCKET}
+        ).rowcount
+
+    logger.info(f"Compacted engagement snapshots: {deleted} removed")
+    return deleted
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Downsample old engagement snapshots")
+    parser.add_argument("--raw-days", type=int, default=2, help="Keep raw snapshots this many days")
+    parser.add_argument("--hourly-days", type=int, default=30, help="Keep hourly snapshots this many days")
+    parser.add_argument("--daemon", action="store_true", help="Keep running and compact every --interval seconds")
+    parser.add_argument("--interval", type=int, default=3600, help="Seconds between runs in daemon mode")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    if not args.daemon:
+        compact_snapshots(args.raw_days, args.hourly_days)
+    else:
+        try:
+            while True:
+                try:
+                    compact_snapshots(args.raw_days, args.hourly_days)
+                except Exception as e:
+                    logger.error(f"Error compacting engagement snapshots: {e}")
+                time.sleep(args.interval)
+        except KeyboardInterrupt:
+            pass
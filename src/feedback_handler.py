@@ -162,14 +162,13 @@
 #             self.conn.close()
 import logging
 from datetime import datetime
-from src.utils import get_db_connection, update_post_feedback
+from src.utils import db_connection, update_post_feedback
 
 logger = logging.getLogger(__name__)
 
 class FeedbackHandler:
     def __init__(self):
         """Initialize the feedback handler."""
-        self.conn = get_db_connection()
         
     def record_feedback(self, post_id, feedback_score, feedback_text):
         """Record feedback for a generated post.
@@ -196,17 +195,17 @@ class FeedbackHandler:
             Dictionary with feedback summary
         """
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                SELECT 
-                    COUNT(*) as total,
-                    AVG(feedback_score) as average,
-                    feedback_score
-                FROM generated_posts 
-                WHERE feedback_score IS NOT NULL
-                GROUP BY feedback_score
-                ORDER BY feedback_score ASC
-            """)
+            with db_connection() as conn:
+                rows = conn.execute("""
+                    SELECT 
+                        COUNT(*) as total,
+                        AVG(feedback_score) as average,
+                        feedback_score
+                    FROM generated_posts 
+                    WHERE feedback_score IS NOT NULL
+                    GROUP BY feedback_score
+                    ORDER BY feedback_score ASC
+                """).fetchall()
             
             summary = {
                 "total_feedback": 0,
@@ -214,7 +213,6 @@ class FeedbackHandler:
                 "score_distribution": {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
             }
             
-            rows = cursor.fetchall()
             if rows:
                 # Calculate total and populate score distribution
                 total = 0
@@ -249,23 +247,23 @@ class FeedbackHandler:
             List of feedback records
         """
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                SELECT 
-                    id, 
-                    content, 
-                    hashtags, 
-                    generated_at, 
-                    feedback_score, 
-                    feedback_text
-                FROM generated_posts 
-                WHERE feedback_score IS NOT NULL
-                ORDER BY generated_at DESC
-                LIMIT ?
-            """, (limit,))
+            with db_connection() as conn:
+                rows = conn.execute("""
+                    SELECT 
+                        id, 
+                        decompress_content(content), 
+                        hashtags, 
+                        generated_at, 
+                        feedback_score, 
+                        feedback_text
+                    FROM generated_posts 
+                    WHERE feedback_score IS NOT NULL
+                    ORDER BY generated_at DESC
+                    LIMIT ?
+                """, (limit,)).fetchall()
             
             history = []
-            for row in cursor.fetchall():
+            for row in rows:
                 history.append({
                     "id": row[0],
                     "content": row[1],
@@ -281,6 +279,8 @@ class FeedbackHandler:
             return []
     
     def close(self):
-        """Close the database connection."""
-        if self.conn:
-            self.conn.close()
\ No newline at end of file
+        """Release resources.
+        
+        Connections are borrowed from the shared pool per call, so there is
+        nothing to close; kept for API compatibility.
+        """
\ No newline at end of file
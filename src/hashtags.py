@@ -0,0 +1,245 @@
+import json
+import logging
+import re
+from collections import Counter
+from contextlib import contextmanager
+
+from src.archive import HASHTAGS_HISTORY_VIEW, POSTS_HISTORY_VIEW, posts_history
+from src.compression import decompress_content
+from src.db_pool import get_pool
+
+logger = logging.getLogger(__name__)
+
+HASHTAG_PATTERN = re.compile(r'#(\w+)')
+
+
+def extract_hashtags(*texts):
+    """Extract the distinct, lower-cased hashtags from one or more texts.
+
+    Args:
+        *texts: Strings to scan (None values are skipped)
+
+    Returns:
+        Sorted list of tags without the leading '#'
+    """
+    tags = set()
+    for text in texts:
+        if text:
+            tags.update(tag.lower() for tag in HASHTAG_PATTERN.findall(text))
+    return sorted(tags)
+
+
+def count_hashtags(text):
+    """Count how often each lower-cased hashtag occurs in a text.
+
+    Args:
+        text: String to scan (None counts as empty)
+
+    Returns:
+        Counter of tag without the leading '#' -> occurrences
+    """
+    return Counter(tag.lower() for tag in HASHTAG_PATTERN.findall(text or ''))
+
+
+def index_post_hashtags(conn, posts):
+    """Store the hashtags of scraped posts, with their occurrences, in post_hashtags.
+
+    Args:
+        conn: SQLite connection (the caller owns the transaction)
+        posts: Iterable of (post_url, post_content) tuples for stored posts
+
+    Returns:
+        Number of (post, tag) rows added
+    """
+    params = [
+        (tag, occurrences, post_url)
+        for post_url, content in posts
+        for tag, occurrences in count_hashtags(content).items()
+    ]
+    if not params:
+        return 0
+    return conn.executemany(
+        "INSERT OR IGNORE INTO post_hashtags (post_id, tag, occurrences) SELECT id, ?, ? FROM posts WHERE post_url = ?",
+        params
+    ).rowcount
+
+
+def backfill_hashtag_occurrences(conn, schema="main"):
+    """Recount how often every stored tag occurs in the content of its post.
+
+    Args:
+        conn: SQLite connection (the caller owns the transaction)
+        schema: Database holding posts and post_hashtags, such as an
+            attached archive
+
+    Returns:
+        Number of (post, tag) rows whose tag occurs more than once
+    """
+    rows = conn.execute(
+        f"SELECT id, post_content FROM {schema}.posts WHERE id IN (SELECT post_id FROM {schema}.post_hashtags)"
+    ).fetchall()
+    params = [
+        (occurrences, post_id, tag)
+        for post_id, content in rows
+        for tag, occurrences in count_hashtags(decompress_content(content, conn=conn)).items()
+        if occurrences > 1
+    ]
+    conn.executemany(
+        f"UPDATE {schema}.post_hashtags SET occurrences = ? WHERE post_id = ? AND tag = ?", params
+    )
+    return len(params)
+
+
+def index_generated_post_hashtags(conn, post_id, content, hashtags):
+    """Store the hashtags of a generated post in generated_post_hashtags.
+
+    Args:
+        conn: SQLite connection (the caller owns the transaction)
+        post_id: ID of the generated post
+        content: Post content, which may contain inline hashtags
+        hashtags: Space-joined hashtag string saved with the post
+
+    Returns:
+        Number of (post, tag) rows added
+    """
+    params = [(post_id, tag) for tag in extract_hashtags(content, hashtags)]
+    if not params:
+        return 0
+    return conn.executemany(
+        "INSERT OR IGNORE INTO generated_post_hashtags (post_id, tag) VALUES (?, ?)",
+        params
+    ).rowcount
+
+
+@contextmanager
+def _tag_tables(include_history):
+    """Check out a connection and name the posts and hashtag tables to read.
+
+    Yields:
+        Tuple of (connection, posts table, hashtags table)
+    """
+    with get_pool().connection() as conn:
+        if include_history:
+            with posts_history(conn):
+                yield conn, POSTS_HISTORY_VIEW, HASHTAGS_HISTORY_VIEW
+        else:
+            yield conn, "posts", "post_hashtags"
+
+
+def hashtag_frequency(limit=15, profile_name=None, include_history=False):
+    """Get the most used hashtags across scraped posts.
+
+    Every occurrence counts, so a post that repeats a tag adds it more than
+    once, as counting all #tag matches of the content would.
+
+    Args:
+        limit: Maximum number of tags to return
+        profile_name: Optional filter by profile name
+        include_history: Also count archived posts
+
+    Returns:
+        List of (tag, occurrences) tuples, most used first
+    """
+    with _tag_tables(include_history) as (conn, posts_table, hashtags_table):
+        if profile_name:
+            rows = conn.execute(
+                f"""
+                SELECT h.tag, SUM(h.occurrences) AS uses
+                FROM {hashtags_table} h
+                JOIN {posts_table} p ON p.id = h.post_id
+                WHERE p.profile_name = ?
+                GROUP BY h.tag
+                ORDER BY uses DESC, h.tag
+                LIMIT ?
+                """,
+                (profile_name, limit)
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                f"""
+                SELECT tag, SUM(occurrences) AS uses
+                FROM {hashtags_table}
+                GROUP BY tag
+                ORDER BY uses DESC, tag
+                LIMIT ?
+                """,
+                (limit,)
+            ).fetchall()
+
+    return [(row[0], row[1]) for row in rows]
+
+
+def hashtag_engagement(limit=15, min_posts=2):
+    """Get hashtags ranked by the average engagement of posts using them.
+
+    Args:
+        limit: Maximum number of tags to return
+        min_posts: Ignore tags used on fewer posts than this
+
+    Returns:
+        List of dictionaries with tag, post_count and avg_engagement
+    """
+    with get_pool().connection() as conn:
+        rows = conn.execute(
+            """
+            SELECT h.tag, COUNT(*) AS post_count, AVG(p.total_engagement) AS avg_engagement
+            FROM post_hashtags h
+            JOIN posts p ON p.id = h.post_id
+            GROUP BY h.tag
+            HAVING COUNT(*) >= ?
+            ORDER BY avg_engagement DESC
+            LIMIT ?
+            """,
+            (min_posts, limit)
+        ).fetchall()
+
+    return [
+        {"tag": row[0], "post_count": row[1], "avg_engagement": row[2]}
+        for row in rows
+    ]
+
+
+def hashtags_for_posts(post_ids, include_history=False):
+    """Get the stored hashtags of several scraped posts in one query.
+
+    Args:
+        post_ids: Iterable of post IDs
+        include_history: Also look up archived posts
+
+    Returns:
+        Dictionary of post_id -> sorted list of tags
+    """
+    post_ids = [int(post_id) for post_id in post_ids]
+    tags_by_post = {post_id: [] for post_id in post_ids}
+    if not post_ids:
+        return tags_by_post
+
+    with _tag_tables(include_history) as (conn, _, hashtags_table):
+        rows = conn.execute(
+            f"""
+            SELECT post_id, tag FROM {hashtags_table}
+            WHERE post_id IN (SELECT value FROM json_each(?))
+            ORDER BY post_id, tag
+            """,
+            (json.dumps(post_ids),)
+        ).fetchall()
+
+    for post_id, tag in rows:
+        tags_by_post[post_id].append(tag)
+    return tags_by_post
+
+
+def hashtag_counts_by_post(include_history=False):
+    """Get the number of distinct hashtags on every scraped post that has any.
+
+    Args:
+        include_history: Also count archived posts
+
+    Returns:
+        Dictionary of post_id -> hashtag count
+    """
+    with _tag_tables(include_history) as (conn, _, hashtags_table):
+        rows = conn.execute(
+            f"SELECT post_id, COUNT(*) FROM {hashtags_table} GROUP BY post_id"
+        ).fetchall()
+    return dict(rows)
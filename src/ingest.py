@@ -0,0 +1,206 @@
+import json
+import logging
+from datetime import datetime
+from itertools import islice
+
+from src.compression import compress_content, prepare_compressed_writes
+from src.engagement_history import append_snapshots
+from src.features import index_post_features
+from src.hashtags import index_post_hashtags
+from src.utils import db_transaction
+
+logger = logging.getLogger(__name__)
+
+# Column order shared by every bulk write into the posts table
+POST_COLUMNS = (
+    "profile_url",
+    "profile_name",
+    "post_url",
+    "post_content",
+    "publish_date",
+    "published_at",
+    "likes",
+    "comments",
+    "shares",
+    "collected_at",
+)
+
+INSERT_POST_SQL = f"""
+    INSERT OR IGNORE INTO posts ({', '.join(POST_COLUMNS)})
+    VALUES ({', '.join('?' for _ in POST_COLUMNS)})
+"""
+
+# Refresh engagement counts of already-stored posts and fill in a publish time
+# that was not known before. The WHERE clause skips rows where neither
+# changed, so unchanged posts cost no write.
+UPSERT_POST_SQL = f"""
+    INSERT INTO posts ({', '.join(POST_COLUMNS)})
+    VALUES ({', '.join('?' for _ in POST_COLUMNS)})
+    ON CONFLICT(post_url) DO UPDATE SET
+        likes = excluded.likes,
+        comments = excluded.comments,
+        shares = excluded.shares,
+        collected_at = excluded.collected_at,
+        publish_date = CASE WHEN posts.published_at IS NULL AND excluded.published_at IS NOT NULL
+                            THEN excluded.publish_date ELSE posts.publish_date END,
+        published_at = COALESCE(posts.published_at, excluded.published_at)
+    WHERE posts.likes IS NOT excluded.likes
+       OR posts.comments IS NOT excluded.comments
+       OR posts.shares IS NOT excluded.shares
+       OR (posts.published_at IS NULL AND excluded.published_at IS NOT NULL)
+"""
+
+_POST_URL_INDEX = POST_COLUMNS.index("post_url")
+_POST_CONTENT_INDEX = POST_COLUMNS.index("post_content")
+_SNAPSHOT_INDEXES = tuple(
+    POST_COLUMNS.index(column)
+    for column in ("post_url", "collected_at", "likes", "comments", "shares")
+)
+
+
+def _chunked(iterable, size):
+    """Yield lists of up to size items from any iterable."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _to_count(value):
+    """Convert an engagement count to a non-negative integer."""
+    if value is None or value == "":
+        return 0
+    count = int(value)
+    if count < 0:
+        raise ValueError(f"Negative engagement count: {value}")
+    return count
+
+
+def _to_timestamp(value):
+    """Convert a publish time to integer epoch seconds (or None if unknown)."""
+    if value is None or value == "":
+        return None
+    return int(value)
+
+
+def post_to_row(post):
+    """Convert a scraped post dictionary into a posts table row.
+
+    Args:
+        post: Dictionary with the keys in POST_COLUMNS (post_url is required)
+
+    Returns:
+        Tuple of column values in POST_COLUMNS order
+
+    Raises:
+        ValueError, TypeError, KeyError: If the post cannot be stored
+    """
+    post_url = post["post_url"]
+    if not post_url or not isinstance(post_url, str):
+        raise ValueError(f"Invalid post URL: {post_url!r}")
+
+    return (
+        post.get("profile_url"),
+        post.get("profile_name"),
+        post_url,
+        post.get("post_content") or "",
+        post.get("publish_date"),
+        _to_timestamp(post.get("published_at")),
+        _to_count(post.get("likes")),
+        _to_count(post.get("comments")),
+        _to_count(post.get("shares")),
+        post.get("collected_at") or datetime.now().isoformat(),
+    )
+
+
+def _prepare_chunk(chunk, stats):
+    """Convert a chunk of post dictionaries to rows, counting rejects."""
+    rows = []
+    for post in chunk:
+        try:
+            rows.append(post_to_row(post))
+        except (KeyError, TypeError, ValueError) as e:
+            stats["rejected"] += 1
+            logger.debug(f"Rejected post {post.get('post_url') if isinstance(post, dict) else post!r}: {e}")
+    return rows
+
+
+def _storage_rows(conn, rows):
+    """Compress the post_content of rows as configured by CONTENT_COMPRESSION."""
+    return [
+        row[:_POST_CONTENT_INDEX]
+        + (compress_content(row[_POST_CONTENT_INDEX], conn=conn),)
+        + row[_POST_CONTENT_INDEX + 1:]
+        for row in rows
+    ]
+
+
+def _count_new(conn, rows):
+    """Count the distinct post URLs in rows that are not stored yet."""
+    urls = list({row[_POST_URL_INDEX] for row in rows})
+    existing = conn.execute(
+        "SELECT COUNT(*) FROM posts WHERE post_url IN (SELECT value FROM json_each(?))",
+        (json.dumps(urls),)
+    ).fetchone()[0]
+    return len(urls) - existing
+
+
+def bulk_insert_posts(posts, chunk_size=1000, upsert=False, record_snapshots=False):
+    """Insert scraped posts in chunks inside a single transaction.
+
+    Posts are consumed lazily, so generators of any size can be streamed in.
+    By default rows whose post_url already exists are ignored. With upsert,
+    their likes, comments, shares and collected_at are refreshed instead, but
+    only when a count actually changed. If the database write fails the whole
+    batch is rolled back and the error is raised.
+
+    Args:
+        posts: Iterable of post dictionaries
+        chunk_size: Number of rows passed to each executemany call
+        upsert: Refresh engagement counts of posts that are already stored
+        record_snapshots: Append to post_engagement_snapshots for every post
+            whose counts differ from its latest snapshot
+
+    Returns:
+        Dictionary with inserted, updated, duplicates (stored and unchanged),
+        rejected and snapshots counts
+    """
+    stats = {"inserted": 0, "updated": 0, "duplicates": 0, "rejected": 0, "snapshots": 0}
+    sql = UPSERT_POST_SQL if upsert else INSERT_POST_SQL
+
+    with db_transaction() as conn:
+        prepare_compressed_writes(conn)
+        for chunk in _chunked(posts, chunk_size):
+            rows = _prepare_chunk(chunk, stats)
+            if not rows:
+                continue
+
+            # Upserted rows count as changes too, so find the new ones first
+            new_posts = _count_new(conn, rows) if upsert else None
+
+            cursor = conn.executemany(sql, _storage_rows(conn, rows))
+            written = cursor.rowcount
+            inserted = written if new_posts is None else min(new_posts, written)
+
+            stats["inserted"] += inserted
+            stats["updated"] += written - inserted
+            stats["duplicates"] += len(rows) - written
+
+            # Content is never changed by an upsert, so tags and features of stored
+            # posts are stable. Both are taken from the raw rows, before content is
+            # compressed.
+            index_post_hashtags(
+                conn, ((row[_POST_URL_INDEX], row[_POST_CONTENT_INDEX]) for row in rows)
+            )
+            index_post_features(
+                conn, ((row[_POST_URL_INDEX], row[_POST_CONTENT_INDEX]) for row in rows)
+            )
+
+            if record_snapshots:
+                stats["snapshots"] += append_snapshots(
+                    conn, (tuple(row[i] for i in _SNAPSHOT_INDEXES) for row in rows)
+                )
+
+    return stats
@@ -1,68 +1,43 @@
-import os
-import sqlite3
 import logging
+from src.db_pool import get_pool, set_storage_profile
+from src.migrations import apply_migrations
 from src.utils import ensure_directories
 
 logger = logging.getLogger(__name__)
 
-def initialize_database():
-    """Initialize SQLite database for storing LinkedIn posts data."""
-    # Ensure directories exist
-    ensure_directories()
-    
-    db_path = os.path.join('data', 'posts_database.db')
-    
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+def initialize_database(storage_profile=None):
+    """Initialize SQLite database for storing LinkedIn posts data.
     
-    # Create tables if they don't exist
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS posts (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            profile_url TEXT,
-            profile_name TEXT,
-            post_url TEXT UNIQUE,
-            post_content TEXT,
-            publish_date TEXT,
-            likes INTEGER,
-            comments INTEGER,
-            shares INTEGER,
-            collected_at TEXT
-        )
-    ''')
+    Args:
+        storage_profile: Optional key of STORAGE_PROFILES (e.g. "concurrent"
+            for WAL mode). When given, the shared connection pool is
+            reconfigured so every connection uses the profile's pragmas.
     
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS generated_posts (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            content TEXT,
-            hashtags TEXT,
-            generated_at TEXT,
-            feedback_score INTEGER,
-            feedback_text TEXT,
-            scheduled_time TEXT,
-            published INTEGER DEFAULT 0,
-            profile TEXT,
-            topic TEXT,
-            tone TEXT
-        )
-    ''')
+    Returns:
+        Path to the database file
+    """
+    # Ensure directories exist
+    ensure_directories()
     
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS analytics (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            metric_name TEXT,
-            metric_value REAL,
-            recorded_at TEXT
-        )
-    ''')
+    pool = set_storage_profile(storage_profile) if storage_profile else get_pool()
+    db_path = pool.db_path
     
-    conn.commit()
-    conn.close()
+    with pool.connection() as conn:
+        apply_migrations(conn)
+        journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
     
-    logger.info(f"Database initialized at {db_path}")
+    logger.info(f"Database initialized at {db_path} (storage profile: {pool.storage_profile}, journal mode: {journal_mode})")
     return db_path
 
 if __name__ == "__main__":
+    import argparse
+    from src.db_pool import DEFAULT_STORAGE_PROFILE, STORAGE_PROFILES
+    
+    parser = argparse.ArgumentParser(description="Initialize the posts database")
+    parser.add_argument("--storage-profile", choices=sorted(STORAGE_PROFILES), default=DEFAULT_STORAGE_PROFILE,
+                        help="Pragma profile applied to every connection")
+    args = parser.parse_args()
+    
     logging.basicConfig(level=logging.INFO)
-    db_path = initialize_database()
+    db_path = initialize_database(storage_profile=args.storage_profile)
     print(f"Database initialized at: {db_path}")
\ No newline at end of file
@@ -0,0 +1,775 @@
+import logging
+import sqlite3
+from datetime import datetime
+
+from src.publish_dates import backfill_published_at
+
+logger = logging.getLogger(__name__)
+
+
+def _column_exists(conn, table, column):
+    """Check whether a table already has a column (including generated ones)."""
+    rows = conn.execute(f"PRAGMA table_xinfo({table})").fetchall()
+    return any(row[1] == column for row in rows)
+
+
+def _add_column_if_missing(conn, table, column, definition):
+    """Add a column to a table unless it is already there."""
+    if not _column_exists(conn, table, column):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def _migration_001_base_schema(conn):
+    """Create the original posts, generated_posts and analytics tables."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS posts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            profile_url TEXT,
+            profile_name TEXT,
+            post_url TEXT UNIQUE,
+            post_content TEXT,
+            publish_date TEXT,
+            likes INTEGER,
+            comments INTEGER,
+            shares INTEGER,
+            collected_at TEXT
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS generated_posts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            content TEXT,
+            hashtags TEXT,
+            generated_at TEXT,
+            feedback_score INTEGER,
+            feedback_text TEXT,
+            scheduled_time TEXT,
+            published INTEGER DEFAULT 0,
+            profile TEXT,
+            topic TEXT,
+            tone TEXT
+        )
+    ''')
+
+    # Databases created by early versions lack the generation metadata columns
+    for column in ("profile", "topic", "tone"):
+        _add_column_if_missing(conn, "generated_posts", column, "TEXT")
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS analytics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            metric_name TEXT,
+            metric_value REAL,
+            recorded_at TEXT
+        )
+    ''')
+
+
+def _migration_002_engagement_indexes(conn):
+    """Add total_engagement and the indexes behind the dashboard's hot queries."""
+    # ALTER TABLE can only add VIRTUAL generated columns; the computed value
+    # is materialized in the indexes below, which is what the sorts read.
+    _add_column_if_missing(
+        conn, "posts", "total_engagement",
+        "INTEGER GENERATED ALWAYS AS "
+        "(COALESCE(likes, 0) + COALESCE(comments, 0) + COALESCE(shares, 0)) VIRTUAL"
+    )
+
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_posts_total_engagement "
+        "ON posts (total_engagement DESC)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_posts_profile_engagement "
+        "ON posts (profile_name, total_engagement DESC)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_generated_posts_scheduled "
+        "ON generated_posts (scheduled_time) WHERE scheduled_time IS NOT NULL"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_generated_posts_feedback_recent "
+        "ON generated_posts (generated_at DESC) WHERE feedback_score IS NOT NULL"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_generated_posts_feedback_score "
+        "ON generated_posts (feedback_score) WHERE feedback_score IS NOT NULL"
+    )
+
+
+def _migration_003_engagement_snapshots(conn):
+    """Add the delta-encoded engagement history table."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS post_engagement_snapshots (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            post_id INTEGER NOT NULL REFERENCES posts (id) ON DELETE CASCADE,
+            captured_at TEXT NOT NULL,
+            likes INTEGER,
+            comments INTEGER,
+            shares INTEGER
+        )
+    ''')
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_engagement_snapshots_post_time "
+        "ON post_engagement_snapshots (post_id, captured_at)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_engagement_snapshots_time "
+        "ON post_engagement_snapshots (captured_at)"
+    )
+
+    # Seed the history with the counts already stored for each post
+    conn.execute('''
+        INSERT INTO post_engagement_snapshots (post_id, captured_at, likes, comments, shares)
+        SELECT id, COALESCE(collected_at, ?), likes, comments, shares
+        FROM posts
+        WHERE id NOT IN (SELECT post_id FROM post_engagement_snapshots)
+    ''', (datetime.now().isoformat(),))
+
+
+def fts5_available(conn):
+    """Check whether the SQLite library was compiled with FTS5."""
+    options = {row[0] for row in conn.execute("PRAGMA compile_options").fetchall()}
+    return "ENABLE_FTS5" in options
+
+
+_POSTS_FTS_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_insert AFTER INSERT ON posts BEGIN
+        INSERT INTO posts_fts (rowid, post_content) VALUES (new.id, new.post_content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_delete AFTER DELETE ON posts BEGIN
+        INSERT INTO posts_fts (posts_fts, rowid, post_content) VALUES ('delete', old.id, old.post_content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_update AFTER UPDATE OF post_content ON posts BEGIN
+        INSERT INTO posts_fts (posts_fts, rowid, post_content) VALUES ('delete', old.id, old.post_content);
+        INSERT INTO posts_fts (rowid, post_content) VALUES (new.id, new.post_content);
+    END
+    """,
+)
+
+_GENERATED_POSTS_FTS_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS generated_posts_fts_insert AFTER INSERT ON generated_posts BEGIN
+        INSERT INTO generated_posts_fts (rowid, content, hashtags) VALUES (new.id, new.content, new.hashtags);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS generated_posts_fts_delete AFTER DELETE ON generated_posts BEGIN
+        INSERT INTO generated_posts_fts (generated_posts_fts, rowid, content, hashtags)
+        VALUES ('delete', old.id, old.content, old.hashtags);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS generated_posts_fts_update AFTER UPDATE OF content, hashtags ON generated_posts BEGIN
+        INSERT INTO generated_posts_fts (generated_posts_fts, rowid, content, hashtags)
+        VALUES ('delete', old.id, old.content, old.hashtags);
+        INSERT INTO generated_posts_fts (rowid, content, hashtags) VALUES (new.id, new.content, new.hashtags);
+    END
+    """,
+)
+
+
+def _migration_004_full_text_search(conn):
+    """Add FTS5 indexes over scraped and generated post content."""
+    if not fts5_available(conn):
+        logger.warning("SQLite was built without FTS5; full-text search will be unavailable")
+        return
+
+    # External-content tables: the text lives in posts/generated_posts and the
+    # triggers below keep the inverted index in sync with every write.
+    conn.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts
+        USING fts5(post_content, content='posts', content_rowid='id')
+    ''')
+    # executescript() would commit the migration transaction, so run one by one
+    for trigger in _POSTS_FTS_TRIGGERS:
+        conn.execute(trigger)
+
+    conn.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS generated_posts_fts
+        USING fts5(content, hashtags, content='generated_posts', content_rowid='id')
+    ''')
+    for trigger in _GENERATED_POSTS_FTS_TRIGGERS:
+        conn.execute(trigger)
+
+    # Index the rows that existed before the triggers
+    conn.execute("INSERT INTO posts_fts (posts_fts) VALUES ('rebuild')")
+    conn.execute("INSERT INTO generated_posts_fts (generated_posts_fts) VALUES ('rebuild')")
+
+
+def _migration_005_hashtags(conn):
+    """Add normalized hashtag tables and backfill them from stored content."""
+    from src.hashtags import extract_hashtags
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS post_hashtags (
+            post_id INTEGER NOT NULL REFERENCES posts (id) ON DELETE CASCADE,
+            tag TEXT NOT NULL,
+            PRIMARY KEY (post_id, tag)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_post_hashtags_tag ON post_hashtags (tag, post_id)")
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS generated_post_hashtags (
+            post_id INTEGER NOT NULL REFERENCES generated_posts (id) ON DELETE CASCADE,
+            tag TEXT NOT NULL,
+            PRIMARY KEY (post_id, tag)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_generated_post_hashtags_tag "
+        "ON generated_post_hashtags (tag, post_id)"
+    )
+
+    cursor = conn.execute("SELECT id, post_content FROM posts WHERE post_content LIKE '%#%'")
+    conn.executemany(
+        "INSERT OR IGNORE INTO post_hashtags (post_id, tag) VALUES (?, ?)",
+        ((post_id, tag) for post_id, content in cursor.fetchall() for tag in extract_hashtags(content))
+    )
+
+    cursor = conn.execute("SELECT id, content, hashtags FROM generated_posts")
+    conn.executemany(
+        "INSERT OR IGNORE INTO generated_post_hashtags (post_id, tag) VALUES (?, ?)",
+        (
+            (post_id, tag)
+            for post_id, content, hashtags in cursor.fetchall()
+            for tag in extract_hashtags(content, hashtags)
+        )
+    )
+
+
+_POSTS_FTS_DECOMPRESSING_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_insert AFTER INSERT ON posts BEGIN
+        INSERT INTO posts_fts (rowid, post_content) VALUES (new.id, decompress_content(new.post_content));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_delete AFTER DELETE ON posts BEGIN
+        INSERT INTO posts_fts (posts_fts, rowid, post_content)
+        VALUES ('delete', old.id, decompress_content(old.post_content));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_update AFTER UPDATE OF post_content ON posts BEGIN
+        INSERT INTO posts_fts (posts_fts, rowid, post_content)
+        VALUES ('delete', old.id, decompress_content(old.post_content));
+        INSERT INTO posts_fts (rowid, post_content) VALUES (new.id, decompress_content(new.post_content));
+    END
+    """,
+)
+
+_GENERATED_POSTS_FTS_DECOMPRESSING_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS generated_posts_fts_insert AFTER INSERT ON generated_posts BEGIN
+        INSERT INTO generated_posts_fts (rowid, content, hashtags)
+        VALUES (new.id, decompress_content(new.content), new.hashtags);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS generated_posts_fts_delete AFTER DELETE ON generated_posts BEGIN
+        INSERT INTO generated_posts_fts (generated_posts_fts, rowid, content, hashtags)
+        VALUES ('delete', old.id, decompress_content(old.content), old.hashtags);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS generated_posts_fts_update AFTER UPDATE OF content, hashtags ON generated_posts BEGIN
+        INSERT INTO generated_posts_fts (generated_posts_fts, rowid, content, hashtags)
+        VALUES ('delete', old.id, decompress_content(old.content), old.hashtags);
+        INSERT INTO generated_posts_fts (rowid, content, hashtags)
+        VALUES (new.id, decompress_content(new.content), new.hashtags);
+    END
+    """,
+)
+
+
+def set_fts_decompression(conn, enabled):
+    """Switch the FTS triggers between plain and decompressing versions.
+
+    Decompressing triggers index the text of compressed BLOBs but call
+    decompress_content(), which only pooled connections register. They are
+    needed exactly while some content is stored compressed; otherwise the
+    plain triggers keep the database writable from any SQLite client.
+
+    Args:
+        conn: SQLite connection (the caller owns the transaction)
+        enabled: Install the decompressing triggers instead of the plain ones
+
+    Returns:
+        True if the triggers were replaced, False if they were already set
+    """
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    trigger_sets = []
+    if "posts_fts" in tables:
+        trigger_sets.append((
+            ("posts_fts_insert", "posts_fts_delete", "posts_fts_update"),
+            _POSTS_FTS_DECOMPRESSING_TRIGGERS if enabled else _POSTS_FTS_TRIGGERS,
+        ))
+    if "generated_posts_fts" in tables:
+        trigger_sets.append((
+            ("generated_posts_fts_insert", "generated_posts_fts_delete", "generated_posts_fts_update"),
+            _GENERATED_POSTS_FTS_DECOMPRESSING_TRIGGERS if enabled else _GENERATED_POSTS_FTS_TRIGGERS,
+        ))
+
+    changed = False
+    for names, triggers in trigger_sets:
+        current = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = ?", (names[0],)
+        ).fetchone()
+        if current and ("decompress_content(" in current[0]) == enabled:
+            continue
+        for name in names:
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+        for trigger in triggers:
+            conn.execute(trigger)
+        changed = True
+    return changed
+
+
+def _migration_006_content_compression(conn):
+    """Add the compression dictionary table and make FTS triggers compression-aware."""
+    from src.compression import compress_existing_content
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS content_dictionaries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            codec TEXT NOT NULL,
+            dictionary BLOB NOT NULL,
+            created_at TEXT
+        )
+    ''')
+
+    # Plain triggers stay in place until content is actually compressed, so
+    # writers outside the pool keep working on uncompressed databases
+    compressed = any(
+        conn.execute(f"SELECT 1 FROM {table} WHERE typeof({column}) = 'blob' LIMIT 1").fetchone()
+        for table, column in (("posts", "post_content"), ("generated_posts", "content"))
+    )
+    set_fts_decompression(conn, compressed)
+
+    # No-op unless LINKEDIN_CONTENT_COMPRESSION selects a codec
+    compress_existing_content(conn)
+
+
+def _migration_007_archive_rollups(conn):
+    """Add the archive partition registry and monthly rollups of archived posts."""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_collected_at ON posts (collected_at)")
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS archive_partitions (
+            month TEXT PRIMARY KEY,
+            path TEXT NOT NULL,
+            post_count INTEGER NOT NULL DEFAULT 0,
+            archived_at TEXT NOT NULL
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS posts_rollup (
+            month TEXT NOT NULL,
+            profile_name TEXT NOT NULL,
+            post_count INTEGER NOT NULL,
+            likes INTEGER NOT NULL,
+            comments INTEGER NOT NULL,
+            shares INTEGER NOT NULL,
+            PRIMARY KEY (month, profile_name)
+        ) WITHOUT ROWID
+    ''')
+
+
+def _migration_008_profile_url_index(conn):
+    """Index post URLs by profile for incremental scraping."""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_profile_url ON posts (profile_url, post_url)")
+
+
+def _migration_009_scrape_checkpoints(conn):
+    """Add scrape run and per-profile checkpoint tables for resumable scraping."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS scrape_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            status TEXT NOT NULL DEFAULT 'running',
+            max_posts_per_profile INTEGER NOT NULL,
+            refresh_engagement INTEGER NOT NULL,
+            incremental INTEGER NOT NULL,
+            overlap INTEGER NOT NULL,
+            started_at TEXT NOT NULL,
+            finished_at TEXT
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_scrape_runs_status ON scrape_runs (status, id)")
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS scrape_checkpoints (
+            run_id INTEGER NOT NULL REFERENCES scrape_runs (id) ON DELETE CASCADE,
+            profile_url TEXT NOT NULL,
+            profile_name TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            cursor TEXT,
+            posts_saved INTEGER NOT NULL DEFAULT 0,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            updated_at TEXT,
+            PRIMARY KEY (run_id, profile_url)
+        ) WITHOUT ROWID
+    ''')
+
+
+def _migration_010_rate_limit_buckets(conn):
+    """Add the token buckets shared by all scraper processes."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+            key TEXT PRIMARY KEY,
+            tokens REAL NOT NULL,
+            updated_at REAL NOT NULL,
+            failures INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    ''')
+
+
+def _migration_011_scrape_jobs(conn):
+    """Add the durable scrape job queue shared by scraper processes."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS scrape_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            profile_url TEXT NOT NULL,
+            profile_name TEXT NOT NULL,
+            max_posts INTEGER NOT NULL,
+            refresh_engagement INTEGER NOT NULL,
+            incremental INTEGER NOT NULL,
+            overlap INTEGER NOT NULL,
+            priority INTEGER NOT NULL DEFAULT 0,
+            status TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL,
+            available_at REAL NOT NULL,
+            lease_owner TEXT,
+            lease_expires_at REAL,
+            heartbeat_at REAL,
+            cursor TEXT,
+            posts_saved INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            enqueued_at REAL NOT NULL,
+            started_at REAL,
+            finished_at REAL
+        )
+    ''')
+    # Claim order, lease expiry and completion-time scans each get an index
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_scrape_jobs_claim ON scrape_jobs (status, priority DESC, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_scrape_jobs_lease ON scrape_jobs (status, lease_expires_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_scrape_jobs_finished ON scrape_jobs (finished_at)")
+    # At most one queued or leased job per profile
+    conn.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_scrape_jobs_active_profile ON scrape_jobs (profile_url) "
+        "WHERE status IN ('queued', 'leased')"
+    )
+
+
+def _migration_012_published_at(conn):
+    """Store the publish time of posts as epoch seconds, decoded from their URLs."""
+    _add_column_if_missing(conn, "posts", "published_at", "INTEGER")
+    backfilled = backfill_published_at(conn)
+    if backfilled:
+        logger.info(f"Backfilled the publish time of {backfilled} posts")
+    # Covers timing analysis, which groups engagement by published_at. The
+    # counts are indexed rather than the virtual total_engagement, which
+    # SQLite would recompute from the table row.
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_posts_published_engagement "
+        "ON posts (published_at, likes, comments, shares)"
+    )
+
+
+def _migration_013_post_features(conn):
+    """Store the structure features of every post, computed once from its content."""
+    from src.features import backfill_post_features
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS post_features (
+            post_id INTEGER PRIMARY KEY REFERENCES posts (id) ON DELETE CASCADE,
+            content_length INTEGER NOT NULL,
+            word_count INTEGER NOT NULL,
+            hashtag_count INTEGER NOT NULL,
+            has_url INTEGER NOT NULL,
+            has_mention INTEGER NOT NULL,
+            has_emoji INTEGER NOT NULL,
+            has_question INTEGER NOT NULL,
+            sentence_count INTEGER NOT NULL
+        )
+    ''')
+    # Features describe the text, so they are dropped when it changes; the
+    # next scrape of the post or a backfill computes them again. Stored
+    # values are compared directly: the same text compresses to the same
+    # bytes with the same codec and dictionary. Switching between text and
+    # a BLOB only happens when compress_existing_content or
+    # decompress_existing_content rewrite unchanged text, which keeps them.
+    conn.execute("DROP TRIGGER IF EXISTS post_features_content_update")
+    conn.execute('''
+        CREATE TRIGGER post_features_content_update AFTER UPDATE OF post_content ON posts
+        WHEN old.post_content IS NOT new.post_content
+         AND typeof(old.post_content) = typeof(new.post_content)
+        BEGIN
+            DELETE FROM post_features WHERE post_id = new.id;
+        END
+    ''')
+    backfilled = backfill_post_features(conn)
+    if backfilled:
+        logger.info(f"Computed the structure features of {backfilled} posts")
+
+
+def _migration_014_hashtag_occurrences(conn):
+    """Count how often each hashtag occurs in a post, not only that it does."""
+    from src.hashtags import backfill_hashtag_occurrences
+
+    _add_column_if_missing(conn, "post_hashtags", "occurrences", "INTEGER NOT NULL DEFAULT 1")
+    repeated = backfill_hashtag_occurrences(conn)
+    if repeated:
+        logger.info(f"Counted {repeated} hashtags used more than once in a post")
+
+
+# Ordered list of (version, description, upgrade function). Every step must be
+# idempotent so that a partially migrated database can be upgraded again.
+MIGRATIONS = [
+    (1, "Base posts, generated_posts and analytics tables", _migration_001_base_schema),
+    (2, "total_engagement column and secondary indexes", _migration_002_engagement_indexes),
+    (3, "Engagement snapshot history", _migration_003_engagement_snapshots),
+    (4, "FTS5 full-text search over post content", _migration_004_full_text_search),
+    (5, "Normalized hashtag tables", _migration_005_hashtags),
+    (6, "Compressed post content", _migration_006_content_compression),
+    (7, "Archive partitions and rollups", _migration_007_archive_rollups),
+    (8, "Profile URL index for incremental scraping", _migration_008_profile_url_index),
+    (9, "Scrape run checkpoints", _migration_009_scrape_checkpoints),
+    (10, "Shared rate limit token buckets", _migration_010_rate_limit_buckets),
+    (11, "Scrape job queue", _migration_011_scrape_jobs),
+    (12, "Post publish time as epoch seconds", _migration_012_published_at),
+    (13, "Precomputed post structure features", _migration_013_post_features),
+    (14, "Hashtag occurrences per post", _migration_014_hashtag_occurrences),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def _ensure_version_table(conn):
+    """Create the schema_version table if it doesn't exist."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TEXT
+        )
+    ''')
+    conn.commit()
+
+
+def get_schema_version(conn):
+    """Get the highest migration version applied to a database.
+
+    Args:
+        conn: SQLite connection
+
+    Returns:
+        Integer schema version (0 for an unmigrated database)
+    """
+    _ensure_version_table(conn)
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def apply_migrations(conn, target_version=None):
+    """Upgrade a database to the target schema version.
+
+    Each migration runs in its own IMMEDIATE transaction together with its
+    schema_version row, so concurrent processes cannot apply the same step
+    twice and a failed step leaves the previous version intact.
+
+    Args:
+        conn: SQLite connection
+        target_version: Version to upgrade to (defaults to the latest)
+
+    Returns:
+        List of versions applied by this call
+    """
+    target_version = LATEST_VERSION if target_version is None else target_version
+    current = get_schema_version(conn)
+    applied = []
+
+    for version, description, upgrade in MIGRATIONS:
+        if version > target_version:
+            break
+        if version <= current:
+            continue
+
+        if conn.in_transaction:
+            conn.commit()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Re-check inside the write lock in case another process got here first
+            current = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()[0] or 0
+            if version <= current:
+                conn.rollback()
+                continue
+
+            upgrade(conn)
+            conn.execute(
+                "INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                (version, description, datetime.now().isoformat())
+            )
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Migration {version} ({description}) failed: {e}")
+            raise
+
+        applied.append(version)
+        logger.info(f"Applied migration {version}: {description}")
+
+    return applied
+
+
+# Queries run on every dashboard refresh or scrape. Each must be answered from
+# an index; check_query_plans() reports any that fall back to a table scan.
+HOT_QUERIES = {
+    "posts_by_profile_engagement": (
+        "SELECT * FROM posts WHERE profile_name = ? ORDER BY total_engagement DESC LIMIT ?",
+        ("profile", 50),
+    ),
+    "posts_by_engagement": (
+        "SELECT * FROM posts ORDER BY total_engagement DESC LIMIT ?",
+        (50,),
+    ),
+    "scheduled_posts": (
+        "SELECT id, content, hashtags, generated_at, scheduled_time, published "
+        "FROM generated_posts WHERE scheduled_time IS NOT NULL ORDER BY scheduled_time ASC",
+        (),
+    ),
+    "feedback_history": (
+        "SELECT id, content, hashtags, generated_at, feedback_score, feedback_text "
+        "FROM generated_posts WHERE feedback_score IS NOT NULL ORDER BY generated_at DESC LIMIT ?",
+        (10,),
+    ),
+    "feedback_summary": (
+        "SELECT COUNT(*), AVG(feedback_score), feedback_score FROM generated_posts "
+        "WHERE feedback_score IS NOT NULL GROUP BY feedback_score ORDER BY feedback_score ASC",
+        (),
+    ),
+    "search_posts": (
+        "SELECT p.id, bm25(posts_fts) AS rank FROM posts_fts JOIN posts p ON p.id = posts_fts.rowid "
+        "WHERE posts_fts MATCH ? AND p.profile_name = ? ORDER BY rank LIMIT ?",
+        ('"leadership"', "profile", 20),
+    ),
+    "hashtag_frequency": (
+        "SELECT tag, SUM(occurrences) AS uses FROM post_hashtags GROUP BY tag "
+        "ORDER BY uses DESC, tag LIMIT ?",
+        (15,),
+    ),
+    "known_post_urls": (
+        "SELECT post_url FROM posts WHERE profile_url = ?",
+        ("https://www.linkedin.com/in/profile",),
+    ),
+    "resumable_run": (
+        "SELECT * FROM scrape_runs WHERE status IN ('running', 'incomplete') ORDER BY id DESC LIMIT 1",
+        (),
+    ),
+    "unfinished_checkpoints": (
+        "SELECT * FROM scrape_checkpoints WHERE run_id = ? AND status != 'done' ORDER BY position",
+        (1,),
+    ),
+    "claim_scrape_job": (
+        "SELECT id FROM scrape_jobs WHERE status = 'queued' AND available_at <= ? "
+        "ORDER BY priority DESC, id LIMIT 1",
+        (0.0,),
+    ),
+    "expired_scrape_leases": (
+        "SELECT id FROM scrape_jobs WHERE status = 'leased' AND lease_expires_at < ?",
+        (0.0,),
+    ),
+    "scrape_queue_depth": (
+        "SELECT status, COUNT(*) FROM scrape_jobs GROUP BY status",
+        (),
+    ),
+    "scrape_queue_throughput": (
+        "SELECT COUNT(*), SUM(posts_saved) FROM scrape_jobs WHERE finished_at >= ? AND status = 'done'",
+        (0.0,),
+    ),
+    "engagement_by_publish_hour": (
+        "SELECT ((published_at + ?) / 3600) % 24 AS hour, "
+        "AVG(COALESCE(likes, 0) + COALESCE(comments, 0) + COALESCE(shares, 0)), COUNT(*) "
+        "FROM posts WHERE published_at > 0 GROUP BY hour",
+        (0,),
+    ),
+    "archive_candidates": (
+        "SELECT DISTINCT substr(collected_at, 1, 7) FROM posts WHERE collected_at < ? ORDER BY 1",
+        ("2024-01-01",),
+    ),
+}
+
+
+def _is_full_scan(detail):
+    """Check whether an EXPLAIN QUERY PLAN step is a full table scan."""
+    # "SCAN posts" is a table scan; "SCAN posts USING INDEX ..." walks an index
+    # and "SCAN posts_fts VIRTUAL TABLE INDEX ..." is answered by FTS5
+    return (
+        detail.startswith("SCAN ")
+        and " USING " not in detail
+        and " VIRTUAL TABLE " not in detail
+    )
+
+
+def check_query_plans(conn, queries=None):
+    """Find hot queries whose plan falls back to a full table scan.
+
+    Args:
+        conn: SQLite connection
+        queries: Optional dictionary of name -> (sql, params); defaults to HOT_QUERIES
+
+    Returns:
+        Dictionary of query name -> list of offending plan steps (empty if all use indexes)
+    """
+    queries = HOT_QUERIES if queries is None else queries
+    failures = {}
+
+    for name, (sql, params) in queries.items():
+        try:
+            plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        except sqlite3.Error as e:
+            failures[name] = [f"Query could not be planned: {e}"]
+            continue
+
+        scans = [row[3] for row in plan if _is_full_scan(row[3])]
+        if scans:
+            failures[name] = scans
+
+    return failures
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    from src.db_pool import get_pool
+
+    parser = argparse.ArgumentParser(description="Apply schema migrations to the posts database")
+    parser.add_argument("--target", type=int, default=None, help="Schema version to upgrade to")
+    parser.add_argument("--check-plans", action="store_true",
+                        help="Exit with an error if a hot query uses a full table scan")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    with get_pool().connection() as conn:
+        applied = apply_migrations(conn, args.target)
+        print(f"Schema version: {get_schema_version(conn)} (applied: {applied or 'none'})")
+
+        if args.check_plans:
+            failures = check_query_plans(conn)
+            for name, steps in failures.items():
+                print(f"FULL SCAN in {name}: {'; '.join(steps)}")
+            if failures:
+                sys.exit(1)
+            print(f"All {len(HOT_QUERIES)} hot queries use indexes")
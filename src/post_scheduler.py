@@ -326,14 +326,13 @@
 #             self.conn.close()
 import logging
 from datetime import datetime
-from src.utils import get_db_connection, schedule_post
+from src.utils import db_connection, db_transaction, schedule_post
 
 logger = logging.getLogger(__name__)
 
 class PostScheduler:
     def __init__(self):
         """Initialize the post scheduler."""
-        self.conn = get_db_connection()
     
     def schedule_post(self, post_id, scheduled_time):
         """Schedule a post for publishing.
@@ -359,22 +358,22 @@ class PostScheduler:
             List of scheduled post dictionaries
         """
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                SELECT 
-                    id, 
-                    content, 
-                    hashtags, 
-                    generated_at, 
-                    scheduled_time,
-                    published
-                FROM generated_posts 
-                WHERE scheduled_time IS NOT NULL
-                ORDER BY scheduled_time ASC
-            """)
+            with db_connection() as conn:
+                rows = conn.execute("""
+                    SELECT 
+                        id, 
+                        decompress_content(content), 
+                        hashtags, 
+                        generated_at, 
+                        scheduled_time,
+                        published
+                    FROM generated_posts 
+                    WHERE scheduled_time IS NOT NULL
+                    ORDER BY scheduled_time ASC
+                """).fetchall()
             
             posts = []
-            for row in cursor.fetchall():
+            for row in rows:
                 status = "Published" if row[5] == 1 else "Scheduled"
                 posts.append({
                     "id": row[0],
@@ -401,12 +400,11 @@ class PostScheduler:
             Boolean indicating success
         """
         try:
-            cursor = self.conn.cursor()
-            cursor.execute(
-                "UPDATE generated_posts SET scheduled_time = ? WHERE id = ? AND published = 0",
-                (new_time.strftime("%Y-%m-%d %H:%M:%S"), post_id)
-            )
-            self.conn.commit()
+            with db_transaction() as conn:
+                cursor = conn.execute(
+                    "UPDATE generated_posts SET scheduled_time = ? WHERE id = ? AND published = 0",
+                    (new_time.strftime("%Y-%m-%d %H:%M:%S"), post_id)
+                )
             return cursor.rowcount > 0
         except Exception as e:
             logger.error(f"Error rescheduling post: {e}")
@@ -422,12 +420,11 @@ class PostScheduler:
             Boolean indicating success
         """
         try:
-            cursor = self.conn.cursor()
-            cursor.execute(
-                "UPDATE generated_posts SET scheduled_time = NULL WHERE id = ? AND published = 0",
-                (post_id,)
-            )
-            self.conn.commit()
+            with db_transaction() as conn:
+                cursor = conn.execute(
+                    "UPDATE generated_posts SET scheduled_time = NULL WHERE id = ? AND published = 0",
+                    (post_id,)
+                )
             return cursor.rowcount > 0
         except Exception as e:
             logger.error(f"Error canceling post: {e}")
@@ -443,18 +440,19 @@ class PostScheduler:
             Boolean indicating success
         """
         try:
-            cursor = self.conn.cursor()
-            cursor.execute(
-                "UPDATE generated_posts SET published = 1 WHERE id = ?",
-                (post_id,)
-            )
-            self.conn.commit()
+            with db_transaction() as conn:
+                cursor = conn.execute(
+                    "UPDATE generated_posts SET published = 1 WHERE id = ?",
+                    (post_id,)
+                )
             return cursor.rowcount > 0
         except Exception as e:
             logger.error(f"Error marking post as published: {e}")
             return False
     
     def close(self):
-        """Close the database connection."""
-        if self.conn:
-            self.conn.close()
\ No newline at end of file
+        """Release resources.
+        
+        Connections are borrowed from the shared pool per call, so there is
+        nothing to close; kept for API compatibility.
+        """
\ No newline at end of file
@@ -0,0 +1,162 @@
+import re
+import time
+from datetime import datetime, timedelta
+
+# Activity, share and ugcPost IDs start with a 41-bit millisecond Unix
+# timestamp, so the ID of a post's URL or URN says when it was published
+ACTIVITY_ID_PATTERN = re.compile(r'(?:activity|share|ugcPost)[:-](\d{18,20})')
+_TIMESTAMP_SHIFT = 22
+
+# LinkedIn launched in May 2003; decoded times before that are not post IDs
+_EARLIEST_TIMESTAMP = 1052092800
+
+# Relative labels such as "3d", "2w", "5mo", "1yr" or "4 hours ago"
+RELATIVE_LABEL_PATTERN = re.compile(
+    r'\b(\d+)\s*(mo|mos|months?|y|yr|yrs|years?|w|wk|wks|weeks?|d|days?|h|hr|hrs|hours?|m|min|mins|minutes?|s|secs?|seconds?)\b',
+    re.IGNORECASE
+)
+_UNIT_SECONDS = {
+    "s": 1,
+    "m": 60,
+    "h": 3600,
+    "d": 86400,
+    "w": 7 * 86400,
+    "mo": 30 * 86400,
+    "y": 365 * 86400,
+}
+_JUST_NOW_PATTERN = re.compile(r'\b(now|just now)\b', re.IGNORECASE)
+
+
+def activity_id(url):
+    """Extract the numeric activity, share or ugcPost ID from a post URL or URN.
+
+    Returns:
+        Integer ID, or None if the text contains none
+    """
+    if not url:
+        return None
+    match = ACTIVITY_ID_PATTERN.search(url)
+    return int(match.group(1)) if match else None
+
+
+def activity_timestamp(url, now=None):
+    """Decode the publish time encoded in a post URL or URN.
+
+    Args:
+        url: Post URL such as .../posts/name-activity-7100000000000000000-AbCd
+            or a URN such as urn:li:activity:7100000000000000000
+        now: Reference epoch seconds (defaults to the current time)
+
+    Returns:
+        Epoch seconds, or None if there is no ID or it decodes to an
+        implausible time
+    """
+    post_id = activity_id(url)
+    if post_id is None:
+        return None
+    timestamp = (post_id >> _TIMESTAMP_SHIFT) // 1000
+    now = time.time() if now is None else now
+    if timestamp < _EARLIEST_TIMESTAMP or timestamp > now + 86400:
+        return None
+    return timestamp
+
+
+def relative_age_seconds(label):
+    """Parse a relative age label such as "3d", "2w • Edited" or "1 month ago".
+
+    Returns:
+        Age in seconds, or None if the label has no recognizable age
+    """
+    if not label:
+        return None
+    match = RELATIVE_LABEL_PATTERN.search(label)
+    if not match:
+        return 0 if _JUST_NOW_PATTERN.search(label) else None
+
+    number, unit = match.groups()
+    unit = unit.lower()
+    if unit.startswith("mo"):
+        key = "mo"
+    elif unit.startswith("mi") or unit == "m":
+        key = "m"
+    else:
+        key = unit[0]
+    return int(number) * _UNIT_SECONDS[key]
+
+
+def published_timestamp(post_url, label=None, now=None):
+    """Work out when a post was published.
+
+    The ID in the post URL gives the exact time. Without one, the relative
+    label shown on the post ("3d", "2w") gives an estimate that is only as
+    precise as its unit.
+
+    Args:
+        post_url: Post URL or URN
+        label: Relative age label of the post (optional)
+        now: Reference epoch seconds (defaults to the current time)
+
+    Returns:
+        Integer epoch seconds, or None if neither source is usable
+    """
+    now = time.time() if now is None else now
+    timestamp = activity_timestamp(post_url, now)
+    if timestamp is not None:
+        return timestamp
+    age = relative_age_seconds(label)
+    if age is None:
+        return None
+    return int(now - age)
+
+
+def publish_date_text(timestamp):
+    """Format an epoch timestamp as the local ISO time stored in publish_date."""
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp).isoformat(timespec="seconds")
+
+
+def day_start_timestamp(date_text, days_after=0):
+    """Get the epoch seconds of local midnight on a date.
+
+    Args:
+        date_text: Date as YYYY-MM-DD (a time part is ignored)
+        days_after: Days to move forward, e.g. 1 for an exclusive end bound
+
+    Returns:
+        Integer epoch seconds, comparable with published_at
+    """
+    day = datetime.fromisoformat(date_text).date() + timedelta(days=days_after)
+    return int(datetime(day.year, day.month, day.day).timestamp())
+
+
+def backfill_published_at(conn, table="posts", batch_size=1000):
+    """Fill in published_at and publish_date of stored posts from their URLs.
+
+    Only rows without a published_at are touched, and only those whose URL
+    carries an activity ID get a value; the scrape-day publish_date of the
+    others is left as it was.
+
+    Args:
+        conn: SQLite connection inside a transaction
+        table: Posts table, optionally schema-qualified
+        batch_size: Rows updated per executemany call
+
+    Returns:
+        Number of posts updated
+    """
+    now = time.time()
+    # Read everything first: updating rows a live cursor is still scanning
+    # can make SQLite skip or revisit them
+    rows = conn.execute(f"SELECT id, post_url FROM {table} WHERE published_at IS NULL").fetchall()
+    values = []
+    for post_id, post_url in rows:
+        timestamp = activity_timestamp(post_url, now)
+        if timestamp is not None:
+            values.append((timestamp, publish_date_text(timestamp), post_id))
+    for start in range(0, len(values), batch_size):
+        conn.executemany(
+            f"UPDATE {table} SET published_at = ?, publish_date = ? WHERE id = ?",
+            values[start:start + batch_size]
+        )
+    return len(values)
@@ -0,0 +1,210 @@
+import os
+import time
+import random
+import logging
+from urllib.parse import urlparse
+
+from src.utils import db_connection, db_transaction
+
+logger = logging.getLogger(__name__)
+
+# (requests per minute, burst) of each bucket kind. Every navigation takes a
+# token from the bucket of its host and from the bucket of the account it
+# runs as, so the stricter of the two sets the pace.
+DEFAULT_LIMITS = {
+    "host": (float(os.getenv("LINKEDIN_HOST_REQUESTS_PER_MINUTE", "20")), 3),
+    "account": (float(os.getenv("LINKEDIN_ACCOUNT_REQUESTS_PER_MINUTE", "8")), 2),
+}
+
+# Backoff after a failure doubles per consecutive failure of a bucket
+BACKOFF_BASE_SECONDS = 30.0
+BACKOFF_MAX_SECONDS = 900.0
+
+# Takes one token, refilling the bucket for the time since it was last
+# touched. Tokens go negative while requests are queued, so -tokens / rate
+# is how long the caller has to wait for its slot.
+_RESERVE_SQL = """
+    INSERT INTO rate_limit_buckets (key, tokens, updated_at)
+    VALUES (:key, :burst - 1, :now)
+    ON CONFLICT (key) DO UPDATE SET
+        tokens = MIN(:burst, tokens + (:now - updated_at) * :rate) - 1,
+        updated_at = :now
+    RETURNING tokens
+"""
+
+# Empties the bucket until the backoff ends, then allows a single request.
+# The right-hand failures is the count before this failure.
+_FAILURE_SQL = """
+    INSERT INTO rate_limit_buckets (key, tokens, updated_at, failures)
+    VALUES (:key, 1, :now + :base * :jitter, 1)
+    ON CONFLICT (key) DO UPDATE SET
+        failures = failures + 1,
+        tokens = 1,
+        updated_at = MAX(updated_at, :now + MIN(:max_backoff, :base * (1 << MIN(failures, 16))) * :jitter)
+    RETURNING updated_at - :now, failures
+"""
+
+
+def navigation_keys(url, account=None):
+    """Get the bucket keys a page load of url counts against.
+
+    Args:
+        url: URL about to be loaded
+        account: Login email the browser is signed in with (optional)
+
+    Returns:
+        List with a host key and an account key
+    """
+    return [f"host:{urlparse(url).hostname}", f"account:{account or 'anonymous'}"]
+
+
+class TokenBucketRateLimiter:
+    def __init__(self, limits=None, backoff_base=BACKOFF_BASE_SECONDS, backoff_max=BACKOFF_MAX_SECONDS):
+        """Initialize a rate limiter whose buckets live in the database.
+
+        Bucket state is kept in rate_limit_buckets and updated atomically,
+        so every thread and process using the same database shares it.
+
+        Args:
+            limits: Overrides of DEFAULT_LIMITS, bucket kind -> (requests
+                per minute, burst)
+            backoff_base: Seconds of backoff after a first failure
+            backoff_max: Longest backoff in seconds
+        """
+        self.limits = dict(DEFAULT_LIMITS, **(limits or {}))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def _limit(self, key):
+        """Get (tokens per second, burst) for a bucket key such as host:www.linkedin.com."""
+        kind = key.split(":", 1)[0]
+        if kind not in self.limits:
+            raise ValueError(f"No rate limit configured for bucket kind: {kind}")
+        per_minute, burst = self.limits[kind]
+        return per_minute / 60.0, burst
+
+    def reserve(self, keys):
+        """Take a token from every bucket in keys.
+
+        Args:
+            keys: Bucket keys, e.g. from navigation_keys()
+
+        Returns:
+            Seconds the caller must wait before making the request
+        """
+        now = time.time()
+        wait = 0.0
+        with db_transaction() as conn:
+            for key in keys:
+                rate, burst = self._limit(key)
+                tokens = conn.execute(
+                    _RESERVE_SQL, {"key": key, "burst": burst, "now": now, "rate": rate}
+                ).fetchone()[0]
+                if tokens < 0:
+                    wait = max(wait, -tokens / rate)
+        return wait
+
+    def acquire(self, keys, stop_event=None):
+        """Block until a request counted against keys may be made.
+
+        Args:
+            keys: Bucket keys, e.g. from navigation_keys()
+            stop_event: Optional threading.Event that cuts the wait short
+
+        Returns:
+            Seconds spent waiting
+        """
+        wait = self.reserve(keys)
+        if wait > 0:
+            logger.debug(f"Rate limit: waiting {wait:.1f}s for {', '.join(keys)}")
+            if stop_event:
+                stop_event.wait(wait)
+            else:
+                time.sleep(wait)
+        return wait
+
+    def report_failure(self, keys, reason):
+        """Back off every bucket in keys after a timeout, block or login wall.
+
+        Args:
+            keys: Bucket keys of the failed request
+            reason: Short description for the log
+
+        Returns:
+            Seconds until the buckets allow another request
+        """
+        now = time.time()
+        delay = 0.0
+        with db_transaction() as conn:
+            for key in keys:
+                backoff, failures = conn.execute(_FAILURE_SQL, {
+                    "key": key,
+                    "now": now,
+                    "base": self.backoff_base,
+                    "max_backoff": self.backoff_max,
+                    "jitter": random.uniform(0.8, 1.2),
+                }).fetchone()
+                delay = max(delay, backoff)
+                logger.warning(f"Rate limit backoff for {key}: {backoff:.0f}s after {reason} ({failures} in a row)")
+        return delay
+
+    def report_success(self, keys):
+        """Reset the failure count of every bucket in keys."""
+        with db_transaction() as conn:
+            conn.executemany(
+                "UPDATE rate_limit_buckets SET failures = 0 WHERE key = ? AND failures > 0",
+                [(key,) for key in keys]
+            )
+
+    def status(self):
+        """Get the current state of every bucket.
+
+        Returns:
+            List of dictionaries with key, tokens (refilled to now),
+            failures and blocked_for (seconds until the next request may
+            be made)
+        """
+        now = time.time()
+        with db_connection() as conn:
+            rows = conn.execute(
+                "SELECT key, tokens, updated_at, failures FROM rate_limit_buckets ORDER BY key"
+            ).fetchall()
+
+        buckets = []
+        for key, tokens, updated_at, failures in rows:
+            try:
+                rate, burst = self._limit(key)
+            except ValueError:
+                continue
+            tokens = min(burst, tokens + (now - updated_at) * rate)
+            buckets.append({
+                "key": key,
+                "tokens": tokens,
+                "failures": failures,
+                "blocked_for": max(0.0, (1 - tokens) / rate),
+            })
+        return buckets
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from src.utils import initialize_database
+
+    parser = argparse.ArgumentParser(description="Show or reset the shared scraper rate limit buckets")
+    parser.add_argument("--reset", action="store_true", help="Delete all buckets, clearing any backoff")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    initialize_database()
+
+    if args.reset:
+        with db_transaction() as conn:
+            conn.execute("DELETE FROM rate_limit_buckets")
+        print("Rate limit buckets reset")
+    else:
+        for bucket in TokenBucketRateLimiter().status():
+            print(
+                f"{bucket['key']:<40} {bucket['tokens']:>6.2f} tokens  {bucket['failures']:>3} failures  "
+                f"next request in {bucket['blocked_for']:.0f}s"
+            )
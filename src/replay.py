@@ -0,0 +1,128 @@
+import os
+import logging
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def replay_page_name(profile_url):
+    """Get the snapshot file name for a profile.
+
+    Args:
+        profile_url: LinkedIn profile URL, e.g. https://www.linkedin.com/in/jane-doe/
+
+    Returns:
+        File name such as jane-doe.html
+    """
+    return profile_url.rstrip('/').rsplit('/', 1)[-1] + ".html"
+
+
+def replay_url(source, profile_url):
+    """Get the URL the scraper should load instead of a live activity page.
+
+    Args:
+        source: Directory of snapshots, or a file:// or http(s):// base URL
+        profile_url: LinkedIn profile URL being scraped
+
+    Returns:
+        URL of the profile's recorded activity page
+    """
+    if source.startswith(("http://", "https://", "file://")):
+        base = source
+    else:
+        base = Path(source).resolve().as_uri()
+    return f"{base.rstrip('/')}/{replay_page_name(profile_url)}"
+
+
+def record_snapshot(driver, directory, profile_url):
+    """Save the page currently loaded in driver as a replay snapshot.
+
+    Args:
+        driver: Selenium WebDriver with an activity page loaded
+        directory: Snapshot directory
+        profile_url: LinkedIn profile URL the page belongs to
+
+    Returns:
+        Path of the written file
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, replay_page_name(profile_url))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(driver.page_source)
+    logger.info(f"Recorded activity page snapshot to {path}")
+    return path
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        """Send request logs to the module logger instead of stderr."""
+        logger.debug(format % args)
+
+
+class ReplayServer:
+    def __init__(self, directory, host="127.0.0.1", port=0):
+        """Initialize a local HTTP server for recorded activity pages.
+
+        Args:
+            directory: Snapshot directory to serve
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+        """
+        self.directory = os.path.abspath(directory)
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        """Base URL to pass to LinkedInScraper as replay_source."""
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        """Start serving in a background thread."""
+        if self._server:
+            return self
+        handler = partial(_QuietHandler, directory=self.directory)
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Serving replay snapshots from {self.directory} at {self.base_url}")
+        return self
+
+    def stop(self):
+        """Stop the server."""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve recorded activity pages for scraper replay")
+    parser.add_argument("directory", help="Snapshot directory")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    server = ReplayServer(args.directory, port=args.port).start()
+    print(f"Replay source: {server.base_url}")
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,433 @@
+import math
+import time
+import heapq
+import logging
+from datetime import datetime
+
+from src.utils import db_connection
+
+logger = logging.getLogger(__name__)
+
+# Engagement velocity of a post halves every this many hours; LinkedIn posts
+# collect most of their reactions in the first day or two
+DEFAULT_HALF_LIFE_HOURS = 24.0
+
+# Posts published longer ago than this are treated as settled and never
+# refreshed; they also bound the posting rate used to expect new posts
+DEFAULT_ACTIVE_DAYS = 30
+
+# Browser cost of a scrape when there are too few finished queue jobs to fit
+# it: loading the activity page, plus scrolling per post
+DEFAULT_PAGE_SECONDS = 20.0
+DEFAULT_SECONDS_PER_POST = 0.6
+MIN_COST_SAMPLES = 10
+# Floor of the per-post cost, so a fit that comes out at zero (posts saved
+# barely affecting job time) cannot make gain / cost divide by zero
+MIN_SECONDS_PER_POST = 0.001
+
+# A new post is worth at least this much engagement: its text, hashtags and
+# publish time are data even if nobody reacts to it
+NEW_POST_MIN_VALUE = 5.0
+
+# Profiles are scraped at least this often while the budget allows, however
+# little they are expected to bring
+DEFAULT_MAX_STALENESS_HOURS = 72
+
+# Plans extend a profile's scrape depth in steps of one scroll's worth of posts
+DEFAULT_DEPTH_STEP = 5
+
+_ENGAGEMENT = "COALESCE({0}likes, 0) + COALESCE({0}comments, 0) + COALESCE({0}shares, 0)"
+
+
+def _epoch(iso_text):
+    """Convert a stored ISO timestamp to epoch seconds (None stays None)."""
+    return datetime.fromisoformat(iso_text).timestamp() if iso_text else None
+
+
+def estimate_scrape_costs(min_samples=MIN_COST_SAMPLES):
+    """Fit browser seconds per scrape from finished queue jobs.
+
+    A least-squares line of duration against posts saved gives the fixed
+    page cost and the cost per post.
+
+    Args:
+        min_samples: Jobs needed before the fit replaces the defaults
+
+    Returns:
+        Tuple of (page_seconds, seconds_per_post)
+    """
+    with db_connection() as conn:
+        samples = conn.execute(
+            """
+            SELECT posts_saved, finished_at - started_at FROM scrape_jobs
+            WHERE status = 'done' AND started_at IS NOT NULL AND finished_at > started_at
+            ORDER BY finished_at DESC LIMIT 500
+            """
+        ).fetchall()
+    if len(samples) < min_samples:
+        return DEFAULT_PAGE_SECONDS, DEFAULT_SECONDS_PER_POST
+
+    count = len(samples)
+    mean_posts = sum(posts for posts, _ in samples) / count
+    mean_seconds = sum(seconds for _, seconds in samples) / count
+    variance = sum((posts - mean_posts) ** 2 for posts, _ in samples)
+    if variance == 0:
+        return mean_seconds, DEFAULT_SECONDS_PER_POST
+    per_post = sum((posts - mean_posts) * (seconds - mean_seconds) for posts, seconds in samples) / variance
+    per_post = max(per_post, MIN_SECONDS_PER_POST)
+    return max(mean_seconds - per_post * mean_posts, 0.0), per_post
+
+
+def stored_profiles():
+    """List the profiles that have stored posts.
+
+    Returns:
+        List of profile dictionaries with name and url
+    """
+    with db_connection() as conn:
+        rows = conn.execute(
+            "SELECT profile_url, MAX(profile_name) FROM posts WHERE profile_url IS NOT NULL GROUP BY profile_url"
+        ).fetchall()
+    return [{"name": name, "url": url} for url, name in rows]
+
+
+def last_scraped_times():
+    """Get when each profile was last scraped to completion.
+
+    Finished checkpoints and queue jobs count. Because unchanged posts are
+    not rewritten, a profile's newest collected_at is only a lower bound and
+    is used when neither exists.
+
+    Returns:
+        Dictionary of profile URL -> epoch seconds
+    """
+    with db_connection() as conn:
+        collected = conn.execute(
+            "SELECT profile_url, MAX(collected_at) FROM posts GROUP BY profile_url"
+        ).fetchall()
+        checkpoints = conn.execute(
+            "SELECT profile_url, MAX(updated_at) FROM scrape_checkpoints WHERE status = 'done' GROUP BY profile_url"
+        ).fetchall()
+        jobs = conn.execute(
+            "SELECT profile_url, MAX(finished_at) FROM scrape_jobs WHERE status = 'done' GROUP BY profile_url"
+        ).fetchall()
+
+    times = {}
+    for url, iso_text in collected + checkpoints:
+        if iso_text:
+            times[url] = max(times.get(url, 0.0), _epoch(iso_text))
+    for url, finished_at in jobs:
+        if finished_at:
+            times[url] = max(times.get(url, 0.0), finished_at)
+    return times
+
+
+def expected_gain(velocity, measured_at, observed_at, now, half_life_hours=DEFAULT_HALF_LIFE_HOURS):
+    """Engagement a post has probably gained since it was last observed.
+
+    The velocity measured at measured_at is assumed to decay exponentially
+    with the half-life, and is integrated from observed_at to now.
+
+    Args:
+        velocity: Engagement per hour at measured_at
+        measured_at: Epoch seconds the velocity applies to
+        observed_at: Epoch seconds the post was last seen
+        now: Epoch seconds
+
+    Returns:
+        Expected unrecorded engagement
+    """
+    if velocity <= 0 or now <= observed_at:
+        return 0.0
+    half_life = half_life_hours * 3600
+    decayed = lambda moment: 2 ** (-(moment - measured_at) / half_life)
+    return velocity * half_life_hours / math.log(2) * (decayed(observed_at) - decayed(now))
+
+
+def _post_velocity(published_at, engagement, snapshots, seen_at):
+    """Engagement per hour of a post and the time it was measured at.
+
+    Uses the last two snapshots, or the average since publishing when
+    there are fewer.
+
+    Args:
+        published_at: Publish time in epoch seconds
+        engagement: Current stored engagement
+        snapshots: Up to two (epoch seconds, engagement) pairs, newest first
+        seen_at: Epoch seconds the engagement was stored, if there is no
+            snapshot
+    """
+    if len(snapshots) >= 2:
+        (latest_at, latest), (previous_at, previous) = snapshots[:2]
+        if latest_at > previous_at:
+            return max(latest - previous, 0) / ((latest_at - previous_at) / 3600), latest_at
+    measured_at = snapshots[0][0] if snapshots else seen_at
+    hours = (measured_at - published_at) / 3600
+    return (engagement / hours if hours > 0 else 0.0), measured_at
+
+
+def load_profile_states(profiles, now=None, half_life_hours=DEFAULT_HALF_LIFE_HOURS,
+                        active_days=DEFAULT_ACTIVE_DAYS):
+    """Estimate what re-scraping each profile would bring.
+
+    Args:
+        profiles: Iterable of profile dictionaries with name and url
+        now: Reference epoch seconds (defaults to the current time)
+        half_life_hours: Half-life of post engagement velocity
+        active_days: Age after which posts are considered settled
+
+    Returns:
+        Dictionary of profile URL -> state with name, url, last_scraped
+        (epoch seconds or None), new_posts (expected number of posts
+        published since then) and gains (expected engagement gain per feed
+        position from the top, starting with the expected new posts)
+    """
+    now = time.time() if now is None else now
+    cutoff = int(now - active_days * 86400)
+    last_scraped = last_scraped_times()
+    states = {
+        profile["url"]: {
+            "name": profile["name"],
+            "url": profile["url"],
+            "last_scraped": last_scraped.get(profile["url"]),
+            "gains": [],
+            "new_posts": 0.0,
+        }
+        for profile in profiles
+    }
+
+    with db_connection() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT p.profile_url, p.id, p.published_at, {_ENGAGEMENT.format("p.")}, s.captured_at, s.engagement
+            FROM posts p
+            LEFT JOIN (
+                SELECT post_id, captured_at, {_ENGAGEMENT.format("")} AS engagement,
+                       ROW_NUMBER() OVER (PARTITION BY post_id ORDER BY captured_at DESC) AS recency
+                FROM post_engagement_snapshots
+                WHERE post_id IN (SELECT id FROM posts WHERE published_at >= :cutoff)
+            ) s ON s.post_id = p.id AND s.recency <= 2
+            WHERE p.published_at >= :cutoff
+            ORDER BY p.profile_url, p.published_at DESC, p.id, s.recency
+            """,
+            {"cutoff": cutoff}
+        ).fetchall()
+        levels = dict(conn.execute(
+            f"SELECT profile_url, AVG({_ENGAGEMENT.format('')}) FROM posts GROUP BY profile_url"
+        ).fetchall())
+
+    posts = {}
+    for profile_url, post_id, published_at, engagement, captured_at, snapshot_engagement in rows:
+        if profile_url not in states:
+            continue
+        post = posts.setdefault(post_id, (profile_url, published_at, engagement, []))
+        if captured_at is not None:
+            post[3].append((_epoch(captured_at), snapshot_engagement))
+
+    active_counts = {}
+    for profile_url, published_at, engagement, snapshots in posts.values():
+        state = states[profile_url]
+        velocity, measured_at = _post_velocity(published_at, engagement, snapshots, state["last_scraped"] or now)
+        observed_at = max(measured_at, state["last_scraped"] or 0.0)
+        state["gains"].append(expected_gain(velocity, measured_at, observed_at, now, half_life_hours))
+        active_counts[profile_url] = active_counts.get(profile_url, 0) + 1
+
+    # Posts published since the last scrape sit above the known ones in the
+    # feed. They are expected at the profile's recent posting rate and are
+    # worth its usual engagement. One extra post per active period keeps
+    # quiet profiles from being written off, so they are still checked now
+    # and then.
+    typical = sum(levels.values()) / len(levels) if levels else 0.0
+    for profile_url, state in states.items():
+        if state["last_scraped"] is None:
+            continue
+        posts_per_hour = (active_counts.get(profile_url, 0) + 1) / (active_days * 24)
+        state["new_posts"] = posts_per_hour * max(now - state["last_scraped"], 0) / 3600
+        level = levels.get(profile_url)
+        level = max(typical if level is None else level, NEW_POST_MIN_VALUE)
+        new_gains = [
+            level * min(1.0, state["new_posts"] - position)
+            for position in range(math.ceil(state["new_posts"]))
+        ]
+        state["gains"] = new_gains + state["gains"]
+    return states
+
+
+def plan_rescrape(profiles, budget_minutes=60, max_posts=50, depth_step=DEFAULT_DEPTH_STEP,
+                  half_life_hours=DEFAULT_HALF_LIFE_HOURS, active_days=DEFAULT_ACTIVE_DAYS,
+                  max_staleness_hours=DEFAULT_MAX_STALENESS_HOURS, min_gain=1.0, costs=None, now=None):
+    """Choose which profiles to re-scrape, and how deep, within a browser budget.
+
+    Profiles that were never scraped come first, at full depth. Next come
+    profiles not scraped for max_staleness_hours, oldest first, deep enough
+    for their expected new posts. The rest of the budget is spent greedily
+    on the scrape steps with the highest expected engagement gain per
+    browser second. A profile's first step costs a page load plus its
+    newest posts, and each further step scrolls deeper into older posts;
+    the expected new posts come first. Steps gaining less than min_gain are
+    never taken, so settled profiles are only visited once they go stale.
+
+    Args:
+        profiles: Iterable of profile dictionaries with name and url
+        budget_minutes: Browser minutes available to the run
+        max_posts: Deepest scrape planned for a profile
+        depth_step: Posts added to a profile's depth per step
+        half_life_hours: Half-life of post engagement velocity
+        active_days: Age after which posts are considered settled
+        max_staleness_hours: Longest a profile goes without a scrape while
+            the budget allows (None to rank purely by expected gain)
+        min_gain: Smallest expected engagement gain worth a step
+        costs: (page_seconds, seconds_per_post); fitted from finished
+            queue jobs by default
+        now: Reference epoch seconds (defaults to the current time)
+
+    Returns:
+        Dictionary with items (profile dictionaries with name, url,
+        max_posts, priority, expected_gain and cost_seconds, most valuable
+        first), budget_seconds, planned_seconds, expected_gain and skipped
+        (number of profiles left out)
+
+    Raises:
+        ValueError: If max_posts or depth_step is below 1
+    """
+    if max_posts < 1 or depth_step < 1:
+        raise ValueError(f"max_posts and depth_step must be at least 1, got {max_posts} and {depth_step}")
+    now = time.time() if now is None else now
+    page_seconds, seconds_per_post = costs or estimate_scrape_costs()
+    seconds_per_post = max(seconds_per_post, MIN_SECONDS_PER_POST)
+    states = load_profile_states(profiles, now, half_life_hours, active_days)
+    remaining = budget_minutes * 60.0
+    depths, gains, spent = {}, {}, {}
+
+    def step(url, new_depth=None):
+        """Next (gain, cost, depth) for a profile, or None if it is at max depth."""
+        state, depth = states[url], depths.get(url, 0)
+        if depth >= max_posts:
+            return None
+        new_depth = min(new_depth or depth + depth_step, max_posts)
+        gain = sum(state["gains"][depth:new_depth])
+        cost = (new_depth - depth) * seconds_per_post
+        if depth == 0:
+            cost += page_seconds
+        return gain, cost, new_depth
+
+    def take(url, gain, cost, depth):
+        """Add a step to the plan."""
+        nonlocal remaining
+        remaining -= cost
+        depths[url] = depth
+        gains[url] = gains.get(url, 0.0) + gain
+        spent[url] = spent.get(url, 0.0) + cost
+
+    # Never-scraped profiles have no history to rank them by
+    for url, state in states.items():
+        if state["last_scraped"] is None:
+            cost = page_seconds + max_posts * seconds_per_post
+            if cost <= remaining:
+                take(url, float("inf"), cost, max_posts)
+
+    if max_staleness_hours is not None:
+        stale = sorted(
+            (state["last_scraped"], url) for url, state in states.items()
+            if state["last_scraped"] is not None and now - state["last_scraped"] >= max_staleness_hours * 3600
+        )
+        for _, url in stale:
+            new_posts = math.ceil(states[url]["new_posts"])
+            candidate = step(url, max(depth_step, math.ceil(new_posts / depth_step) * depth_step))
+            if candidate and candidate[1] <= remaining:
+                take(url, *candidate)
+
+    heap = []
+    for url in states:
+        if depths.get(url, 0) < max_posts:
+            candidate = step(url)
+            if candidate and candidate[0] >= min_gain:
+                heapq.heappush(heap, (-candidate[0] / candidate[1], url, candidate))
+    while heap and remaining > 0:
+        _, url, (gain, cost, depth) = heapq.heappop(heap)
+        if cost > remaining:
+            continue
+        take(url, gain, cost, depth)
+        candidate = step(url)
+        if candidate and candidate[0] >= min_gain:
+            heapq.heappush(heap, (-candidate[0] / candidate[1], url, candidate))
+
+    ranked = sorted(depths, key=lambda url: gains[url] / spent[url], reverse=True)
+    items = [
+        {
+            "name": states[url]["name"],
+            "url": url,
+            "max_posts": depths[url],
+            "priority": len(ranked) - rank,
+            "expected_gain": gains[url],
+            "cost_seconds": spent[url],
+        }
+        for rank, url in enumerate(ranked)
+    ]
+    planned = sum(spent.values())
+    finite_gain = sum(gain for gain in gains.values() if gain != float("inf"))
+    logger.info(
+        f"Planned {len(items)}/{len(states)} profiles in {planned / 60:.1f} of {budget_minutes} browser minutes, "
+        f"expecting {finite_gain:.0f} unrecorded engagement"
+    )
+    return {
+        "items": items,
+        "budget_seconds": budget_minutes * 60.0,
+        "planned_seconds": planned,
+        "expected_gain": finite_gain,
+        "skipped": len(states) - len(items),
+    }
+
+
+def enqueue_plan(plan, **kwargs):
+    """Add a plan's profiles to the scrape job queue with their depth and priority.
+
+    Args:
+        plan: Plan from plan_rescrape
+        **kwargs: Further enqueue_profiles options, e.g. max_attempts
+
+    Returns:
+        Number of jobs added
+    """
+    from src.scrape_queue import enqueue_profiles
+
+    return enqueue_profiles(plan["items"], refresh_engagement=True, incremental=False, **kwargs)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from src.scrape_orchestrator import profiles_from_config
+    from src.utils import initialize_database, load_profiles_config, setup_logging
+
+    parser = argparse.ArgumentParser(description="Plan engagement-driven re-scrapes within a browser budget")
+    parser.add_argument("--budget-minutes", type=float, default=60, help="Browser minutes for the run")
+    parser.add_argument("--max-posts", type=int, default=50, help="Deepest scrape per profile")
+    parser.add_argument("--half-life-hours", type=float, default=DEFAULT_HALF_LIFE_HOURS,
+                        help="Half-life of post engagement velocity")
+    parser.add_argument("--max-staleness-hours", type=float, default=DEFAULT_MAX_STALENESS_HOURS,
+                        help="Longest a profile goes without a scrape while the budget allows")
+    parser.add_argument("--enqueue", action="store_true", help="Add the plan to the scrape job queue")
+    args = parser.parse_args()
+
+    setup_logging()
+    initialize_database()
+
+    profiles = {profile["url"]: profile for profile in stored_profiles()}
+    for profile in profiles_from_config(load_profiles_config() or {}):
+        profiles[profile["url"]] = profile
+    plan = plan_rescrape(
+        profiles.values(), budget_minutes=args.budget_minutes, max_posts=args.max_posts,
+        half_life_hours=args.half_life_hours, max_staleness_hours=args.max_staleness_hours
+    )
+
+    print(f"{'priority':>8} {'posts':>5} {'gain':>9} {'minutes':>7}  profile")
+    for item in plan["items"]:
+        gain = "new" if item["expected_gain"] == float("inf") else f"{item['expected_gain']:.0f}"
+        print(f"{item['priority']:>8} {item['max_posts']:>5} {gain:>9} {item['cost_seconds'] / 60:>7.1f}  {item['name']}")
+    print(
+        f"{len(plan['items'])} profiles in {plan['planned_seconds'] / 60:.1f}/{args.budget_minutes:g} "
+        f"browser minutes, {plan['skipped']} skipped, expected gain {plan['expected_gain']:.0f}"
+    )
+    if args.enqueue:
+        print(f"Enqueued {enqueue_plan(plan)} jobs")
@@ -0,0 +1,238 @@
+import logging
+from datetime import datetime
+
+from src.ingest import bulk_insert_posts
+from src.utils import db_connection, db_transaction
+
+logger = logging.getLogger(__name__)
+
+# A run is "running" while a process works on it, "completed" once every
+# profile is done and "incomplete" if it ended with failed or pending profiles
+RESUMABLE_RUN_STATUSES = ("running", "incomplete")
+
+_STAT_KEYS = ("inserted", "updated", "duplicates", "rejected", "snapshots")
+
+
+def start_run(profiles, max_posts_per_profile=20, refresh_engagement=True, incremental=False, overlap=3):
+    """Record a new scrape run and a pending checkpoint for each profile.
+
+    Args:
+        profiles: Iterable of profile dictionaries with name and url
+        max_posts_per_profile: Maximum number of posts to scrape per profile
+        refresh_engagement: Whether stored posts get their counts refreshed
+        incremental: Whether scrolling stops at already stored posts
+        overlap: Stored posts re-scraped per profile in incremental mode
+
+    Returns:
+        ID of the new run
+    """
+    now = datetime.now().isoformat()
+    with db_transaction() as conn:
+        run_id = conn.execute(
+            """
+            INSERT INTO scrape_runs
+                (status, max_posts_per_profile, refresh_engagement, incremental, overlap, started_at)
+            VALUES ('running', ?, ?, ?, ?, ?)
+            """,
+            (max_posts_per_profile, int(refresh_engagement), int(incremental), overlap, now)
+        ).lastrowid
+        conn.executemany(
+            """
+            INSERT OR IGNORE INTO scrape_checkpoints (run_id, profile_url, profile_name, position, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            [(run_id, profile["url"], profile["name"], position, now) for position, profile in enumerate(profiles)]
+        )
+    logger.info(f"Started scrape run {run_id}")
+    return run_id
+
+
+def get_run(run_id=None):
+    """Get a scrape run, by default the latest one that can be resumed.
+
+    Args:
+        run_id: ID of the run (optional)
+
+    Returns:
+        Run dictionary, or None if there is no such run
+    """
+    with db_connection() as conn:
+        if run_id is None:
+            cursor = conn.execute(
+                "SELECT * FROM scrape_runs WHERE status IN (?, ?) ORDER BY id DESC LIMIT 1",
+                RESUMABLE_RUN_STATUSES
+            )
+        else:
+            cursor = conn.execute("SELECT * FROM scrape_runs WHERE id = ?", (run_id,))
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    return dict(zip([description[0] for description in cursor.description], row))
+
+
+def unfinished_profiles(run_id):
+    """Get the profiles of a run that are not done, in their original order.
+
+    Args:
+        run_id: ID of the run
+
+    Returns:
+        List of profile dictionaries with name, url, cursor (URL of the
+        last saved post, if any) and posts_saved
+    """
+    with db_connection() as conn:
+        rows = conn.execute(
+            """
+            SELECT profile_name, profile_url, cursor, posts_saved
+            FROM scrape_checkpoints
+            WHERE run_id = ? AND status != 'done'
+            ORDER BY position
+            """,
+            (run_id,)
+        ).fetchall()
+    return [
+        {"name": name, "url": url, "cursor": cursor, "posts_saved": posts_saved}
+        for name, url, cursor, posts_saved in rows
+    ]
+
+
+def run_progress(run_id):
+    """Summarize the checkpoints of a run.
+
+    Args:
+        run_id: ID of the run
+
+    Returns:
+        Dictionary with profile counts per status and total posts_saved
+    """
+    with db_connection() as conn:
+        rows = conn.execute(
+            """
+            SELECT status, COUNT(*), SUM(posts_saved)
+            FROM scrape_checkpoints
+            WHERE run_id = ?
+            GROUP BY status
+            """,
+            (run_id,)
+        ).fetchall()
+    progress = {"pending": 0, "running": 0, "done": 0, "failed": 0, "posts_saved": 0}
+    for status, count, posts_saved in rows:
+        progress[status] = count
+        progress["posts_saved"] += posts_saved or 0
+    return progress
+
+
+def finish_run(run_id):
+    """Mark a run completed if every profile is done, otherwise incomplete.
+
+    Args:
+        run_id: ID of the run
+
+    Returns:
+        The new run status
+    """
+    with db_transaction() as conn:
+        unfinished = conn.execute(
+            "SELECT COUNT(*) FROM scrape_checkpoints WHERE run_id = ? AND status != 'done'",
+            (run_id,)
+        ).fetchone()[0]
+        status = "incomplete" if unfinished else "completed"
+        conn.execute(
+            "UPDATE scrape_runs SET status = ?, finished_at = ? WHERE id = ?",
+            (status, datetime.now().isoformat(), run_id)
+        )
+    logger.info(f"Scrape run {run_id} {status} ({unfinished} profiles left)")
+    return status
+
+
+class ProfileCheckpoint:
+    def __init__(self, run_id, profile, upsert=True):
+        """Track and persist the progress of one profile within a run.
+
+        Args:
+            run_id: ID of the run
+            profile: Profile dictionary with name and url, plus cursor and
+                posts_saved when resuming
+            upsert: Refresh engagement counts of posts that are already stored
+        """
+        self.run_id = run_id
+        self.profile_url = profile["url"]
+        self.cursor = profile.get("cursor")
+        self.posts_saved = profile.get("posts_saved", 0)
+        self.upsert = upsert
+        self.stats = dict.fromkeys(_STAT_KEYS, 0)
+        # When resuming, posts up to and including the cursor are already saved
+        self._skipping = self.cursor is not None
+        self._skipped = []
+
+    def _update(self, conn, status, error=None, attempt=False):
+        """Write the checkpoint row."""
+        conn.execute(
+            """
+            UPDATE scrape_checkpoints
+            SET status = ?, cursor = ?, posts_saved = ?, error = ?,
+                attempts = attempts + ?, updated_at = ?
+            WHERE run_id = ? AND profile_url = ?
+            """,
+            (status, self.cursor, self.posts_saved, error, int(attempt),
+             datetime.now().isoformat(), self.run_id, self.profile_url)
+        )
+
+    def start(self):
+        """Mark the profile as being scraped."""
+        with db_transaction() as conn:
+            self._update(conn, "running", attempt=True)
+
+    def save(self, posts):
+        """Save a batch of posts and advance the cursor in the same transaction.
+
+        Batches must arrive in page order. While resuming, posts up to the
+        stored cursor are skipped because the previous attempt saved them.
+
+        Args:
+            posts: List of post dictionaries
+
+        Returns:
+            Number of posts written in this batch
+        """
+        if self._skipping:
+            for index, post in enumerate(posts):
+                if post["post_url"] == self.cursor:
+                    self._skipping = False
+                    self._skipped = []
+                    posts = posts[index + 1:]
+                    break
+            else:
+                self._skipped.extend(posts)
+                return 0
+        if not posts:
+            return 0
+
+        previous = (self.cursor, self.posts_saved)
+        try:
+            with db_transaction() as conn:
+                stats = bulk_insert_posts(posts, upsert=self.upsert, record_snapshots=True)
+                self.cursor = posts[-1].get("post_url") or self.cursor
+                self.posts_saved += len(posts) - stats["rejected"]
+                self._update(conn, "running")
+        except Exception:
+            self.cursor, self.posts_saved = previous
+            raise
+
+        for key in _STAT_KEYS:
+            self.stats[key] += stats[key]
+        return len(posts)
+
+    def finish(self, error=None):
+        """Mark the profile done, or failed with an error message.
+
+        If the cursor of a resumed profile never showed up (its post was
+        deleted, say), the skipped posts are saved now instead.
+        """
+        if self._skipping and self._skipped and error is None:
+            logger.warning(f"Cursor post {self.cursor} not found again; saving all posts of {self.profile_url}")
+            skipped, self._skipped, self._skipping = self._skipped, [], False
+            self.save(skipped)
+
+        with db_transaction() as conn:
+            self._update(conn, "failed" if error else "done", error=error)
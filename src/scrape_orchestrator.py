@@ -0,0 +1,294 @@
+import os
+import time
+import queue
+import itertools
+import logging
+import threading
+
+from src.data_collection import (
+    DEFAULT_DRIVER_PROFILE, DEFAULT_USER_DATA_DIR, LinkedInScraper, fetch_known_post_urls,
+    save_posts_to_database
+)
+from src.scrape_checkpoints import ProfileCheckpoint, finish_run, get_run, start_run, unfinished_profiles
+
+logger = logging.getLogger(__name__)
+
+
+def profiles_from_config(profiles_config):
+    """List the target and competitor profiles of a profiles configuration.
+
+    Args:
+        profiles_config: Dictionary with target_profile and competitor_profiles
+
+    Returns:
+        List of profile dictionaries with name and url
+    """
+    profiles = []
+    target_profile = profiles_config.get("target_profile")
+    if target_profile:
+        profiles.append(target_profile)
+    profiles.extend(profiles_config.get("competitor_profiles", []))
+    return profiles
+
+
+class ScrapeOrchestrator:
+    def __init__(self, workers=3, max_posts_per_profile=20, refresh_engagement=True,
+                 rate_limiter=None, headless=True, login_email=None, login_password=None,
+                 scraper_factory=None, incremental=False, overlap=3,
+                 driver_profile=DEFAULT_DRIVER_PROFILE, user_data_dir=None, checkpoint=True):
+        """Initialize a pool of browser workers sharing one profile queue.
+
+        Args:
+            workers: Number of concurrent LinkedInScraper instances
+            max_posts_per_profile: Maximum number of posts to scrape per profile
+            refresh_engagement: Update counts of posts that are already stored
+            rate_limiter: TokenBucketRateLimiter given to the default
+                scrapers; each creates one with DEFAULT_LIMITS otherwise.
+                The buckets live in the database, so all workers and
+                processes share them either way
+            headless: Whether to run browsers in headless mode
+            login_email: LinkedIn login email (optional)
+            login_password: LinkedIn login password (optional)
+            scraper_factory: Callable returning a scraper; defaults to
+                LinkedInScraper with the options above
+            incremental: Stop each profile at its already stored posts
+            overlap: Stored posts re-scraped per profile in incremental mode
+                so their engagement counts stay fresh
+            driver_profile: Browser profile of the default scrapers
+            user_data_dir: Parent of the persistent Chrome profiles; each
+                worker gets its own worker-<n> subdirectory because Chrome
+                locks a profile to one browser. The lean profile defaults
+                to DEFAULT_USER_DATA_DIR
+            checkpoint: Record the run in scrape_runs/scrape_checkpoints and
+                save posts batch by batch while scrolling, so an interrupted
+                run can be resumed with resume_scrape()
+        """
+        self.workers = max(1, workers)
+        self.max_posts_per_profile = max_posts_per_profile
+        self.refresh_engagement = refresh_engagement
+        self.rate_limiter = rate_limiter
+        self.headless = headless
+        self.login_email = login_email
+        self.login_password = login_password
+        self.scraper_factory = scraper_factory or self._default_scraper
+        self.incremental = incremental
+        self.overlap = overlap
+        self.driver_profile = driver_profile
+        if user_data_dir is None and driver_profile == "lean":
+            user_data_dir = DEFAULT_USER_DATA_DIR
+        self.user_data_dir = user_data_dir
+        self._profile_dirs = itertools.count()
+        self.checkpoint = checkpoint
+        self.run_id = None
+        self._queue = queue.Queue()
+        self._results = {}
+        self._results_lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+    def _default_scraper(self):
+        """Create and log in a LinkedInScraper for one worker."""
+        user_data_dir = None
+        if self.user_data_dir:
+            user_data_dir = os.path.join(self.user_data_dir, f"worker-{next(self._profile_dirs)}")
+        scraper = LinkedInScraper(
+            headless=self.headless,
+            login_email=self.login_email,
+            login_password=self.login_password,
+            driver_profile=self.driver_profile,
+            user_data_dir=user_data_dir,
+            rate_limiter=self.rate_limiter
+        )
+        if self.login_email and self.login_password:
+            scraper.login()
+        return scraper
+
+    def _record(self, profile, result):
+        """Store the outcome of one profile."""
+        with self._results_lock:
+            self._results[profile["name"]] = result
+
+    def _scrape_one(self, scraper, profile):
+        """Scrape one profile and save its posts as soon as it finishes.
+        
+        With checkpointing, posts are saved batch by batch while the page is
+        scrolled instead, and the profile's checkpoint follows every batch.
+        """
+        started = time.monotonic()
+        known_urls = fetch_known_post_urls(profile["url"]) if self.incremental else None
+        if self.run_id is None:
+            posts = scraper.scrape_profile_posts(
+                profile["url"], profile["name"], max_posts=self.max_posts_per_profile,
+                known_urls=known_urls, overlap=self.overlap
+            )
+            stats = save_posts_to_database(posts, upsert=self.refresh_engagement) if posts else None
+        else:
+            checkpoint = ProfileCheckpoint(self.run_id, profile, upsert=self.refresh_engagement)
+            checkpoint.start()
+            try:
+                posts = scraper.scrape_profile_posts(
+                    profile["url"], profile["name"], max_posts=self.max_posts_per_profile,
+                    known_urls=known_urls, overlap=self.overlap, on_posts=checkpoint.save
+                )
+            except Exception as e:
+                checkpoint.finish(error=str(e))
+                raise
+            checkpoint.finish()
+            stats = checkpoint.stats
+        return {
+            "posts": len(posts),
+            "saved": stats,
+            "seconds": time.monotonic() - started,
+            "error": "Failed to save posts" if posts and stats is None else None,
+        }
+
+    def _worker(self, worker_id):
+        """Take profiles off the shared queue until it is empty or stopped."""
+        scraper = None
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    profile = self._queue.get_nowait()
+                except queue.Empty:
+                    return
+
+                try:
+                    if scraper is None:
+                        scraper = self.scraper_factory()
+                    logger.info(f"Worker {worker_id} scraping profile: {profile['name']}")
+                    self._record(profile, self._scrape_one(scraper, profile))
+                except Exception as e:
+                    logger.error(f"Worker {worker_id} failed on profile {profile.get('name')}: {e}")
+                    self._record(profile, {"posts": 0, "saved": None, "seconds": None, "error": str(e)})
+                finally:
+                    self._queue.task_done()
+        finally:
+            if scraper is not None:
+                scraper.close()
+
+    def run(self, profiles, run_id=None):
+        """Scrape profiles concurrently and return per-profile results.
+
+        Args:
+            profiles: Iterable of profile dictionaries with name and url
+                (plus cursor and posts_saved when resuming)
+            run_id: Continue this checkpointed run instead of starting one
+
+        Returns:
+            Dictionary with a results dictionary (profile name -> posts,
+            saved stats, seconds and error), elapsed seconds,
+            profiles_per_minute, and the run_id and run_status of a
+            checkpointed run
+        """
+        profiles = list(profiles)
+        if run_id is not None:
+            self.run_id = run_id
+        elif self.checkpoint:
+            self.run_id = start_run(
+                profiles, self.max_posts_per_profile, self.refresh_engagement, self.incremental, self.overlap
+            )
+        for profile in profiles:
+            self._queue.put(profile)
+        profile_count = self._queue.qsize()
+
+        started = time.monotonic()
+        threads = [
+            threading.Thread(target=self._worker, args=(worker_id,), daemon=True)
+            for worker_id in range(min(self.workers, profile_count))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+        with self._results_lock:
+            results = dict(self._results)
+        run_status = finish_run(self.run_id) if self.run_id is not None else None
+
+        logger.info(
+            f"Scraped {len(results)}/{profile_count} profiles with {len(threads)} workers "
+            f"in {elapsed:.1f}s"
+        )
+        return {
+            "results": results,
+            "elapsed": elapsed,
+            "profiles_per_minute": len(results) / elapsed * 60 if elapsed else 0.0,
+            "run_id": self.run_id,
+            "run_status": run_status,
+        }
+
+    def stop(self):
+        """Ask workers to finish their current profile and exit."""
+        self._stop_event.set()
+
+
+def resume_scrape(run_id=None, workers=1, **kwargs):
+    """Continue an interrupted or incomplete scrape run where it stopped.
+
+    Profiles that finished are skipped; the others are scraped again with
+    the run's original settings, and posts up to each profile's cursor,
+    which the previous attempt already saved, are not written twice.
+
+    Args:
+        run_id: ID of the run (defaults to the latest resumable run)
+        workers: Number of concurrent browser workers
+        **kwargs: Further ScrapeOrchestrator options, e.g. headless
+
+    Returns:
+        Run summary from ScrapeOrchestrator.run, or None if there is
+        nothing to resume
+    """
+    run = get_run(run_id)
+    if run is None:
+        logger.info("No scrape run to resume")
+        return None
+    if run["status"] == "completed":
+        logger.info(f"Scrape run {run['id']} already completed")
+        return None
+
+    profiles = unfinished_profiles(run["id"])
+    logger.info(f"Resuming scrape run {run['id']} with {len(profiles)} unfinished profiles")
+    orchestrator = ScrapeOrchestrator(
+        workers=workers,
+        max_posts_per_profile=run["max_posts_per_profile"],
+        refresh_engagement=bool(run["refresh_engagement"]),
+        incremental=bool(run["incremental"]),
+        overlap=run["overlap"],
+        **kwargs
+    )
+    return orchestrator.run(profiles, run_id=run["id"])
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from src.scrape_checkpoints import run_progress
+    from src.utils import initialize_database, load_profiles_config, setup_logging
+
+    parser = argparse.ArgumentParser(description="Scrape the configured LinkedIn profiles")
+    parser.add_argument("--resume", action="store_true", help="Resume the latest (or --run-id) unfinished run")
+    parser.add_argument("--status", action="store_true", help="Show the progress of the latest unfinished (or --run-id) run")
+    parser.add_argument("--run-id", type=int, default=None, help="Scrape run to resume or show")
+    parser.add_argument("--workers", type=int, default=1, help="Concurrent browser workers")
+    parser.add_argument("--max-posts", type=int, default=20, help="Posts per profile for a new run")
+    args = parser.parse_args()
+
+    setup_logging()
+    initialize_database()
+
+    if args.status:
+        run = get_run(args.run_id)
+        if run is None:
+            print("No scrape run found")
+        else:
+            progress = run_progress(run["id"])
+            print(
+                f"Run {run['id']} ({run['status']}, started {run['started_at']}): "
+                f"{progress['done']} done, {progress['running']} running, {progress['pending']} pending, "
+                f"{progress['failed']} failed, {progress['posts_saved']} posts saved"
+            )
+    elif args.resume:
+        resume_scrape(args.run_id, workers=args.workers)
+    else:
+        orchestrator = ScrapeOrchestrator(workers=args.workers, max_posts_per_profile=args.max_posts)
+        orchestrator.run(profiles_from_config(load_profiles_config() or {}))
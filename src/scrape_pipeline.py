@@ -0,0 +1,450 @@
+import os
+import time
+import queue
+import logging
+import itertools
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from src.data_collection import (
+    DEFAULT_DRIVER_PROFILE, DEFAULT_USER_DATA_DIR, LinkedInScraper, fetch_known_post_urls, incremental_cutoff,
+    parse_capture
+)
+from src.ingest import bulk_insert_posts
+from src.scrape_checkpoints import ProfileCheckpoint, finish_run, start_run
+from src.utils import db_transaction
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("fetch", "parse", "write")
+
+# Marks the end of a stage's input
+_DONE = object()
+
+
+class StageMetrics:
+    def __init__(self, name, workers):
+        """Initialize throughput, latency and back-pressure counters for one stage.
+
+        Args:
+            name: Stage name
+            workers: Number of threads running the stage
+        """
+        self.name = name
+        self.workers = workers
+        self._lock = threading.Lock()
+        self.items = 0
+        self.records = 0
+        self.errors = 0
+        self.busy = 0.0
+        self.max_latency = 0.0
+        self.starved = 0.0
+        self.blocked = 0.0
+        self.max_queue_depth = 0
+
+    def record(self, seconds, records=0, error=False):
+        """Count one processed item that took seconds of work."""
+        with self._lock:
+            self.items += 1
+            self.records += records
+            self.errors += int(error)
+            self.busy += seconds
+            self.max_latency = max(self.max_latency, seconds)
+
+    def waited(self, starved=0.0, blocked=0.0, queue_depth=0):
+        """Count time spent waiting for input (starved) or for room downstream (blocked)."""
+        with self._lock:
+            self.starved += starved
+            self.blocked += blocked
+            self.max_queue_depth = max(self.max_queue_depth, queue_depth)
+
+    def snapshot(self, elapsed):
+        """Get the counters as a dictionary.
+
+        Args:
+            elapsed: Seconds since the pipeline started
+
+        Returns:
+            Dictionary with workers, items, records, errors, throughput
+            (items/s), avg_latency, max_latency, utilization (share of the
+            workers' time spent working), starved and blocked seconds and
+            max_queue_depth (of the stage's input queue)
+        """
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "items": self.items,
+                "records": self.records,
+                "errors": self.errors,
+                "throughput": self.items / elapsed if elapsed else 0.0,
+                "avg_latency": self.busy / self.items if self.items else 0.0,
+                "max_latency": self.max_latency,
+                "utilization": self.busy / (elapsed * self.workers) if elapsed else 0.0,
+                "starved": self.starved,
+                "blocked": self.blocked,
+                "max_queue_depth": self.max_queue_depth,
+            }
+
+
+class ScrapePipeline:
+    def __init__(self, fetch_workers=2, parse_workers=2, queue_size=4, write_batch_size=500,
+                 write_interval=2.0, max_posts_per_profile=20, refresh_engagement=True,
+                 incremental=False, overlap=3, headless=True, login_email=None, login_password=None,
+                 driver_profile=DEFAULT_DRIVER_PROFILE, user_data_dir=None, scraper_factory=None,
+                 checkpoint=True, parse_processes=False):
+        """Initialize a fetch -> parse -> write scraping pipeline.
+
+        Browser workers load and scroll activity pages and hand the raw
+        posts or page source to a bounded queue. Parser threads turn them
+        into post records on a second bounded queue, and a single writer
+        commits them to SQLite in batches. A full queue blocks the stage
+        that feeds it, so a slow stage throttles the ones before it instead
+        of piling up pages in memory.
+
+        Args:
+            fetch_workers: Number of browser workers
+            parse_workers: Number of parser threads
+            queue_size: Capacity of each queue between stages, in pages
+            write_batch_size: Posts the writer collects before committing
+            write_interval: Longest seconds a post waits in a partial batch
+            max_posts_per_profile: Maximum number of posts to scrape per profile
+            refresh_engagement: Update counts of posts that are already stored
+            incremental: Stop each profile at its already stored posts
+            overlap: Stored posts re-scraped per profile in incremental mode
+            headless: Whether to run browsers in headless mode
+            login_email: LinkedIn login email (optional)
+            login_password: LinkedIn login password (optional)
+            driver_profile: Browser profile of the default scrapers
+            user_data_dir: Parent of the per-worker persistent Chrome
+                profiles (see ScrapeOrchestrator)
+            scraper_factory: Callable returning a scraper; defaults to a
+                LinkedInScraper with the options above
+            checkpoint: Record the run in scrape_runs/scrape_checkpoints so
+                it can be resumed. Posts are then saved after every scroll
+                by the fetch worker, and the writer saves the rest of the
+                page and finishes the profile's checkpoint
+            parse_processes: Run the parsing of each parser thread in a pool
+                of parse_workers processes. HTML parsing holds the GIL, so
+                without this more parser threads do not parse faster; in
+                script extraction mode captures are small and threads suffice
+        """
+        self.fetch_workers = max(1, fetch_workers)
+        self.parse_workers = max(1, parse_workers)
+        self.write_batch_size = write_batch_size
+        self.write_interval = write_interval
+        self.max_posts_per_profile = max_posts_per_profile
+        self.refresh_engagement = refresh_engagement
+        self.incremental = incremental
+        self.overlap = overlap
+        self.headless = headless
+        self.login_email = login_email
+        self.login_password = login_password
+        self.driver_profile = driver_profile
+        if user_data_dir is None and driver_profile == "lean":
+            user_data_dir = DEFAULT_USER_DATA_DIR
+        self.user_data_dir = user_data_dir
+        self._profile_dirs = itertools.count()
+        self.scraper_factory = scraper_factory or self._default_scraper
+        self.checkpoint = checkpoint
+        self.parse_processes = parse_processes
+        self.run_id = None
+
+        self._parse_pool = None
+        self._profiles = queue.Queue()
+        self._pages = queue.Queue(maxsize=queue_size)
+        self._records = queue.Queue(maxsize=queue_size)
+        self._metrics = {
+            "fetch": StageMetrics("fetch", self.fetch_workers),
+            "parse": StageMetrics("parse", self.parse_workers),
+            "write": StageMetrics("write", 1),
+        }
+        self._results = {}
+        self._results_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._started = None
+
+    def _default_scraper(self):
+        """Create and log in a LinkedInScraper for one fetch worker."""
+        user_data_dir = None
+        if self.user_data_dir:
+            user_data_dir = os.path.join(self.user_data_dir, f"worker-{next(self._profile_dirs)}")
+        scraper = LinkedInScraper(
+            headless=self.headless,
+            login_email=self.login_email,
+            login_password=self.login_password,
+            driver_profile=self.driver_profile,
+            user_data_dir=user_data_dir
+        )
+        if self.login_email and self.login_password:
+            scraper.login()
+        return scraper
+
+    def _record(self, profile, **result):
+        """Store or update the outcome of one profile."""
+        with self._results_lock:
+            self._results.setdefault(profile["name"], {
+                "posts": 0, "saved": None, "seconds": None, "error": None
+            }).update(result)
+
+    def _put(self, target, item, metrics):
+        """Put item on a bounded queue, counting the time blocked by back-pressure."""
+        started = time.monotonic()
+        target.put(item)
+        metrics.waited(blocked=time.monotonic() - started)
+
+    def _get(self, source, metrics, timeout=None):
+        """Take an item off a queue, counting the time starved for input."""
+        metrics.waited(queue_depth=source.qsize())
+        started = time.monotonic()
+        try:
+            return source.get(timeout=timeout)
+        finally:
+            metrics.waited(starved=time.monotonic() - started)
+
+    def _fetch_worker(self, worker_id):
+        """Load profile pages and pass their raw posts downstream."""
+        metrics = self._metrics["fetch"]
+        scraper = None
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    profile = self._profiles.get_nowait()
+                except queue.Empty:
+                    return
+
+                started = time.monotonic()
+                checkpoint = None
+                streamed = []
+                try:
+                    if scraper is None:
+                        scraper = self.scraper_factory()
+                    known_urls = fetch_known_post_urls(profile["url"]) if self.incremental else None
+                    on_scroll = None
+                    if self.run_id is not None:
+                        checkpoint = ProfileCheckpoint(self.run_id, profile, upsert=self.refresh_engagement)
+                        checkpoint.start()
+                        # Save posts after every scroll, as ScrapeOrchestrator does, so a
+                        # crash or ban partway through a profile keeps what was scrolled
+                        on_scroll = scraper.streaming_callback(
+                            profile["url"], profile["name"], self.max_posts_per_profile, known_urls,
+                            self.overlap, checkpoint.save, streamed
+                        )
+                    logger.info(f"Fetch worker {worker_id} loading profile: {profile['name']}")
+                    loaded = scraper.load_activity_page(
+                        profile["url"], profile["name"], self.max_posts_per_profile,
+                        known_urls=known_urls, overlap=self.overlap, on_scroll=on_scroll
+                    )
+                    capture = scraper.capture_raw_posts(self.max_posts_per_profile) if loaded else None
+                except Exception as e:
+                    logger.error(f"Fetch worker {worker_id} failed on profile {profile.get('name')}: {e}")
+                    metrics.record(time.monotonic() - started, error=True)
+                    self._record(profile, error=str(e))
+                    if checkpoint:
+                        checkpoint.finish(error=str(e))
+                    continue
+
+                metrics.record(time.monotonic() - started, records=int(loaded))
+                self._put(self._pages, {
+                    "profile": profile,
+                    "capture": capture,
+                    "known_urls": known_urls,
+                    "checkpoint": checkpoint,
+                    "streamed": len(streamed),
+                    "started": started,
+                }, metrics)
+        finally:
+            if scraper is not None:
+                scraper.close()
+
+    def _parse_worker(self):
+        """Turn captured pages into post records."""
+        metrics = self._metrics["parse"]
+        while True:
+            page = self._get(self._pages, metrics)
+            if page is _DONE:
+                return
+
+            started = time.monotonic()
+            profile = page["profile"]
+            try:
+                posts = []
+                if page["capture"] is not None:
+                    args = (page["capture"], profile["url"], profile["name"], self.max_posts_per_profile)
+                    if self._parse_pool:
+                        posts = self._parse_pool.submit(parse_capture, *args).result()
+                    else:
+                        posts = parse_capture(*args)
+                if page["known_urls"]:
+                    cutoff = incremental_cutoff([post["post_url"] for post in posts], page["known_urls"], self.overlap)
+                    if cutoff is not None:
+                        posts = posts[:cutoff]
+            except Exception as e:
+                logger.error(f"Parsing posts of {profile['name']} failed: {e}")
+                metrics.record(time.monotonic() - started, error=True)
+                self._record(profile, error=str(e))
+                if page["checkpoint"]:
+                    page["checkpoint"].finish(error=str(e))
+                continue
+
+            metrics.record(time.monotonic() - started, records=len(posts))
+            page["posts"] = posts
+            del page["capture"]
+            self._put(self._records, page, metrics)
+
+    def _write_batch(self, batch):
+        """Commit the posts and checkpoints of a batch of pages in one transaction."""
+        metrics = self._metrics["write"]
+        started = time.monotonic()
+        post_count = sum(len(page["posts"]) for page in batch)
+        progress = [
+            (page["checkpoint"].cursor, page["checkpoint"].posts_saved) if page["checkpoint"] else None
+            for page in batch
+        ]
+        try:
+            with db_transaction():
+                if self.run_id is None:
+                    stats = bulk_insert_posts(
+                        (post for page in batch for post in page["posts"]),
+                        upsert=self.refresh_engagement, record_snapshots=True
+                    )
+                    page_stats = [None] * len(batch)
+                else:
+                    page_stats = []
+                    for page in batch:
+                        # Posts saved while scrolling come first in page order
+                        page["checkpoint"].save(page["posts"][page["streamed"]:])
+                        page["checkpoint"].finish()
+                        page_stats.append(page["checkpoint"].stats)
+        except Exception as e:
+            logger.error(f"Writing a batch of {post_count} posts failed: {e}")
+            metrics.record(time.monotonic() - started, error=True)
+            for page, previous in zip(batch, progress):
+                self._record(page["profile"], posts=len(page["posts"]), error=str(e))
+                if page["checkpoint"]:
+                    # The rollback undid the saves of earlier pages in the batch too
+                    page["checkpoint"].cursor, page["checkpoint"].posts_saved = previous
+                    page["checkpoint"].finish(error=str(e))
+            return
+
+        metrics.record(time.monotonic() - started, records=post_count)
+        done = time.monotonic()
+        for page, saved in zip(batch, page_stats):
+            self._record(page["profile"], posts=len(page["posts"]), saved=saved, seconds=done - page["started"])
+        if self.run_id is None:
+            logger.info(
+                f"Wrote {post_count} posts of {len(batch)} profiles: {stats['inserted']} inserted, "
+                f"{stats['updated']} updated"
+            )
+
+    def _writer(self):
+        """Collect post records into batches and commit them."""
+        metrics = self._metrics["write"]
+        batch = []
+        batch_posts = 0
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                page = self._get(self._records, metrics, timeout=timeout)
+            except queue.Empty:
+                page = None
+
+            if page is not None and page is not _DONE:
+                batch.append(page)
+                batch_posts += len(page["posts"])
+                if deadline is None:
+                    deadline = time.monotonic() + self.write_interval
+
+            flush = page is None or page is _DONE or batch_posts >= self.write_batch_size
+            if batch and flush:
+                self._write_batch(batch)
+                batch, batch_posts, deadline = [], 0, None
+            if page is _DONE:
+                return
+
+    def metrics(self):
+        """Get the per-stage counters of the running or finished pipeline.
+
+        Returns:
+            Dictionary of stage name -> StageMetrics.snapshot(), plus
+            bottleneck, the stage with the highest utilization
+        """
+        elapsed = time.monotonic() - self._started if self._started else 0.0
+        stages = {name: self._metrics[name].snapshot(elapsed) for name in STAGES}
+        stages["bottleneck"] = max(STAGES, key=lambda name: stages[name]["utilization"])
+        return stages
+
+    def run(self, profiles, run_id=None):
+        """Scrape profiles through the pipeline and return per-profile results.
+
+        Args:
+            profiles: Iterable of profile dictionaries with name and url
+                (plus cursor and posts_saved when resuming)
+            run_id: Continue this checkpointed run instead of starting one
+
+        Returns:
+            Dictionary with results (profile name -> posts, saved stats,
+            seconds and error), elapsed, profiles_per_minute, stages (see
+            metrics()), run_id and run_status
+        """
+        profiles = list(profiles)
+        if run_id is not None:
+            self.run_id = run_id
+        elif self.checkpoint:
+            self.run_id = start_run(
+                profiles, self.max_posts_per_profile, self.refresh_engagement, self.incremental, self.overlap
+            )
+        for profile in profiles:
+            self._profiles.put(profile)
+
+        if self.parse_processes:
+            self._parse_pool = ProcessPoolExecutor(max_workers=self.parse_workers)
+        self._started = time.monotonic()
+        fetchers = [
+            threading.Thread(target=self._fetch_worker, args=(worker_id,), daemon=True)
+            for worker_id in range(min(self.fetch_workers, len(profiles)) or 1)
+        ]
+        parsers = [threading.Thread(target=self._parse_worker, daemon=True) for _ in range(self.parse_workers)]
+        writer = threading.Thread(target=self._writer, daemon=True)
+        for thread in fetchers + parsers + [writer]:
+            thread.start()
+
+        # Shut the stages down in order once their producers have finished
+        for thread in fetchers:
+            thread.join()
+        for _ in parsers:
+            self._pages.put(_DONE)
+        for thread in parsers:
+            thread.join()
+        self._records.put(_DONE)
+        writer.join()
+        elapsed = time.monotonic() - self._started
+        if self._parse_pool:
+            self._parse_pool.shutdown()
+            self._parse_pool = None
+
+        with self._results_lock:
+            results = dict(self._results)
+        run_status = finish_run(self.run_id) if self.run_id is not None else None
+        stages = self.metrics()
+
+        logger.info(
+            f"Pipeline scraped {len(results)}/{len(profiles)} profiles in {elapsed:.1f}s; "
+            + ", ".join(
+                f"{name} {stages[name]['throughput']:.2f}/s at {stages[name]['utilization']:.0%}"
+                for name in STAGES
+            )
+            + f"; bottleneck: {stages['bottleneck']}"
+        )
+        return {
+            "results": results,
+            "elapsed": elapsed,
+            "profiles_per_minute": len(results) / elapsed * 60 if elapsed else 0.0,
+            "stages": stages,
+            "run_id": self.run_id,
+            "run_status": run_status,
+        }
+
+    def stop(self):
+        """Stop loading new profiles; pages already fetched are still written."""
+        self._stop_event.set()
@@ -0,0 +1,582 @@
+import os
+import json
+import time
+import socket
+import logging
+import itertools
+import threading
+
+from src.data_collection import DEFAULT_DRIVER_PROFILE, LinkedInScraper, fetch_known_post_urls
+from src.scrape_checkpoints import ProfileCheckpoint
+from src.scrape_orchestrator import profiles_from_config
+from src.utils import db_connection, db_transaction
+
+logger = logging.getLogger(__name__)
+
+# A job is "queued" until a worker leases it, "leased" while the worker holds
+# it, and ends "done" or, once it has failed max_attempts times, "dead"
+JOB_STATUSES = ("queued", "leased", "done", "dead")
+
+# A leased job whose worker stops heartbeating returns to the queue this long
+# after the last heartbeat
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_MAX_ATTEMPTS = 3
+
+# Failed jobs wait RETRY_BASE_SECONDS * 2^(attempts - 1), capped, before retrying
+RETRY_BASE_SECONDS = 60
+RETRY_MAX_SECONDS = 3600
+
+_JOB_COLUMNS = (
+    "id", "profile_url", "profile_name", "max_posts", "refresh_engagement", "incremental", "overlap",
+    "attempts", "max_attempts", "cursor", "posts_saved"
+)
+
+# Leases the oldest runnable job of the highest priority in one statement, so
+# two workers can never claim the same job
+_CLAIM_SQL = f"""
+    UPDATE scrape_jobs
+    SET status = 'leased', lease_owner = ?, lease_expires_at = ?, heartbeat_at = ?,
+        started_at = ?, attempts = attempts + 1
+    WHERE id = (
+        SELECT id FROM scrape_jobs
+        WHERE status = 'queued' AND available_at <= ?
+        ORDER BY priority DESC, id
+        LIMIT 1
+    )
+    RETURNING {", ".join(_JOB_COLUMNS)}
+"""
+
+# Returns jobs of workers that stopped heartbeating to the queue, or to the
+# dead letters if they used up their attempts
+_RECLAIM_SQL = """
+    UPDATE scrape_jobs
+    SET status = CASE WHEN attempts >= max_attempts THEN 'dead' ELSE 'queued' END,
+        finished_at = CASE WHEN attempts >= max_attempts THEN :now END,
+        last_error = 'Lease of ' || lease_owner || ' expired',
+        lease_owner = NULL, lease_expires_at = NULL, available_at = :now
+    WHERE status = 'leased' AND lease_expires_at < :now
+"""
+
+
+class LeaseLostError(Exception):
+    """Raised when a worker writes to a job whose lease it no longer holds."""
+
+
+def retry_delay(attempts):
+    """Seconds a job waits before its next attempt after failing attempts times."""
+    return min(RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), RETRY_MAX_SECONDS)
+
+
+def default_worker_id():
+    """Identify this process across hosts as <hostname>:<pid>."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue_profiles(profiles, max_posts=20, refresh_engagement=True, incremental=False, overlap=3,
+                     priority=0, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Add a scrape job for each profile.
+
+    Profiles that already have a queued or leased job are skipped.
+
+    Args:
+        profiles: Iterable of profile dictionaries with name and url, and
+            optionally their own max_posts and priority
+        max_posts: Maximum number of posts to scrape per profile
+        refresh_engagement: Whether stored posts get their counts refreshed
+        incremental: Whether scrolling stops at already stored posts
+        overlap: Stored posts re-scraped per profile in incremental mode
+        priority: Jobs of higher priority are claimed first
+        max_attempts: Failed attempts before a job is dead-lettered
+
+    Returns:
+        Number of jobs added
+    """
+    now = time.time()
+    with db_transaction() as conn:
+        cursor = conn.executemany(
+            """
+            INSERT OR IGNORE INTO scrape_jobs
+                (profile_url, profile_name, max_posts, refresh_engagement, incremental, overlap,
+                 priority, max_attempts, available_at, enqueued_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (profile["url"], profile["name"], profile.get("max_posts", max_posts), int(refresh_engagement),
+                 int(incremental), overlap, profile.get("priority", priority), max_attempts, now, now)
+                for profile in profiles
+            ]
+        )
+        added = cursor.rowcount
+    logger.info(f"Enqueued {added} scrape jobs")
+    return added
+
+
+def reclaim_expired_leases(conn=None):
+    """Requeue or dead-letter leased jobs whose lease has expired.
+
+    Args:
+        conn: Connection of an open transaction (optional)
+
+    Returns:
+        Number of jobs reclaimed
+    """
+    if conn is None:
+        with db_transaction() as conn:
+            return reclaim_expired_leases(conn)
+    reclaimed = conn.execute(_RECLAIM_SQL, {"now": time.time()}).rowcount
+    if reclaimed:
+        logger.warning(f"Reclaimed {reclaimed} scrape jobs with expired leases")
+    return reclaimed
+
+
+def claim_job(worker_id, lease_seconds=DEFAULT_LEASE_SECONDS):
+    """Lease the next runnable job.
+
+    Args:
+        worker_id: Identifier of the claiming worker, stored as lease owner
+        lease_seconds: Lease duration; heartbeats extend it
+
+    Returns:
+        Job dictionary, or None if no job is runnable
+    """
+    now = time.time()
+    with db_transaction() as conn:
+        reclaim_expired_leases(conn)
+        row = conn.execute(_CLAIM_SQL, (worker_id, now + lease_seconds, now, now, now)).fetchone()
+    if row is None:
+        return None
+    return dict(zip(_JOB_COLUMNS, row))
+
+
+def heartbeat(job_id, worker_id, lease_seconds=DEFAULT_LEASE_SECONDS):
+    """Extend a job's lease.
+
+    Args:
+        job_id: ID of the leased job
+        worker_id: Identifier of the worker holding the lease
+        lease_seconds: New lease duration from now
+
+    Returns:
+        False if the worker no longer holds the lease
+    """
+    now = time.time()
+    with db_transaction() as conn:
+        updated = conn.execute(
+            """
+            UPDATE scrape_jobs SET lease_expires_at = ?, heartbeat_at = ?
+            WHERE id = ? AND lease_owner = ? AND status = 'leased'
+            """,
+            (now + lease_seconds, now, job_id, worker_id)
+        ).rowcount
+    return updated == 1
+
+
+def queue_stats(window_seconds=3600):
+    """Summarize queue depth and recent throughput.
+
+    Args:
+        window_seconds: Period over which throughput is measured
+
+    Returns:
+        Dictionary with job counts per status, oldest_queued_seconds,
+        workers (distinct lease owners), and the jobs done, jobs
+        dead-lettered, posts saved and jobs_per_minute in the window
+    """
+    now = time.time()
+    since = now - window_seconds
+    with db_connection() as conn:
+        stats = dict.fromkeys(JOB_STATUSES, 0)
+        stats.update(conn.execute("SELECT status, COUNT(*) FROM scrape_jobs GROUP BY status").fetchall())
+        oldest = conn.execute(
+            "SELECT MIN(enqueued_at) FROM scrape_jobs WHERE status = 'queued'"
+        ).fetchone()[0]
+        workers = conn.execute(
+            "SELECT COUNT(DISTINCT lease_owner) FROM scrape_jobs WHERE status = 'leased'"
+        ).fetchone()[0]
+        done, posts_saved = conn.execute(
+            "SELECT COUNT(*), SUM(posts_saved) FROM scrape_jobs WHERE finished_at >= ? AND status = 'done'",
+            (since,)
+        ).fetchone()
+        dead = conn.execute(
+            "SELECT COUNT(*) FROM scrape_jobs WHERE finished_at >= ? AND status = 'dead'",
+            (since,)
+        ).fetchone()[0]
+
+    stats.update({
+        "oldest_queued_seconds": now - oldest if oldest is not None else None,
+        "workers": workers,
+        "window_seconds": window_seconds,
+        "done_in_window": done,
+        "dead_in_window": dead,
+        "posts_in_window": posts_saved or 0,
+        "jobs_per_minute": done / window_seconds * 60,
+    })
+    return stats
+
+
+def dead_jobs(limit=50):
+    """List dead-lettered jobs, most recent first.
+
+    Returns:
+        List of dictionaries with id, profile_name, profile_url, attempts,
+        last_error and finished_at
+    """
+    with db_connection() as conn:
+        rows = conn.execute(
+            """
+            SELECT id, profile_name, profile_url, attempts, last_error, finished_at
+            FROM scrape_jobs WHERE status = 'dead'
+            ORDER BY finished_at DESC LIMIT ?
+            """,
+            (limit,)
+        ).fetchall()
+    keys = ("id", "profile_name", "profile_url", "attempts", "last_error", "finished_at")
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def requeue_dead_jobs(job_ids=None):
+    """Give dead-lettered jobs a fresh set of attempts.
+
+    Jobs whose profile has meanwhile been queued again are left dead.
+
+    Args:
+        job_ids: IDs to requeue (defaults to all dead jobs)
+
+    Returns:
+        Number of jobs requeued
+    """
+    now = time.time()
+    sql = """
+        UPDATE OR IGNORE scrape_jobs
+        SET status = 'queued', attempts = 0, available_at = ?, finished_at = NULL
+        WHERE status = 'dead'
+    """
+    params = [now]
+    if job_ids:
+        sql += f" AND id IN ({', '.join('?' for _ in job_ids)})"
+        params.extend(job_ids)
+    with db_transaction() as conn:
+        requeued = conn.execute(sql, params).rowcount
+    logger.info(f"Requeued {requeued} dead scrape jobs")
+    return requeued
+
+
+class JobCheckpoint(ProfileCheckpoint):
+    def __init__(self, job, worker_id, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """Persist a leased job's progress in its scrape_jobs row.
+
+        Saving works as for ProfileCheckpoint: every batch of posts is
+        written with the job's cursor in one transaction, and a retried job
+        skips the posts its earlier attempts saved. Each write also renews
+        the lease, and fails with LeaseLostError if the lease has expired.
+
+        Args:
+            job: Job dictionary from claim_job
+            worker_id: Identifier of the worker holding the lease
+            lease_seconds: Lease duration renewed by each write
+        """
+        profile = {"url": job["profile_url"], "cursor": job["cursor"], "posts_saved": job["posts_saved"]}
+        super().__init__(None, profile, upsert=bool(job["refresh_engagement"]))
+        self.job = job
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+
+    def _update(self, conn, status, error=None, attempt=False):
+        """Write the job row; "done" completes it and "failed" schedules a retry."""
+        now = time.time()
+        if status == "running":
+            updated = conn.execute(
+                """
+                UPDATE scrape_jobs SET cursor = ?, posts_saved = ?, lease_expires_at = ?, heartbeat_at = ?
+                WHERE id = ? AND lease_owner = ? AND status = 'leased'
+                """,
+                (self.cursor, self.posts_saved, now + self.lease_seconds, now, self.job["id"], self.worker_id)
+            ).rowcount
+        elif status == "done":
+            updated = conn.execute(
+                """
+                UPDATE scrape_jobs
+                SET status = 'done', cursor = ?, posts_saved = ?, last_error = NULL, finished_at = ?,
+                    lease_owner = NULL, lease_expires_at = NULL
+                WHERE id = ? AND lease_owner = ? AND status = 'leased'
+                """,
+                (self.cursor, self.posts_saved, now, self.job["id"], self.worker_id)
+            ).rowcount
+        else:
+            dead = self.job["attempts"] >= self.job["max_attempts"]
+            updated = conn.execute(
+                """
+                UPDATE scrape_jobs
+                SET status = ?, cursor = ?, posts_saved = ?, last_error = ?, available_at = ?,
+                    finished_at = ?, lease_owner = NULL, lease_expires_at = NULL
+                WHERE id = ? AND lease_owner = ? AND status = 'leased'
+                """,
+                ("dead" if dead else "queued", self.cursor, self.posts_saved, error,
+                 now + retry_delay(self.job["attempts"]), now if dead else None, self.job["id"], self.worker_id)
+            ).rowcount
+            if updated and dead:
+                logger.error(f"Scrape job {self.job['id']} dead after {self.job['attempts']} attempts: {error}")
+
+        if updated != 1:
+            raise LeaseLostError(f"Worker {self.worker_id} no longer holds scrape job {self.job['id']}")
+
+
+class QueueWorker:
+    _worker_numbers = itertools.count()
+
+    def __init__(self, worker_id=None, lease_seconds=DEFAULT_LEASE_SECONDS, poll_interval=15.0,
+                 headless=True, login_email=None, login_password=None,
+                 driver_profile=DEFAULT_DRIVER_PROFILE, user_data_dir=None, scraper_factory=None):
+        """Initialize a worker that scrapes profiles taken from the job queue.
+
+        Any number of workers, in any number of processes on the host that
+        holds the database file, can pull from the same queue. Workers on
+        other hosts must not open the file over a network share: the
+        "concurrent" storage profile uses WAL, whose shared-memory index
+        only works on one machine, and NFS/SMB locks are unreliable.
+
+        Args:
+            worker_id: Lease owner name; defaults to <hostname>:<pid>:<n>
+            lease_seconds: Lease duration, renewed by a heartbeat every
+                third of it while a job is scraped
+            poll_interval: Seconds between claims while the queue is empty
+                in wait mode
+            headless: Whether to run browsers in headless mode
+            login_email: LinkedIn login email (optional)
+            login_password: LinkedIn login password (optional)
+            driver_profile: One of DRIVER_PROFILES
+            user_data_dir: Chrome profile directory of this worker
+            scraper_factory: Callable returning a scraper; defaults to a
+                logged-in LinkedInScraper
+        """
+        self.worker_id = worker_id or f"{default_worker_id()}:{next(self._worker_numbers)}"
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.headless = headless
+        self.login_email = login_email
+        self.login_password = login_password
+        self.driver_profile = driver_profile
+        self.user_data_dir = user_data_dir
+        self.scraper_factory = scraper_factory or self._default_scraper
+        self._current_job = None
+        self._stop_event = threading.Event()
+
+    def _default_scraper(self):
+        """Create and log in a LinkedInScraper."""
+        scraper = LinkedInScraper(
+            headless=self.headless,
+            login_email=self.login_email,
+            login_password=self.login_password,
+            driver_profile=self.driver_profile,
+            user_data_dir=self.user_data_dir
+        )
+        if self.login_email and self.login_password:
+            scraper.login()
+        return scraper
+
+    def _heartbeat_loop(self, done):
+        """Renew the lease of the current job until done is set."""
+        while not done.wait(self.lease_seconds / 3):
+            job = self._current_job
+            if job is not None and not heartbeat(job["id"], self.worker_id, self.lease_seconds):
+                logger.warning(f"Worker {self.worker_id} lost the lease of scrape job {job['id']}")
+
+    def process(self, scraper, job):
+        """Scrape one leased job, saving posts batch by batch.
+
+        Args:
+            scraper: Scraper to load the profile with
+            job: Job dictionary from claim_job
+
+        Returns:
+            Dictionary with posts found, saved stats, seconds, error and
+            lease_lost (the error was losing the lease, not the scrape)
+        """
+        started = time.monotonic()
+        checkpoint = JobCheckpoint(job, self.worker_id, self.lease_seconds)
+        try:
+            checkpoint.start()
+            known_urls = fetch_known_post_urls(job["profile_url"]) if job["incremental"] else None
+            posts = scraper.scrape_profile_posts(
+                job["profile_url"], job["profile_name"], max_posts=job["max_posts"],
+                known_urls=known_urls, overlap=job["overlap"], on_posts=checkpoint.save
+            )
+            checkpoint.finish()
+        except LeaseLostError as e:
+            logger.error(str(e))
+            return {"posts": 0, "saved": checkpoint.stats, "seconds": time.monotonic() - started, "error": str(e),
+                    "lease_lost": True}
+        except Exception as e:
+            return self._fail(checkpoint, e, started)
+        return {"posts": len(posts), "saved": checkpoint.stats, "seconds": time.monotonic() - started, "error": None,
+                "lease_lost": False}
+
+    def _fail(self, checkpoint, error, started):
+        """Release a leased job as failed so it is retried or marked dead."""
+        job = checkpoint.job
+        logger.error(f"Worker {self.worker_id} failed on scrape job {job['id']} ({job['profile_name']}): {error}")
+        try:
+            checkpoint.finish(error=str(error))
+        except LeaseLostError as lost:
+            logger.error(str(lost))
+        return {"posts": 0, "saved": checkpoint.stats, "seconds": time.monotonic() - started, "error": str(error),
+                "lease_lost": False}
+
+    def run(self, max_jobs=None, wait=False):
+        """Claim and scrape jobs until the queue is empty or stop() is called.
+
+        Args:
+            max_jobs: Stop after this many jobs (optional)
+            wait: Keep polling an empty queue instead of returning
+
+        Returns:
+            Dictionary with jobs, done, failed, posts and elapsed seconds
+        """
+        summary = {"jobs": 0, "done": 0, "failed": 0, "posts": 0}
+        started = time.monotonic()
+        heartbeat_done = threading.Event()
+        heartbeat_thread = threading.Thread(target=self._heartbeat_loop, args=(heartbeat_done,), daemon=True)
+        heartbeat_thread.start()
+        scraper = None
+        try:
+            while not self._stop_event.is_set() and (max_jobs is None or summary["jobs"] < max_jobs):
+                job = claim_job(self.worker_id, self.lease_seconds)
+                if job is None:
+                    if not wait:
+                        break
+                    self._stop_event.wait(self.poll_interval)
+                    continue
+
+                logger.info(
+                    f"Worker {self.worker_id} scraping {job['profile_name']} "
+                    f"(job {job['id']}, attempt {job['attempts']}/{job['max_attempts']})"
+                )
+                self._current_job = job
+                try:
+                    if scraper is None:
+                        scraper = self.scraper_factory()
+                except Exception as e:
+                    result = self._fail(JobCheckpoint(job, self.worker_id, self.lease_seconds), e, time.monotonic())
+                else:
+                    result = self.process(scraper, job)
+                finally:
+                    self._current_job = None
+
+                summary["jobs"] += 1
+                summary["posts"] += result["posts"]
+                summary["failed" if result["error"] else "done"] += 1
+                if result["error"] and not result["lease_lost"]:
+                    # The browser may have crashed or lost its session: start a
+                    # new one for the next job, and back off instead of burning
+                    # through the attempts of every queued job
+                    if scraper is not None:
+                        try:
+                            scraper.close()
+                        except Exception as e:
+                            logger.warning(f"Worker {self.worker_id} could not close its scraper: {e}")
+                        scraper = None
+                    self._stop_event.wait(self.poll_interval)
+        finally:
+            heartbeat_done.set()
+            heartbeat_thread.join()
+            if scraper is not None:
+                scraper.close()
+
+        summary["elapsed"] = time.monotonic() - started
+        logger.info(
+            f"Worker {self.worker_id} finished {summary['done']} jobs ({summary['failed']} failed) "
+            f"in {summary['elapsed']:.1f}s"
+        )
+        return summary
+
+    def stop(self):
+        """Ask the worker to finish its current job and exit."""
+        self._stop_event.set()
+
+
+def _profiles_from_file(path):
+    """Read profiles from a JSON list of {name, url} or a profiles configuration."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data if isinstance(data, list) else profiles_from_config(data)
+
+
+def _format_seconds(seconds):
+    """Format an age in seconds for the status output."""
+    if seconds is None:
+        return "-"
+    if seconds < 120:
+        return f"{seconds:.0f}s"
+    if seconds < 7200:
+        return f"{seconds / 60:.0f}m"
+    return f"{seconds / 3600:.1f}h"
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from src.utils import initialize_database, load_profiles_config, setup_logging
+
+    parser = argparse.ArgumentParser(description="Durable scrape job queue shared by scraper processes")
+    parser.add_argument("action", choices=["enqueue", "work", "status", "dead", "requeue-dead"],
+                        help="enqueue profiles, run workers, show queue depth and throughput, "
+                             "list or requeue dead-lettered jobs")
+    parser.add_argument("--profiles", default=None,
+                        help="JSON file of profiles to enqueue (defaults to data/profiles.json)")
+    parser.add_argument("--max-posts", type=int, default=20, help="Posts per profile")
+    parser.add_argument("--incremental", action="store_true", help="Stop scrolling at already stored posts")
+    parser.add_argument("--priority", type=int, default=0, help="Higher priorities are claimed first")
+    parser.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS,
+                        help="Failed attempts before a job is dead-lettered")
+    parser.add_argument("--workers", type=int, default=1, help="Browser workers in this process")
+    parser.add_argument("--max-jobs", type=int, default=None, help="Jobs per worker before exiting")
+    parser.add_argument("--wait", action="store_true", help="Keep polling when the queue is empty")
+    parser.add_argument("--lease-seconds", type=int, default=DEFAULT_LEASE_SECONDS, help="Job lease duration")
+    parser.add_argument("--window", type=int, default=3600, help="Throughput window in seconds")
+    args = parser.parse_args()
+
+    setup_logging()
+    initialize_database()
+
+    if args.action == "enqueue":
+        if args.profiles:
+            profiles = _profiles_from_file(args.profiles)
+        else:
+            profiles = profiles_from_config(load_profiles_config() or {})
+        added = enqueue_profiles(
+            profiles, max_posts=args.max_posts, incremental=args.incremental, priority=args.priority,
+            max_attempts=args.max_attempts
+        )
+        print(f"Enqueued {added} of {len(profiles)} profiles ({len(profiles) - added} already queued)")
+    elif args.action == "work":
+        workers = [QueueWorker(lease_seconds=args.lease_seconds) for _ in range(args.workers)]
+        threads = [
+            threading.Thread(target=worker.run, kwargs={"max_jobs": args.max_jobs, "wait": args.wait})
+            for worker in workers
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                thread.join()
+        except KeyboardInterrupt:
+            for worker in workers:
+                worker.stop()
+            for thread in threads:
+                thread.join()
+    elif args.action == "status":
+        stats = queue_stats(args.window)
+        print(
+            f"queued {stats['queued']} (oldest {_format_seconds(stats['oldest_queued_seconds'])}), "
+            f"leased {stats['leased']} by {stats['workers']} workers, done {stats['done']}, dead {stats['dead']}"
+        )
+        print(
+            f"last {_format_seconds(args.window)}: {stats['done_in_window']} done "
+            f"({stats['jobs_per_minute']:.2f}/min), {stats['dead_in_window']} dead, "
+            f"{stats['posts_in_window']} posts saved"
+        )
+    elif args.action == "dead":
+        for job in dead_jobs():
+            print(f"{job['id']:>6} {job['profile_name']} after {job['attempts']} attempts: {job['last_error']}")
+    else:
+        print(f"Requeued {requeue_dead_jobs()} dead jobs")
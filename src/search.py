@@ -0,0 +1,126 @@
+import logging
+import re
+import sqlite3
+
+from src.compression import decompress_content
+from src.publish_dates import day_start_timestamp
+from src.utils import db_connection
+
+logger = logging.getLogger(__name__)
+
+_TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def build_match_query(text, match_all=True):
+    """Turn free text into a safe FTS5 MATCH expression.
+
+    Each word becomes a quoted term, so punctuation and FTS5 operators typed
+    by a user cannot cause syntax errors.
+
+    Args:
+        text: Free-text search string
+        match_all: Require every term (AND) instead of any term (OR)
+
+    Returns:
+        MATCH expression string, or None if the text has no searchable terms
+    """
+    terms = _TERM_PATTERN.findall(text or "")
+    if not terms:
+        return None
+    joiner = " " if match_all else " OR "
+    return joiner.join(f'"{term}"' for term in terms)
+
+
+def search_posts(query, profile_name=None, since=None, until=None, limit=20, match_all=True):
+    """Search scraped posts by content, ranked by bm25 relevance.
+
+    Date filters use published_at in local time, so posts whose publish time
+    is unknown are left out when either is given.
+
+    Args:
+        query: Free-text search string
+        profile_name: Optional filter by profile name
+        since: Optional earliest publish date (YYYY-MM-DD, inclusive)
+        until: Optional latest publish date (YYYY-MM-DD, inclusive)
+        limit: Maximum number of posts to return
+        match_all: Require every term instead of any term
+
+    Returns:
+        List of post dictionaries, best match first
+    """
+    match = build_match_query(query, match_all)
+    if not match:
+        return []
+
+    sql = """
+        SELECT p.id, p.profile_name, p.post_url, p.post_content, p.publish_date,
+               p.likes, p.comments, p.shares, p.total_engagement, bm25(posts_fts) AS rank
+        FROM posts_fts
+        JOIN posts p ON p.id = posts_fts.rowid
+        WHERE posts_fts MATCH ?
+    """
+    params = [match]
+
+    if profile_name:
+        sql += " AND p.profile_name = ?"
+        params.append(profile_name)
+    if since:
+        sql += " AND p.published_at >= ?"
+        params.append(day_start_timestamp(since))
+    if until:
+        sql += " AND p.published_at < ?"
+        params.append(day_start_timestamp(until, days_after=1))
+
+    sql += " ORDER BY rank LIMIT ?"
+    params.append(limit)
+
+    try:
+        with db_connection() as conn:
+            cursor = conn.execute(sql, params)
+            columns = [description[0] for description in cursor.description]
+            posts = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            for post in posts:
+                post["post_content"] = decompress_content(post["post_content"], conn=conn)
+            return posts
+    except sqlite3.Error as e:
+        logger.error(f"Error searching posts: {e}")
+        return []
+
+
+def search_generated_posts(query, limit=20, match_all=True):
+    """Search generated posts by content and hashtags, ranked by bm25 relevance.
+
+    Args:
+        query: Free-text search string
+        limit: Maximum number of posts to return
+        match_all: Require every term instead of any term
+
+    Returns:
+        List of generated post dictionaries, best match first
+    """
+    match = build_match_query(query, match_all)
+    if not match:
+        return []
+
+    try:
+        with db_connection() as conn:
+            cursor = conn.execute(
+                """
+                SELECT g.id, g.content, g.hashtags, g.generated_at, g.profile, g.topic,
+                       g.feedback_score, bm25(generated_posts_fts) AS rank
+                FROM generated_posts_fts
+                JOIN generated_posts g ON g.id = generated_posts_fts.rowid
+                WHERE generated_posts_fts MATCH ?
+                ORDER BY rank
+                LIMIT ?
+                """,
+                (match, limit)
+            )
+            columns = [description[0] for description in cursor.description]
+            posts = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            for post in posts:
+                post["content"] = decompress_content(post["content"], conn=conn)
+            return posts
+    except sqlite3.Error as e:
+        logger.error(f"Error searching generated posts: {e}")
+        return []
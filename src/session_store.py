@@ -0,0 +1,180 @@
+import os
+import re
+import json
+import time
+import logging
+import threading
+from datetime import datetime
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+SESSION_DIR = os.getenv("LINKEDIN_SESSION_DIR", os.path.join("data", "sessions"))
+
+# LinkedIn's authentication cookie; a session without a live one is useless
+AUTH_COOKIE = "li_at"
+
+# A session that passed validation this recently is used without checking again
+VALIDATION_INTERVAL_SECONDS = 600
+
+# Fetched without following redirects: 200 means signed in, a redirect to a
+# login or authwall page means the session is gone
+VALIDATION_URL = "https://www.linkedin.com/feed/"
+
+_LOGIN_REDIRECT_MARKERS = ("/login", "/authwall", "/uas/login", "/checkpoint/")
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def session_path(account, directory=SESSION_DIR):
+    """Get the session file of an account.
+
+    Args:
+        account: Login email
+        directory: Session directory
+
+    Returns:
+        Path such as data/sessions/jane_example_com.json
+    """
+    return os.path.join(directory, re.sub(r"[^A-Za-z0-9]+", "_", account.lower()).strip("_") + ".json")
+
+
+def session_lock(path):
+    """Get the lock that serializes logins into one session file within this process."""
+    with _locks_guard:
+        return _locks.setdefault(os.path.abspath(path), threading.Lock())
+
+
+def _auth_cookie_expired(cookies, now):
+    """Check whether the authentication cookie is missing or past its expiry."""
+    for cookie in cookies:
+        if cookie.get("name") == AUTH_COOKIE:
+            return "expiry" in cookie and cookie["expiry"] <= now
+    return True
+
+
+def load_session(path):
+    """Read a saved session.
+
+    Args:
+        path: Session file
+
+    Returns:
+        Session dictionary with account, saved_at, validated_at and
+        cookies, or None if the file is missing, unreadable or its
+        authentication cookie has expired
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            session = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, json.JSONDecodeError) as e:
+        logger.error(f"Error reading session file {path}: {e}")
+        return None
+
+    if _auth_cookie_expired(session.get("cookies", []), time.time()):
+        logger.info(f"Saved session in {path} has no live {AUTH_COOKIE} cookie")
+        return None
+    return session
+
+
+def save_session(path, account, cookies, validated_at=None):
+    """Write a session file atomically, readable only by the current user.
+
+    Args:
+        path: Session file
+        account: Login email the cookies belong to
+        cookies: Cookies as returned by WebDriver.get_cookies()
+        validated_at: Epoch seconds of the last successful validation
+
+    Returns:
+        The saved session dictionary
+    """
+    session = {
+        "account": account,
+        "saved_at": datetime.now().isoformat(),
+        "validated_at": validated_at or time.time(),
+        "cookies": cookies,
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(session, f)
+    os.replace(temp_path, path)
+    logger.info(f"Saved LinkedIn session for {account} to {path}")
+    return session
+
+
+def discard_session(path):
+    """Delete a session file that no longer works."""
+    try:
+        os.remove(path)
+        logger.info(f"Discarded LinkedIn session {path}")
+    except FileNotFoundError:
+        pass
+
+
+def recently_validated(session):
+    """Check whether a session passed validation within VALIDATION_INTERVAL_SECONDS."""
+    return time.time() - session.get("validated_at", 0) < VALIDATION_INTERVAL_SECONDS
+
+
+def validate_session(session, user_agent, timeout=10):
+    """Check over plain HTTP whether a session's cookies are still signed in.
+
+    One redirect-free GET is far cheaper than loading the feed in Chrome.
+
+    Args:
+        session: Session dictionary from load_session
+        user_agent: User agent to send, matching the browser's
+        timeout: Request timeout in seconds
+
+    Returns:
+        True if signed in, False if LinkedIn asks for a login, None if the
+        check was inconclusive (network error or an unexpected status)
+    """
+    cookies = {cookie["name"]: cookie["value"] for cookie in session["cookies"]}
+    try:
+        response = requests.get(
+            VALIDATION_URL, cookies=cookies, headers={"User-Agent": user_agent},
+            allow_redirects=False, timeout=timeout
+        )
+    except requests.RequestException as e:
+        logger.warning(f"Could not validate LinkedIn session: {e}")
+        return None
+
+    if response.status_code == 200:
+        return True
+    location = response.headers.get("Location", "")
+    if response.is_redirect and any(marker in location for marker in _LOGIN_REDIRECT_MARKERS):
+        return False
+    logger.warning(f"Inconclusive LinkedIn session check: HTTP {response.status_code}")
+    return None
+
+
+def cdp_cookies(cookies):
+    """Convert WebDriver cookies to CDP Network.setCookies parameters.
+
+    CDP sets cookies for any domain without first navigating to it, so a
+    session can be restored into a fresh driver without a page load.
+    """
+    converted = []
+    for cookie in cookies:
+        param = {
+            "name": cookie["name"],
+            "value": cookie["value"],
+            "domain": cookie.get("domain", ".linkedin.com"),
+            "path": cookie.get("path", "/"),
+            "secure": cookie.get("secure", False),
+            "httpOnly": cookie.get("httpOnly", False),
+        }
+        if "expiry" in cookie:
+            param["expires"] = cookie["expiry"]
+        if cookie.get("sameSite") in ("Strict", "Lax", "None"):
+            param["sameSite"] = cookie["sameSite"]
+        converted.append(param)
+    return converted
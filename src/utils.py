@@ -151,9 +151,13 @@
 import os
 import json
 import logging
-import sqlite3
 from datetime import datetime
 
+from src.compression import compress_content, prepare_compressed_writes
+from src.db_pool import get_pool, set_storage_profile
+from src.hashtags import index_generated_post_hashtags
+from src.migrations import apply_migrations
+
 logger = logging.getLogger(__name__)
 
 def setup_logging():
@@ -182,90 +186,63 @@ def load_profiles_config():
         logger.error(f"Error parsing profiles configuration: {e}")
         return None
 
-def initialize_database():
-    """Initialize SQLite database for storing LinkedIn posts data."""
-    db_path = os.path.join('data', 'posts_database.db')
-    
-    # Ensure data directory exists
-    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+def initialize_database(storage_profile=None):
+    """Initialize SQLite database for storing LinkedIn posts data.
     
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    Args:
+        storage_profile: Optional key of STORAGE_PROFILES (e.g. "concurrent"
+            for WAL mode). When given, the shared connection pool is
+            reconfigured so every connection uses the profile's pragmas.
     
-    # Create tables if they don't exist
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS posts (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            profile_url TEXT,
-            profile_name TEXT,
-            post_url TEXT UNIQUE,
-            post_content TEXT,
-            publish_date TEXT,
-            likes INTEGER,
-            comments INTEGER,
-            shares INTEGER,
-            collected_at TEXT
-        )
-    ''')
+    Returns:
+        Path to the database file
+    """
+    pool = set_storage_profile(storage_profile) if storage_profile else get_pool()
+    db_path = pool.db_path
     
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS generated_posts (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            content TEXT,
-            hashtags TEXT,
-            generated_at TEXT,
-            feedback_score INTEGER,
-            feedback_text TEXT,
-            scheduled_time TEXT,
-            published INTEGER DEFAULT 0,
-            profile TEXT,
-            topic TEXT,
-            tone TEXT
-        )
-    ''')
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS analytics (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            metric_name TEXT,
-            metric_value REAL,
-            recorded_at TEXT
-        )
-    ''')
+    # Ensure data directory exists
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
     
-    conn.commit()
-    conn.close()
+    with pool.connection() as conn:
+        apply_migrations(conn)
+        journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
     
-    logger.info(f"Database initialized at {db_path}")
+    logger.info(f"Database initialized at {db_path} (storage profile: {pool.storage_profile}, journal mode: {journal_mode})")
     return db_path
 
 def get_db_connection():
-    """Get a connection to the SQLite database."""
-    db_path = os.path.join('data', 'posts_database.db')
-    return sqlite3.connect(db_path)
+    """Get a dedicated connection to the SQLite database.
+    
+    The caller owns the connection and must close it. Prefer db_connection()
+    or db_transaction(), which borrow a connection from the shared pool.
+    """
+    return get_pool().connect()
+
+def db_connection():
+    """Borrow a pooled database connection (context manager)."""
+    return get_pool().connection()
+
+def db_transaction():
+    """Borrow a pooled connection and commit when the block succeeds (context manager)."""
+    return get_pool().transaction()
 
 def save_generated_post(content, hashtags, profile=None, topic=None, tone=None):
     """Save a generated post to the database."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute(
-            """INSERT INTO generated_posts 
-               (content, hashtags, generated_at, profile, topic, tone) 
-               VALUES (?, ?, ?, ?, ?, ?)""",
-            (content, hashtags, datetime.now().isoformat(), profile, topic, tone)
-        )
-        
-        post_id = cursor.lastrowid
-        conn.commit()
-        return post_id
+        with db_transaction() as conn:
+            prepare_compressed_writes(conn)
+            cursor = conn.execute(
+                """INSERT INTO generated_posts 
+                   (content, hashtags, generated_at, profile, topic, tone) 
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (compress_content(content, conn=conn), hashtags, datetime.now().isoformat(), profile, topic, tone)
+            )
+            post_id = cursor.lastrowid
+            index_generated_post_hashtags(conn, post_id, content, hashtags)
+            return post_id
     except Exception as e:
         logger.error(f"Error saving generated post: {e}")
-        conn.rollback()
         return None
-    finally:
-        conn.close()
 
 def save_post_to_db(content, hashtags, profile=None, topic=None, tone=None):
     """Save a post to the database (enhanced version of save_generated_post)."""
@@ -273,43 +250,29 @@ def save_post_to_db(content, hashtags, profile=None, topic=None, tone=None):
 
 def update_post_feedback(post_id, feedback_score, feedback_text):
     """Update feedback for a generated post."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute(
-            "UPDATE generated_posts SET feedback_score = ?, feedback_text = ? WHERE id = ?",
-            (feedback_score, feedback_text, post_id)
-        )
-        
-        conn.commit()
+        with db_transaction() as conn:
+            conn.execute(
+                "UPDATE generated_posts SET feedback_score = ?, feedback_text = ? WHERE id = ?",
+                (feedback_score, feedback_text, post_id)
+            )
         return True
     except Exception as e:
         logger.error(f"Error updating post feedback: {e}")
-        conn.rollback()
         return False
-    finally:
-        conn.close()
 
 def schedule_post(post_id, scheduled_time):
     """Schedule a post for publishing."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute(
-            "UPDATE generated_posts SET scheduled_time = ? WHERE id = ?",
-            (scheduled_time, post_id)
-        )
-        
-        conn.commit()
+        with db_transaction() as conn:
+            conn.execute(
+                "UPDATE generated_posts SET scheduled_time = ? WHERE id = ?",
+                (scheduled_time, post_id)
+            )
         return True
     except Exception as e:
         logger.error(f"Error scheduling post: {e}")
-        conn.rollback()
         return False
-    finally:
-        conn.close()
 
 def ensure_directories():
     """Ensure all required directories exist."""